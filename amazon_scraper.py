@@ -4,58 +4,76 @@ from __future__ import annotations
 from typing import List, Optional
 from urllib.parse import quote_plus, urljoin
 
-from bs4 import BeautifulSoup
-
 from base_scraper import BaseScraper
+from html_parsers import ExtractionSpec
 from scraper_config import AMAZON_BASE_URL
 from scraper_utils import ProductRecord
 
+LISTING_SPEC = ExtractionSpec(
+    cards=("div[data-component-type='s-search-result']",),
+    fields={
+        "title": (("h2 a span",), None),
+        "link": (("h2 a",), "href"),
+        "price": (("span.a-price span.a-offscreen",), None),
+        "rating": (("span.a-icon-alt",), None),
+    },
+    keep_tags=("div",),
+    keep_attrs={"data-component-type": "s-search-result"},
+)
+
+PRODUCT_SPEC = ExtractionSpec(
+    fields={
+        "title": (("#productTitle",), None),
+        "price": (("#corePriceDisplay_desktop_feature_div .a-price span.a-offscreen",), None),
+        "rating": (("#averageCustomerReviews span.a-icon-alt",), None),
+    },
+    keep_ids=("productTitle", "corePriceDisplay_desktop_feature_div", "averageCustomerReviews"),
+)
+
 
 class AmazonScraper(BaseScraper):
     platform = "Amazon"
+    base_url = AMAZON_BASE_URL
+    specs = (LISTING_SPEC, PRODUCT_SPEC)
 
     def _build_search_url(self, query: str) -> str:
-        return f"{AMAZON_BASE_URL}/s?k={quote_plus(query)}"
+        return f"{self.base_url}/s?k={quote_plus(query)}"
 
     def search(self, query: str, *, limit: int) -> List[ProductRecord]:
         html = self.fetch(self._build_search_url(query))
-        results = list(self._parse_listing(html))
+        results = self.parse_listing(html)
         return self._trim_results(results, limit=limit)
 
     def scrape_product_page(self, url: str) -> Optional[ProductRecord]:
-        html = self.fetch(url)
-        soup = BeautifulSoup(html, "html.parser")
-        title_el = soup.select_one("#productTitle")
-        price_el = soup.select_one("#corePriceDisplay_desktop_feature_div .a-price span.a-offscreen")
-        rating_el = soup.select_one("#averageCustomerReviews span.a-icon-alt")
-        if not title_el:
+        return self.parse_product_page(self.fetch(url), url)
+
+    def _is_cacheable(self, html: str) -> bool:
+        # Robot checks come back as 200 and must not be served from cache for a whole TTL
+        return super()._is_cacheable(html) and "/errors/validateCaptcha" not in html
+
+    def _parse_product_page(self, html: str, url: str) -> Optional[ProductRecord]:
+        fields = self.parser.extract(html, PRODUCT_SPEC)[0]
+        if fields["title"] is None:
             return None
         return ProductRecord.from_raw(
-            name=title_el.get_text(strip=True),
+            name=fields["title"],
             platform=self.platform,
-            price_text=price_el.get_text(strip=True) if price_el else None,
-            rating_text=rating_el.get_text(strip=True) if rating_el else None,
+            price_text=fields["price"],
+            rating_text=fields["rating"],
             url=url,
         )
 
     def _parse_listing(self, html: str) -> List[ProductRecord]:
-        soup = BeautifulSoup(html, "html.parser")
-        cards = soup.select("div[data-component-type='s-search-result']")
         records: List[ProductRecord] = []
-        for card in cards:
-            title_el = card.select_one("h2 a span")
-            link_el = card.select_one("h2 a")
-            price_el = card.select_one("span.a-price span.a-offscreen")
-            rating_el = card.select_one("span.a-icon-alt")
-            if not (title_el and link_el):
+        for fields in self.parser.extract(html, LISTING_SPEC):
+            if fields["title"] is None or fields["link"] is None:
                 continue
-            url = urljoin(AMAZON_BASE_URL, link_el.get("href"))
             record = ProductRecord.from_raw(
-                name=title_el.get_text(strip=True),
+                name=fields["title"],
                 platform=self.platform,
-                price_text=price_el.get_text(strip=True) if price_el else None,
-                rating_text=rating_el.get_text(strip=True) if rating_el else None,
-                url=url,
+                price_text=fields["price"],
+                rating_text=fields["rating"],
+                url=urljoin(self.base_url, fields["link"]),
             )
             records.append(record)
         return records
@@ -1,26 +1,39 @@
 """Base scraper with optional dynamic rendering support."""
 from __future__ import annotations
 
+import asyncio
 import contextlib
 import random
 import time
 from abc import ABC, abstractmethod
-from typing import Iterable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 import requests
 from requests import Response
 from requests.exceptions import RequestException
 
 from scraper_config import (
+    ASYNC_CONNECTIONS_PER_HOST,
+    ASYNC_MAX_CONNECTIONS,
+    HTML_PARSER,
+    HTTP_CACHE_ENABLED,
     PLAYWRIGHT_WAIT_SELECTOR,
     REQUEST_TIMEOUT,
     get_random_headers,
     MAX_RETRIES,
+    PLAYWRIGHT_PAGE_USES,
     RETRY_DELAY_BASE,
     RETRY_DELAY_MAX,
-    MIN_DELAY_BETWEEN_REQUESTS,
-    MAX_DELAY_BETWEEN_REQUESTS,
 )
+from http_cache import CachedResponse, ResponseCache, get_cache, normalize_url
+from html_parsers import ExtractionSpec, ParserBackend, get_parser
+from parse_executor import ParseExecutor
+from product_identity import identity_key
+from rate_limiter import get_limiter, parse_retry_after
+from scrape_metrics import get_metrics, record, span
+from single_flight import flight_key, flights
 from scraper_utils import ProductRecord
 
 try:
@@ -33,15 +46,142 @@ except Exception:  # pragma: no cover - playwright is optional
     sync_playwright = None  # type: ignore
     PlaywrightTimeoutError = Exception  # type: ignore
 
+try:
+    import aiohttp
+
+    AIOHTTP_AVAILABLE = True
+except Exception:  # pragma: no cover - aiohttp is optional
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None  # type: ignore
+
+# Throttling responses slow the host limiter; any other failure backs off on its own
+_THROTTLE_STATUS = (429, 503)
+
+
+def _retry_delay(attempt: int) -> float:
+    """Capped exponential backoff with jitter before retry ``attempt + 1``."""
+    return min(RETRY_DELAY_BASE * (2 ** attempt), RETRY_DELAY_MAX) + random.uniform(0, 1)
+
+
+class _PlaywrightSession:
+    """One lazily launched Chromium reused for every dynamic fetch of a scraper.
+
+    Sync Playwright objects are bound to the thread that created them, so all
+    calls run on a private single-thread executor; that keeps ``fetch`` usable
+    from any thread and from ``asyncio.to_thread``. The page and its context are
+    recycled after ``page_uses`` navigations to shed cookies and memory.
+    """
+
+    def __init__(self, page_uses: int = PLAYWRIGHT_PAGE_USES) -> None:
+        self.page_uses = page_uses
+        self.launches = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="playwright")
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._page = None
+        self._uses = 0
+
+    def _close_page(self) -> None:
+        for closable in (self._page, self._context):
+            if closable is not None:
+                with contextlib.suppress(Exception):
+                    closable.close()
+        self._page = self._context = None
+        self._uses = 0
+
+    def _ensure_page(self):
+        if self._browser is not None and not self._browser.is_connected():
+            self._close_page()
+            self._browser = None
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        if self._browser is None:
+            self._browser = self._playwright.chromium.launch(headless=True)
+            self.launches += 1
+        if self._page is not None and self._uses >= self.page_uses:
+            self._close_page()
+        if self._page is None:
+            self._context = self._browser.new_context()
+            self._page = self._context.new_page()
+        self._uses += 1
+        return self._page
+
+    def _fetch(self, url: str) -> str:
+        page = self._ensure_page()
+        page.goto(url, wait_until="domcontentloaded", timeout=REQUEST_TIMEOUT * 1000)
+        if PLAYWRIGHT_WAIT_SELECTOR:
+            with contextlib.suppress(PlaywrightTimeoutError):
+                page.wait_for_selector(PLAYWRIGHT_WAIT_SELECTOR, timeout=5000)
+        return page.content()
+
+    def fetch(self, url: str) -> str:
+        return self._executor.submit(self._fetch, url).result()
+
+    def _shutdown(self) -> None:
+        self._close_page()
+        if self._browser is not None:
+            with contextlib.suppress(Exception):
+                self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            with contextlib.suppress(Exception):
+                self._playwright.stop()
+            self._playwright = None
+
+    def close(self) -> None:
+        self._executor.submit(self._shutdown).result()
+        self._executor.shutdown(wait=True)
+
+
+@dataclass(slots=True)
+class _Fetched:
+    status: int
+    text: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @classmethod
+    def from_headers(cls, status: int, headers, text: str) -> "_Fetched":
+        return cls(status, text, headers.get("etag"), headers.get("last-modified"))
+
 
 class BaseScraper(ABC):
     platform: str
+    base_url: str
+    specs: Tuple[ExtractionSpec, ...] = ()  # warmed up front by parse workers
 
-    def __init__(self, *, use_dynamic: bool = False, proxies: List[str] = None) -> None:
+    def __init__(
+        self,
+        *,
+        use_dynamic: bool = False,
+        proxies: List[str] = None,
+        parser: Union[str, ParserBackend] = HTML_PARSER,
+        parse_executor: Optional[ParseExecutor] = None,
+        cache: Union[ResponseCache, bool] = HTTP_CACHE_ENABLED,
+        base_url: Optional[str] = None,
+    ) -> None:
         self.session = requests.Session()
+        if base_url:
+            # e.g. a local stand-in storefront for offline benchmarks
+            self.base_url = base_url.rstrip("/")
+        self.parser = get_parser(parser)
+        # When set, parsing runs in its worker processes instead of the fetching thread
+        self.parse_executor = parse_executor
+        # True shares the process-wide on-disk cache; False always hits the network
+        self._cache = cache
         self.use_dynamic = use_dynamic and PLAYWRIGHT_AVAILABLE
         self.proxies = proxies or []
         self.current_proxy_index = 0
+        self._aio_session: Optional["aiohttp.ClientSession"] = None
+        self._playwright_session: Optional[_PlaywrightSession] = None
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        # Opened on first fetch, so scrapers used only for parsing never touch the disk
+        if self._cache is True:
+            self._cache = get_cache()
+        return self._cache or None
 
     def _get_next_proxy(self) -> dict:
         """Get next proxy in rotation, or None if no proxies configured."""
@@ -57,38 +197,51 @@ class BaseScraper(ABC):
         }
 
     def _fetch_with_requests(self, url: str) -> str:
+        return self._get_with_requests(url).text
+
+    def _get_with_requests(self, url: str, extra_headers: Optional[Dict[str, str]] = None) -> _Fetched:
         proxy = self._get_next_proxy()
         
         # Disable SSL verification when using proxies (common issue with free proxies)
         verify_ssl = proxy is None
         
-        # Retry logic with exponential backoff
+        # Every attempt waits on the shared per-host limiter instead of a blind sleep;
+        # 429/503 responses slow the host down for all scrapers in the process
+        limiter = get_limiter(url)
         for attempt in range(MAX_RETRIES):
             try:
-                # Random delay before request (simulate human behavior)
-                if attempt > 0:  # Don't delay on first attempt
-                    delay = min(RETRY_DELAY_BASE * (2 ** attempt), RETRY_DELAY_MAX)
-                    time.sleep(delay + random.uniform(0, 1))
-                else:
-                    time.sleep(random.uniform(MIN_DELAY_BETWEEN_REQUESTS, MAX_DELAY_BETWEEN_REQUESTS))
+                record("rate_limit", limiter.acquire(), self.platform)
                 
                 # Get fresh headers for each request
                 headers = get_random_headers()
+                if extra_headers:
+                    headers.update(extra_headers)
                 
-                response: Response = self.session.get(
-                    url,
-                    headers=headers,
-                    timeout=REQUEST_TIMEOUT,
-                    proxies=proxy,
-                    verify=verify_ssl
-                )
-                response.raise_for_status()
-                return response.text
+                # requests exposes no DNS/connect hooks; both are inside this span
+                with span("request", self.platform, attempt=attempt) as timing:
+                    response: Response = self.session.get(
+                        url,
+                        headers=headers,
+                        timeout=REQUEST_TIMEOUT,
+                        proxies=proxy,
+                        verify=verify_ssl
+                    )
+                    timing.set(status=response.status_code)
+                    timing.received(len(response.content))
+                    if response.status_code in _THROTTLE_STATUS:
+                        limiter.penalize(parse_retry_after(response.headers.get("retry-after")))
+                    response.raise_for_status()
+                limiter.reward()
+                return _Fetched.from_headers(response.status_code, response.headers, response.text)
                 
             except RequestException as e:
                 if attempt == MAX_RETRIES - 1:  # Last attempt
                     raise
+                get_metrics().count("retries", "request", self.platform)
                 print(f"⚠️  Attempt {attempt + 1}/{MAX_RETRIES} failed: {str(e)[:100]}")
+                status = getattr(e.response, "status_code", None)
+                if status not in _THROTTLE_STATUS:
+                    time.sleep(_retry_delay(attempt))
                 continue
         
         raise RequestException("Max retries exceeded")
@@ -96,24 +249,238 @@ class BaseScraper(ABC):
     def _fetch_with_playwright(self, url: str) -> str:
         if not PLAYWRIGHT_AVAILABLE:
             raise RuntimeError("Playwright is not installed; dynamic fetch unavailable.")
-        with contextlib.ExitStack() as stack:
-            playwright = sync_playwright().start()
-            stack.callback(playwright.stop)
-            browser = playwright.chromium.launch(headless=True)
-            stack.callback(browser.close)
-            context = browser.new_context()
-            stack.callback(context.close)
-            page = context.new_page()
-            page.goto(url, wait_until="domcontentloaded", timeout=REQUEST_TIMEOUT * 1000)
-            if PLAYWRIGHT_WAIT_SELECTOR:
-                with contextlib.suppress(PlaywrightTimeoutError):
-                    page.wait_for_selector(PLAYWRIGHT_WAIT_SELECTOR, timeout=5000)
-            return page.content()
+        record("rate_limit", get_limiter(url).acquire(), self.platform)
+        # The browser is launched on first use and kept until close()
+        if self._playwright_session is None:
+            self._playwright_session = _PlaywrightSession()
+        with span("navigation", self.platform, url=url):
+            return self._playwright_session.fetch(url)
 
     def fetch(self, url: str) -> str:
+        # Identical fetches already running in any thread or process are joined, not repeated
+        return flights.do_sync(self._flight_key(url), lambda: self._fetch(url))
+
+    def _flight_key(self, url: str) -> str:
+        return flight_key("fetch", self.platform, normalize_url(url))
+
+    def _fetch(self, url: str) -> str:
+        with span("fetch", self.platform, url=url) as timing:
+            if self.cache is None:
+                if self.use_dynamic:
+                    return self._fetch_with_playwright(url)
+                return self._fetch_with_requests(url)
+            cached = self.cache.get(url, self.platform)
+            if cached is not None and cached.fresh:
+                timing.set(cache="hit")
+                return cached.body
+            if self.use_dynamic:
+                # Rendered DOMs carry no validators; they are simply cached for the TTL
+                text = self._fetch_with_playwright(url)
+                if self._is_cacheable(text):
+                    self.cache.store(url, self.platform, text)
+                return text
+            fetched = self._get_with_requests(url, cached.validators() if cached else None)
+            timing.set(cache="revalidated" if fetched.status == 304 else "miss")
+            return self._settle_cache(url, cached, fetched)
+
+    def _settle_cache(self, url: str, cached: Optional[CachedResponse], fetched: _Fetched) -> str:
+        if fetched.status == 304 and cached is not None:
+            self.cache.mark_revalidated(url, self.platform)
+            return cached.body
+        if self._is_cacheable(fetched.text):
+            self.cache.store(url, self.platform, fetched.text,
+                             etag=fetched.etag, last_modified=fetched.last_modified)
+        return fetched.text
+
+    def _is_cacheable(self, html: str) -> bool:
+        """Whether a 200 response is a real page; overridden for sites that serve 200 block pages."""
+        return bool(html.strip())
+
+    def _get_aio_session(self) -> "aiohttp.ClientSession":
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp is not installed; async fetch unavailable.")
+        if self._aio_session is None or self._aio_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=ASYNC_MAX_CONNECTIONS,
+                limit_per_host=ASYNC_CONNECTIONS_PER_HOST,
+                ttl_dns_cache=300,
+            )
+            self._aio_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                trace_configs=[self._trace_config()],
+            )
+        return self._aio_session
+
+    def _trace_config(self) -> "aiohttp.TraceConfig":
+        """Report DNS lookups and new connections of the aiohttp engine as their own stages."""
+        platform = self.platform
+        config = aiohttp.TraceConfig()
+
+        def timer(stage: str):
+            async def start(session, context, params) -> None:
+                setattr(context, stage, time.perf_counter())
+
+            async def end(session, context, params) -> None:
+                started = getattr(context, stage, None)
+                if started is not None:
+                    record(stage, time.perf_counter() - started, platform)
+
+            return start, end
+
+        dns_start, dns_end = timer("dns")
+        connect_start, connect_end = timer("connect")
+        config.on_dns_resolvehost_start.append(dns_start)
+        config.on_dns_resolvehost_end.append(dns_end)
+        config.on_connection_create_start.append(connect_start)
+        config.on_connection_create_end.append(connect_end)
+        return config
+
+    async def _fetch_with_aiohttp(self, url: str) -> str:
+        return (await self._get_with_aiohttp(url)).text
+
+    async def _get_with_aiohttp(self, url: str, extra_headers: Optional[Dict[str, str]] = None) -> _Fetched:
+        session = self._get_aio_session()
+        proxy = self._get_next_proxy()
+        proxy_url = proxy["https"] if proxy else None
+        limiter = get_limiter(url)
+        for attempt in range(MAX_RETRIES):
+            try:
+                record("rate_limit", await limiter.acquire_async(), self.platform)
+                headers = get_random_headers()
+                if extra_headers:
+                    headers.update(extra_headers)
+                with span("request", self.platform, attempt=attempt) as timing:
+                    async with session.get(
+                        url,
+                        headers=headers,
+                        proxy=proxy_url,
+                        # Same as the requests path: free proxies rarely have valid certificates
+                        ssl=False if proxy_url else None,
+                    ) as response:
+                        timing.set(status=response.status)
+                        if response.status in _THROTTLE_STATUS:
+                            limiter.penalize(parse_retry_after(response.headers.get("retry-after")))
+                        response.raise_for_status()
+                        # gzip/deflate (and br when brotli is installed) are decoded by aiohttp
+                        body = await response.read()
+                        timing.received(len(body))
+                        text = body.decode(response.get_encoding(), errors="replace")
+                        fetched = _Fetched.from_headers(response.status, response.headers, text)
+                limiter.reward()
+                return fetched
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                get_metrics().count("retries", "request", self.platform)
+                print(f"⚠️  Attempt {attempt + 1}/{MAX_RETRIES} failed: {str(e)[:100]}")
+                status = e.status if isinstance(e, aiohttp.ClientResponseError) else None
+                if status not in _THROTTLE_STATUS:
+                    await asyncio.sleep(_retry_delay(attempt))
+        raise RuntimeError("Max retries exceeded")
+
+    async def fetch_async(self, url: str) -> str:
+        """Fetch on the async engine; many calls can run concurrently on one session."""
         if self.use_dynamic:
-            return self._fetch_with_playwright(url)
-        return self._fetch_with_requests(url)
+            return await asyncio.to_thread(self.fetch, url)
+        return await flights.do(self._flight_key(url), lambda: self._fetch_async(url))
+
+    async def _fetch_async(self, url: str) -> str:
+        with span("fetch", self.platform, url=url) as timing:
+            if self.cache is None:
+                return await self._fetch_with_aiohttp(url)
+            cached = await asyncio.to_thread(self.cache.get, url, self.platform)
+            if cached is not None and cached.fresh:
+                timing.set(cache="hit")
+                return cached.body
+            fetched = await self._get_with_aiohttp(url, cached.validators() if cached else None)
+            timing.set(cache="revalidated" if fetched.status == 304 else "miss")
+            return await asyncio.to_thread(self._settle_cache, url, cached, fetched)
+
+    def close(self) -> None:
+        """Release the HTTP session and any browser started for dynamic fetches."""
+        if self._playwright_session is not None:
+            self._playwright_session.close()
+            self._playwright_session = None
+        self.session.close()
+
+    def __enter__(self) -> "BaseScraper":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    async def aclose(self) -> None:
+        """Async counterpart of close() that also closes the aiohttp session."""
+        if self._aio_session is not None:
+            await self._aio_session.close()
+            self._aio_session = None
+        await asyncio.to_thread(self.close)
+
+    async def __aenter__(self) -> "BaseScraper":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    # Parse spans include the round trip to a worker process when parse_executor is set
+
+    def parse_listing(self, html: str) -> List[ProductRecord]:
+        with span("parse", self.platform, page="listing"):
+            if self.parse_executor is None:
+                return self._parse_listing(html)
+            return self.parse_executor.parse_listing(type(self), html)
+
+    def parse_product_page(self, html: str, url: str) -> Optional[ProductRecord]:
+        with span("parse", self.platform, page="product"):
+            if self.parse_executor is None:
+                return self._parse_product_page(html, url)
+            return self.parse_executor.parse_product_page(type(self), html, url)
+
+    async def parse_listing_async(self, html: str) -> List[ProductRecord]:
+        with span("parse", self.platform, page="listing"):
+            if self.parse_executor is None:
+                return self._parse_listing(html)
+            return await self.parse_executor.parse_listing_async(type(self), html)
+
+    async def parse_product_page_async(self, html: str, url: str) -> Optional[ProductRecord]:
+        with span("parse", self.platform, page="product"):
+            if self.parse_executor is None:
+                return self._parse_product_page(html, url)
+            return await self.parse_executor.parse_product_page_async(type(self), html, url)
+
+    async def search_async(self, query: str, *, limit: int) -> List[ProductRecord]:
+        html = await self.fetch_async(self._build_search_url(query))
+        return self._trim_results(await self.parse_listing_async(html), limit=limit)
+
+    async def search_stream(self, query: str, *, limit: int) -> AsyncIterator[ProductRecord]:
+        """Yield deduplicated search results one by one, so callers can write each out at once."""
+        html = await self.fetch_async(self._build_search_url(query))
+        for record in self._trim_results(await self.parse_listing_async(html), limit=limit):
+            yield record
+
+    async def scrape_product_page_async(self, url: str) -> Optional[ProductRecord]:
+        html = await self.fetch_async(url)
+        return await self.parse_product_page_async(html, url)
+
+    async def search_many(
+        self, queries: Sequence[str], *, limit: int
+    ) -> Dict[str, Union[List[ProductRecord], BaseException]]:
+        """Search all queries concurrently; a failed query maps to its exception."""
+        results = await asyncio.gather(
+            *(self.search_async(query, limit=limit) for query in queries),
+            return_exceptions=True,
+        )
+        return dict(zip(queries, results))
+
+    async def scrape_product_pages(
+        self, urls: Sequence[str]
+    ) -> List[Union[Optional[ProductRecord], BaseException]]:
+        """Scrape all product pages concurrently, in input order."""
+        return await asyncio.gather(
+            *(self.scrape_product_page_async(url) for url in urls),
+            return_exceptions=True,
+        )
 
     @abstractmethod
     def search(self, query: str, *, limit: int) -> List[ProductRecord]:
@@ -123,9 +490,27 @@ class BaseScraper(ABC):
     def scrape_product_page(self, url: str) -> Optional[ProductRecord]:
         raise NotImplementedError
 
+    @abstractmethod
+    def _build_search_url(self, query: str) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _parse_listing(self, html: str) -> List[ProductRecord]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _parse_product_page(self, html: str, url: str) -> Optional[ProductRecord]:
+        raise NotImplementedError
+
     def _trim_results(self, results: Iterable[ProductRecord], *, limit: int) -> List[ProductRecord]:
         trimmed: List[ProductRecord] = []
+        seen = set()
         for record in results:
+            # The same ASIN/pid often appears twice (sponsored and organic cards)
+            key = identity_key(record.url, record.platform, record.productName)
+            if key in seen:
+                continue
+            seen.add(key)
             trimmed.append(record)
             if len(trimmed) >= limit:
                 break
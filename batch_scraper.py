@@ -0,0 +1,310 @@
+"""Batch scraper - run many product names/URLs through a bounded async worker pool"""
+import asyncio
+import argparse
+import contextlib
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TextIO, Union
+from urllib.parse import urlparse
+
+# Add headless_scraper to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from headless_scraper.browser_pool import BrowserPool
+from headless_scraper.config import DEFAULT_PRODUCT_LIMIT, PLATFORM_TIMEOUT
+from headless_scraper.platforms import PLATFORM_SCRAPERS, PlatformResult, scrape_platform
+from history_store import HistoryStore
+from observation_log import ObservationLog
+from parse_executor import ParseExecutor
+from product_identity import get_index
+from scraper_config import HISTORY_BATCH_SIZE, HTTP_CACHE_TTL, PARSE_WORKERS
+from scraper_utils import NDJSONWriter
+
+# Default number of in-flight scrapes per platform
+DEFAULT_PLATFORM_CONCURRENCY = 2
+
+
+def read_items(source: TextIO) -> List[str]:
+    """Read one product name or URL per line; blank lines and # comments are skipped"""
+    items = []
+    for line in source:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            items.append(line)
+    return items
+
+
+def platform_for_url(url: str, platforms: Iterable[str] = PLATFORM_SCRAPERS) -> Optional[str]:
+    """Map a product URL to its platform key, or None if it is not a URL we know"""
+    host = urlparse(url).netloc.lower()
+    for platform in platforms:
+        if platform in host:
+            return platform
+    return None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def page_scraper_class(platform: str):
+    """HTML scraper class for product detail pages"""
+    from amazon_scraper import AmazonScraper
+    from flipkart_scraper import FlipkartScraper
+
+    return {'amazon': AmazonScraper, 'flipkart': FlipkartScraper}[platform]
+
+
+def page_scraper_for(platform: str, parse_executor: Optional[ParseExecutor] = None):
+    """HTML scraper for product detail pages; URLs are fetched on its async engine"""
+    return page_scraper_class(platform)(parse_executor=parse_executor)
+
+
+async def scrape_url(scraper, platform: str, url: str) -> PlatformResult:
+    """
+    Scrape one product detail page with the HTML scrapers' async engine.
+
+    A product already scraped within the cache TTL under any URL (same ASIN
+    or pid) is answered from the product index.
+    """
+    started = time.perf_counter()
+    result = PlatformResult(platform=platform)
+    try:
+        indexed = get_index().get_url(url, platform, max_age=HTTP_CACHE_TTL)
+        if indexed is not None:
+            result.products = [indexed]
+            result.stats['cache'] = 'hit'
+        else:
+            record = await scraper.scrape_product_page_async(url)
+            if record is not None:
+                result.products = [record.to_payload()]
+                get_index().add(result.products[0])
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+class BatchRunner:
+    """
+    Scrape a list of items with `workers` items in flight and at most
+    `concurrency[platform]` scrapes per platform at any moment.
+
+    Each finished (item, platform) result is written to `out` as one JSON line
+    as soon as it completes.
+    """
+
+    def __init__(self, out: Union[NDJSONWriter, TextIO], workers: int = 4, limit: int = DEFAULT_PRODUCT_LIMIT,
+                 concurrency: Optional[Dict[str, int]] = None,
+                 platforms: Optional[List[str]] = None,
+                 timeout: float = PLATFORM_TIMEOUT,
+                 parse_workers: int = PARSE_WORKERS,
+                 history: Optional[HistoryStore] = None,
+                 obs_log: Optional[ObservationLog] = None):
+        self.out = out if isinstance(out, NDJSONWriter) else NDJSONWriter(out)
+        self.workers = workers
+        self.limit = limit
+        self.timeout = timeout
+        self.platforms = platforms or list(PLATFORM_SCRAPERS)
+        concurrency = concurrency or {}
+        self.semaphores = {
+            p: asyncio.Semaphore(concurrency.get(p, DEFAULT_PLATFORM_CONCURRENCY))
+            for p in self.platforms
+        }
+        # Enough browsers for every platform slot to hold a page at once
+        self.pool = BrowserPool(size=sum(
+            concurrency.get(p, DEFAULT_PLATFORM_CONCURRENCY) for p in self.platforms
+        ))
+        # One HTML scraper per platform so all URL fetches share its connection pool
+        self.page_scrapers = {}
+        # Product pages are parsed in worker processes so parsing never stalls the fetch loop
+        self.parse_executor = ParseExecutor(
+            parse_workers, scrapers=[page_scraper_class(p) for p in self.platforms]
+        ) if parse_workers > 0 else None
+        # Observations for the local history store and observation log, written in batches off the event loop
+        self.history = history
+        self.obs_log = obs_log
+        self._history_rows: List[Dict] = []
+        self.latencies: List[float] = []
+        self.products_found = 0
+        self.failures = 0
+
+    def _emit(self, item: str, result: PlatformResult):
+        line = {
+            "item": item,
+            "platform": result.platform,
+            "elapsed": round(result.elapsed, 3),
+            "error": result.error,
+            "products": result.products,
+        }
+        self.out.write(line)
+        if self.history is not None or self.obs_log is not None:
+            self._history_rows.extend(result.products)
+
+    async def _flush_history(self, force: bool = False):
+        if not self._history_rows:
+            return
+        if force or len(self._history_rows) >= HISTORY_BATCH_SIZE:
+            rows, self._history_rows = self._history_rows, []
+            if self.history is not None:
+                await asyncio.to_thread(self.history.add, rows)
+            if self.obs_log is not None:
+                await asyncio.to_thread(self.obs_log.append, rows)
+
+    async def _scrape_one(self, item: str, platform: str, url: bool) -> PlatformResult:
+        async with self.semaphores[platform]:
+            if url:
+                if platform not in self.page_scrapers:
+                    self.page_scrapers[platform] = page_scraper_for(platform, self.parse_executor)
+                return await scrape_url(self.page_scrapers[platform], platform, item)
+            return await scrape_platform(platform, item, self.limit, pool=self.pool,
+                                         timeout=self.timeout)
+
+    async def _process(self, item: str):
+        started = time.perf_counter()
+        url_platform = platform_for_url(item, self.platforms) if item.startswith('http') else None
+        if url_platform:
+            jobs = [self._scrape_one(item, url_platform, url=True)]
+        else:
+            jobs = [self._scrape_one(item, p, url=False) for p in self.platforms]
+
+        for future in asyncio.as_completed(jobs):
+            result = await future
+            self.products_found += len(result.products)
+            if not result.ok:
+                self.failures += 1
+            self._emit(item, result)
+            await self._flush_history()
+        self.latencies.append(time.perf_counter() - started)
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            started = time.perf_counter()
+            try:
+                await self._process(item)
+            except Exception as e:
+                # One broken item (locked history DB, failed write, bad URL) must not stop this worker,
+                # or queue.join() would wait forever once every worker had died
+                self.failures += 1
+                error = f"{type(e).__name__}: {e}"
+                print(f"[ERROR] {item}: {error}", file=sys.stderr)
+                try:
+                    self.out.write({"item": item, "platform": None,
+                                    "elapsed": round(time.perf_counter() - started, 3),
+                                    "error": error, "products": []})
+                except Exception:
+                    pass
+            finally:
+                queue.task_done()
+
+    async def run(self, items: Iterable[str]) -> Dict:
+        """Scrape every item and return throughput statistics"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+        total = queue.qsize()
+
+        started = time.perf_counter()
+        # Browsers launch lazily on the first search, so URL-only batches never start one
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.workers)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self.pool.close()
+            for scraper in self.page_scrapers.values():
+                await scraper.aclose()
+            if self.parse_executor is not None:
+                await asyncio.to_thread(self.parse_executor.close)
+            await self._flush_history(force=True)
+        wall = time.perf_counter() - started
+
+        return {
+            "items": total,
+            "products": self.products_found,
+            "failures": self.failures,
+            "seconds": round(wall, 3),
+            "itemsPerSec": round(total / wall, 3) if wall else 0.0,
+            "p50": round(percentile(self.latencies, 50), 3),
+            "p95": round(percentile(self.latencies, 95), 3),
+        }
+
+
+def print_summary(stats: Dict, stream: TextIO):
+    print(f"\n{'='*60}", file=stream)
+    print("BATCH COMPLETE", file=stream)
+    print(f"{'='*60}", file=stream)
+    print(f"Items:       {stats['items']} ({stats['failures']} platform failures)", file=stream)
+    print(f"Products:    {stats['products']}", file=stream)
+    print(f"Wall time:   {stats['seconds']:.1f}s", file=stream)
+    print(f"Throughput:  {stats['itemsPerSec']:.2f} products/sec", file=stream)
+    print(f"Latency:     p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s", file=stream)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch scraper for many products")
+    parser.add_argument("--input", "-i", default="-",
+                        help="File with one product name or URL per line ('-' for stdin)")
+    parser.add_argument("--output", "-o", default="-",
+                        help="JSON-lines results file ('-' for stdout)")
+    parser.add_argument("--gzip", action="store_true", help="Gzip the output (implied by a .gz file name)")
+    parser.add_argument("--workers", "-w", type=int, default=4, help="Items scraped at the same time")
+    parser.add_argument("--limit", "-l", type=int, default=DEFAULT_PRODUCT_LIMIT,
+                        help="Products per platform per item")
+    parser.add_argument("--platforms", "-p", nargs="+", choices=list(PLATFORM_SCRAPERS),
+                        default=list(PLATFORM_SCRAPERS), help="Platforms to scrape")
+    for platform in PLATFORM_SCRAPERS:
+        parser.add_argument(f"--{platform}-concurrency", type=int, default=DEFAULT_PLATFORM_CONCURRENCY,
+                            help=f"Concurrent {platform.title()} scrapes (default: {DEFAULT_PLATFORM_CONCURRENCY})")
+    parser.add_argument("--platform-timeout", type=float, default=PLATFORM_TIMEOUT,
+                        help="Seconds allowed per platform scrape")
+    parser.add_argument("--history-db", help="Also append results to this local SQLite price history")
+    parser.add_argument("--obs-log", help="Also append results to this columnar observation log directory")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help=f"Processes parsing product-page HTML, 0 to parse inline (default: {PARSE_WORKERS})")
+
+    args = parser.parse_args()
+
+    if args.input == "-":
+        items = read_items(sys.stdin)
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            items = read_items(f)
+    if not items:
+        print("[ERROR] No items to scrape", file=sys.stderr)
+        sys.exit(1)
+
+    concurrency = {p: getattr(args, f"{p}_concurrency") for p in PLATFORM_SCRAPERS}
+
+    with contextlib.ExitStack() as stack:
+        out = stack.enter_context(NDJSONWriter(args.output, compress=args.gzip or None))
+        if args.output == "-":
+            # Keep scraper log lines off stdout so it carries only results
+            stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+
+        history = stack.enter_context(HistoryStore(args.history_db)) if args.history_db else None
+        runner = BatchRunner(out, workers=args.workers, limit=args.limit,
+                             concurrency=concurrency, platforms=args.platforms,
+                             timeout=args.platform_timeout, parse_workers=args.parse_workers,
+                             history=history,
+                             obs_log=ObservationLog(args.obs_log) if args.obs_log else None)
+        try:
+            stats = asyncio.run(runner.run(items))
+        except KeyboardInterrupt:
+            print("\n[INFO] Batch interrupted by user", file=sys.stderr)
+            sys.exit(130)
+
+    print_summary(stats, sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Offline benchmarks for the scraper pipeline; run them with `python -m benchmarks.<name>` or `python benchmarks/<name>.py`."""
@@ -0,0 +1,97 @@
+"""Local stand-in for the Amazon and Flipkart storefronts, serving the recorded fixture pages."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+from pathlib import Path
+from typing import Dict
+
+from aiohttp import web
+
+FIXTURES = Path(__file__).with_name("fixtures")
+
+
+class FakeStorefront:
+    """Serve ``benchmarks/fixtures`` on the paths the real sites use.
+
+    ``/s`` and ``/dp/<asin>`` (with or without a slug) answer with the Amazon
+    search and product pages, ``/search`` and ``/<slug>/p/<item>`` with the
+    Flipkart ones, so one server stands in for both when passed as a
+    scraper's ``base_url``. Every request waits ``latency`` seconds plus up
+    to ``jitter``; ``error_rate`` of requests answer HTTP 503. Counters are
+    served as JSON on ``/__stats``.
+    """
+
+    def __init__(self, *, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.pages: Dict[str, bytes] = {
+            name: (FIXTURES / f"{name}.html").read_bytes()
+            for name in ("amazon_search", "amazon_product", "flipkart_search", "flipkart_product")
+        }
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/s", self._page("amazon_search"))
+        app.router.add_get("/dp/{asin}", self._page("amazon_product"))
+        app.router.add_get("/{slug}/dp/{asin}", self._page("amazon_product"))
+        app.router.add_get("/{slug}/dp/{asin}/{tail:.*}", self._page("amazon_product"))
+        app.router.add_get("/search", self._page("flipkart_search"))
+        app.router.add_get("/{slug}/p/{item}", self._page("flipkart_product"))
+        app.router.add_get("/__stats", self._stats)
+        return app
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    def _page(self, name: str):
+        async def handle(request: web.Request) -> web.Response:
+            self.requests += 1
+            delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if delay:
+                await asyncio.sleep(delay)
+            if self.error_rate and random.random() < self.error_rate:
+                self.errors += 1
+                return web.Response(status=503, text="injected failure")
+            body = self.pages[name]
+            self.bytes_sent += len(body)
+            return web.Response(body=body, content_type="text/html", charset="utf-8")
+
+        return handle
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "errors": self.errors, "bytesSent": self.bytes_sent}
+
+
+async def start_storefront(host: str = "127.0.0.1", port: int = 0,
+                           **options: float) -> tuple[FakeStorefront, web.AppRunner, str]:
+    """Start a storefront on ``port`` (0 picks a free one); returns (storefront, runner, base_url)."""
+    storefront = FakeStorefront(**options)
+    runner = web.AppRunner(storefront.build_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    return storefront, runner, f"http://{host}:{bound_port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stand-in Amazon/Flipkart storefront for offline benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many more seconds, at random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    storefront = FakeStorefront(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    web.run_app(storefront.build_app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Measure bulk price/rating normalization against the per-item parsers it replaces.
+
+    python -m benchmarks.normalize_bench --records 1000000
+
+The previous per-item paths are reproduced here: the original
+``normalize_price`` regex, ``headless_scraper.utils.parse_price`` and the
+Flipkart headless ``split(',')`` parse. The current scalar functions are
+checked against the vectorized ones on every sample.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# Repo root on the path, so `python benchmarks/<name>.py` works as well as `-m`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bulk_normalize import normalize_prices, normalize_ratings
+from scraper_utils import normalize_price, normalize_rating
+
+PRICES = ["₹1,09,900", "₹79,999.00", "₹ 2,49,999", "Rs. 1,299", "₹549", "$99.99", "₹1,34,900.50",
+          "M.R.P: ₹1,59,900", "", "Currently unavailable"]
+RATINGS = ["4.5 out of 5 stars", "4.3", "4.6\n(12,345)", "3.9 out of 5", "", "New"]
+
+_OLD_PRICE = re.compile(r"[\d,.]+")
+
+
+def old_normalize_price(raw: str) -> Optional[float]:
+    match = _OLD_PRICE.search(raw.replace("\xa0", " "))
+    if not match:
+        return None
+    try:
+        return float(match.group().replace(",", ""))
+    except ValueError:
+        return None
+
+
+def old_parse_price(text: str) -> Optional[float]:
+    if not text:
+        return None
+    try:
+        numeric = re.sub(r"[^\d.]", "", text)
+        if not numeric:
+            return None
+        if numeric.count(".") > 1:
+            numeric = numeric.replace(".", "")
+        return float(numeric)
+    except ValueError:
+        return None
+
+
+def old_flipkart_price(text: str) -> float:
+    price_str = text.replace("₹", "").replace("Rs", "").strip()
+    try:
+        return float(price_str.split(",")[0]) if price_str else 0.0
+    except (ValueError, IndexError):
+        return 0.0
+
+
+def _same(expected: Optional[float], got: float) -> bool:
+    return math.isnan(got) if expected is None else expected == got
+
+
+def run(count: int) -> List[dict]:
+    rng = random.Random(0)
+    prices = [rng.choice(PRICES) for _ in range(count)]
+    ratings = [rng.choice(RATINGS) for _ in range(count)]
+    results = []
+
+    def record(kind: str, variant: str, fn: Callable[[], object]) -> None:
+        started = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - started
+        results.append({"kind": kind, "variant": variant, "seconds": seconds, "perSec": count / seconds})
+
+    record("price", "old normalize_price", lambda: [old_normalize_price(p) for p in prices])
+    record("price", "old parse_price", lambda: [old_parse_price(p) for p in prices])
+    record("price", "old flipkart split", lambda: [old_flipkart_price(p) for p in prices])
+    record("price", "normalize_price", lambda: [normalize_price(p) for p in prices])
+    record("price", "normalize_prices", lambda: normalize_prices(prices))
+    record("rating", "normalize_rating", lambda: [normalize_rating(r) for r in ratings])
+    record("rating", "normalize_ratings", lambda: normalize_ratings(ratings))
+
+    for raw, got in zip(PRICES, normalize_prices(PRICES).tolist()):
+        assert _same(normalize_price(raw), got), raw
+    for raw, got in zip(RATINGS, normalize_ratings(RATINGS).tolist()):
+        assert _same(normalize_rating(raw), got), raw
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark price and rating normalization")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.records)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'kind':<8}{'variant':<22}{'seconds':>10}{'values/s':>14}")
+    for row in results:
+        print(f"{row['kind']:<8}{row['variant']:<22}{row['seconds']:>10.2f}{row['perSec']:>14,.0f}")
+    print("\nold per-item results for the samples (normalize_prices is the reference):")
+    for raw, new in zip(PRICES, normalize_prices(PRICES).tolist()):
+        print(f"  {raw!r:<24} regex={old_normalize_price(raw)!s:<10} parse_price={old_parse_price(raw)!s:<10}"
+              f" flipkart={old_flipkart_price(raw)!s:<8} now={new}")
+
+
+if __name__ == "__main__":
+    main()
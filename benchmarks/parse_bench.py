@@ -0,0 +1,85 @@
+"""Measure listing-parse throughput inline, on threads, and on the parse process pool.
+
+    python -m benchmarks.parse_bench --pages 64 --workers 1 2 4
+
+Pages are the Amazon search fixture with its result cards repeated until
+the page is about ``--page-kb`` large, like a real search page.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+# Repo root on the path, so `python benchmarks/<name>.py` works as well as `-m`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from amazon_scraper import AmazonScraper
+from parse_executor import ParseExecutor
+
+FIXTURE = Path(__file__).with_name("fixtures") / "amazon_search.html"
+_CARD = re.compile(r'\s*<div data-component-type="s-search-result".*?\n    </div>\n', re.S)
+
+
+def build_page(size_kb: int) -> str:
+    html = FIXTURE.read_text(encoding="utf-8")
+    cards = "".join(_CARD.findall(html))
+    first = _CARD.search(html).start()
+    repeats = max(1, size_kb * 1024 // len(cards))
+    return html[:first] + cards * repeats + html[first:]
+
+
+def run(pages: int, page_kb: int, workers: List[int], parser: str) -> List[dict]:
+    page = build_page(page_kb)
+    batch = [page] * pages
+    scraper = AmazonScraper(parser=parser)
+    expected = len(scraper._parse_listing(page))
+    results = []
+
+    def record(mode: str, count: int, seconds: float, records: int) -> None:
+        results.append({"mode": mode, "workers": count, "seconds": seconds,
+                        "pagesPerSec": pages / seconds, "ok": records == expected * pages})
+
+    started = time.perf_counter()
+    parsed = [scraper._parse_listing(html) for html in batch]
+    record("inline", 1, time.perf_counter() - started, sum(map(len, parsed)))
+
+    for count in workers:
+        with ThreadPoolExecutor(max_workers=count) as threads:
+            started = time.perf_counter()
+            parsed = list(threads.map(scraper._parse_listing, batch))
+            record("threads", count, time.perf_counter() - started, sum(map(len, parsed)))
+
+        with ParseExecutor(count, parser=parser, scrapers=[AmazonScraper]) as executor:
+            executor.map_listings(AmazonScraper, [page] * count)  # spawn and warm the workers
+            started = time.perf_counter()
+            parsed = executor.map_listings(AmazonScraper, batch)
+            record("processes", count, time.perf_counter() - started, sum(map(len, parsed)))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark listing-parse throughput offline")
+    parser.add_argument("--pages", type=int, default=48)
+    parser.add_argument("--page-kb", type=int, default=1024, help="Approximate size of each page")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--parser", default="bs4", help="HTML parser backend (see html_parsers.get_parser)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.pages, args.page_kb, args.workers, args.parser)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':<12}{'workers':>8}{'seconds':>10}{'pages/s':>10}  ok")
+    for row in results:
+        print(f"{row['mode']:<12}{row['workers']:>8}{row['seconds']:>10.2f}{row['pagesPerSec']:>10.1f}"
+              f"  {'ok' if row['ok'] else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
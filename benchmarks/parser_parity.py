@@ -0,0 +1,102 @@
+"""Check every HTML parser backend against the BeautifulSoup reference and time them.
+
+    python -m benchmarks.parser_parity --repeat 200
+
+The reference is a full ``html.parser`` parse (the scrapers' original
+behaviour). Exits non-zero if any backend extracts different records from
+the fixtures in ``benchmarks/fixtures``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Repo root on the path, so `python benchmarks/<name>.py` works as well as `-m`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from amazon_scraper import AmazonScraper
+from base_scraper import BaseScraper
+from flipkart_scraper import FlipkartScraper
+from html_parsers import SoupBackend, available_parsers, get_parser
+
+FIXTURES = Path(__file__).with_name("fixtures")
+PRODUCT_URL = "https://example.invalid/p/1"
+SCRAPERS = {"amazon": AmazonScraper, "flipkart": FlipkartScraper}
+
+
+def _cases() -> Dict[str, tuple[str, str, str]]:
+    """case name -> (platform, page kind, html)"""
+    cases = {}
+    for platform in SCRAPERS:
+        for kind in ("search", "product"):
+            path = FIXTURES / f"{platform}_{kind}.html"
+            cases[path.stem] = (platform, kind, path.read_text(encoding="utf-8"))
+    return cases
+
+
+def _parse(scraper: BaseScraper, kind: str, html: str) -> List[dict]:
+    if kind == "search":
+        records = scraper._parse_listing(html)
+    else:
+        record = scraper._parse_product_page(html, PRODUCT_URL)
+        records = [record] if record else []
+    return [{k: v for k, v in record.to_payload().items() if k != "timestamp"} for record in records]
+
+
+def _time(fn: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def run(repeat: int) -> List[dict]:
+    backends = [SoupBackend("html.parser", partial=False)]
+    for name in available_parsers():
+        backends.append(get_parser(name, partial=True))
+        if name == "bs4-lxml":
+            backends.append(get_parser(name, partial=False))
+
+    rows = []
+    for case, (platform, kind, html) in _cases().items():
+        expected = None
+        for backend in backends:
+            scraper = SCRAPERS[platform](parser=backend)
+            got = _parse(scraper, kind, html)
+            if expected is None:
+                expected = got
+            seconds = _time(lambda: _parse(scraper, kind, html), repeat)
+            rows.append({"case": case, "parser": backend.name, "records": len(got),
+                         "ms": seconds * 1000, "match": got == expected,
+                         "diff": None if got == expected else {"expected": expected, "got": got}})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare HTML parser backends on the offline fixtures")
+    parser.add_argument("--repeat", type=int, default=100, help="Parses per backend and fixture when timing")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rows = run(args.repeat)
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+    else:
+        print(f"{'case':<18}{'parser':<26}{'records':>8}{'ms/parse':>10}{'speedup':>9}  match")
+        baseline: Dict[str, float] = {}
+        for row in rows:
+            base = baseline.setdefault(row["case"], row["ms"])
+            print(f"{row['case']:<18}{row['parser']:<26}{row['records']:>8}{row['ms']:>10.3f}"
+                  f"{base / row['ms']:>8.1f}x  {'ok' if row['match'] else 'MISMATCH'}")
+        for row in rows:
+            if not row["match"]:
+                print(f"\n{row['case']} / {row['parser']}:\n{json.dumps(row['diff'], indent=2, ensure_ascii=False)}")
+    if not all(row["match"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
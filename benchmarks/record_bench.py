@@ -0,0 +1,135 @@
+"""Measure per-record cost and memory of ProductRecord against the previous representation.
+
+    python -m benchmarks.record_bench --records 1000000 --products 5000
+
+The previous record kept a full ISO timestamp string per record, held a
+fresh copy of every name and platform string, and built payloads through
+``dataclasses.asdict``. Names are rebuilt for every record, as a parser
+produces them, so only interning can share them.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# Repo root on the path, so `python benchmarks/<name>.py` works as well as `-m`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scraper_utils import MSGPACK_AVAILABLE, ORJSON_AVAILABLE, ProductRecord, dumps_json, pack_msgpack
+
+PLATFORMS = ("Amazon", "Flipkart")
+
+
+@dataclass(slots=True)
+class LegacyRecord:
+    productName: str
+    platform: str
+    price: Optional[float]
+    rating: Optional[float]
+    url: str
+    timestamp: str
+
+    def to_payload(self) -> dict:
+        payload = asdict(self)
+        if self.price is not None:
+            payload["price"] = f"{self.price:.2f}"
+        if self.rating is not None:
+            payload["rating"] = f"{self.rating:.1f}"
+        return payload
+
+
+def _fields(i: int, products: int) -> tuple:
+    n = i % products
+    # "".join builds a new string object each time, like text pulled out of a page
+    return ("".join(("Product ", str(n))), "".join(PLATFORMS[n % 2]), 1000.0 + n, 4.0 + (n % 10) / 10,
+            f"https://www.amazon.in/dp/B{n:09d}")
+
+
+def build_legacy(count: int, products: int) -> List[LegacyRecord]:
+    return [
+        LegacyRecord(name, platform, price, rating, url, datetime.now(timezone.utc).isoformat())
+        for name, platform, price, rating, url in (_fields(i, products) for i in range(count))
+    ]
+
+
+def build_compact(count: int, products: int) -> List[ProductRecord]:
+    return [
+        ProductRecord(name, platform, price, rating, url, int(time.time()))
+        for name, platform, price, rating, url in (_fields(i, products) for i in range(count))
+    ]
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def _memory(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    kept = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def run(count: int, products: int) -> List[dict]:
+    rows = []
+
+    def record(stage: str, variant: str, seconds: float, memory: Optional[int] = None) -> None:
+        rows.append({"stage": stage, "variant": variant, "nsPerRecord": seconds / count * 1e9,
+                     "bytesPerRecord": None if memory is None else memory / count})
+
+    legacy = build_legacy(count, products)
+    compact = build_compact(count, products)
+    record("build", "legacy", _timed(lambda: build_legacy(count, products)),
+           _memory(lambda: build_legacy(count, products)))
+    record("build", "compact", _timed(lambda: build_compact(count, products)),
+           _memory(lambda: build_compact(count, products)))
+
+    record("payload", "legacy asdict", _timed(lambda: [r.to_payload() for r in legacy]))
+    record("payload", "compact", _timed(lambda: [r.to_payload() for r in compact]))
+
+    record("serialize", "legacy json.dumps",
+           _timed(lambda: [json.dumps(r.to_payload(), ensure_ascii=False) for r in legacy]))
+    record("serialize", "orjson" if ORJSON_AVAILABLE else "json compact",
+           _timed(lambda: [dumps_json(r.to_payload()) for r in compact]))
+    if MSGPACK_AVAILABLE:
+        record("serialize", "msgpack", _timed(lambda: [pack_msgpack(r.to_payload()) for r in compact]))
+
+    # Same payload either way, apart from the timestamp's precision
+    for old, new in zip(legacy[:1000], compact[:1000]):
+        old_payload, new_payload = old.to_payload(), new.to_payload()
+        del old_payload["timestamp"], new_payload["timestamp"]
+        assert old_payload == new_payload
+        payload = new.to_payload()
+        assert dumps_json(payload) == json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ProductRecord construction, memory and serialization")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, default=5000, help="Distinct products among the records")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.records, args.products)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'stage':<11}{'variant':<20}{'ns/record':>11}{'bytes/record':>14}")
+    for row in results:
+        size = "" if row["bytesPerRecord"] is None else f"{row['bytesPerRecord']:.0f}"
+        print(f"{row['stage']:<11}{row['variant']:<20}{row['nsPerRecord']:>11.0f}{size:>14}")
+
+
+if __name__ == "__main__":
+    main()
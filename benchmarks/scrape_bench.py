@@ -0,0 +1,300 @@
+"""End-to-end scraper benchmarks against the local fake storefront, fully offline.
+
+    python -m benchmarks.scrape_bench --pages 200 --concurrency 8 --latency 0.02 --output bench.json
+
+Runs ``AmazonScraper`` and ``FlipkartScraper`` (sequential ``search`` /
+``scrape_product_page`` and concurrent async fetches) and the headless
+scrapers against ``benchmarks.fake_storefront`` in a separate process, and
+reports pages/sec, parse ms/page, peak Python memory and browser launch
+cost. The JSON document carries the commit and settings so runs can be
+compared across commits; the headless rows are marked skipped when
+Playwright or its Chromium is missing.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import platform as platform_info
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+# Repo root on the path, so `python benchmarks/<name>.py` works as well as `-m`
+sys.path.insert(0, str(ROOT))
+from amazon_scraper import AmazonScraper
+from flipkart_scraper import FlipkartScraper
+from rate_limiter import configure_host
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore
+
+SCRAPERS = {"amazon": AmazonScraper, "flipkart": FlipkartScraper}
+# Distinct product paths per request, so single-flight never folds two into one
+PRODUCT_PATHS = {
+    "amazon": "/dp/B{0:09d}",
+    "flipkart": "/bench-item-{0}/p/itm{0:013x}",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def storefront(latency: float, jitter: float, error_rate: float) -> Iterator[str]:
+    """Run the fake storefront in its own process so its CPU time stays out of the measurements."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_storefront", "--port", str(port),
+         "--latency", str(latency), "--jitter", str(jitter), "--error-rate", str(error_rate)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                requests.get(f"{base_url}/__stats", timeout=1)
+                break
+            except requests.RequestException:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("fake storefront did not start")
+                time.sleep(0.1)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _server_stats(base_url: str) -> Dict[str, int]:
+    return requests.get(f"{base_url}/__stats", timeout=5).json()
+
+
+def _max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+class _ParseTimer:
+    """Time a scraper's parse methods by shadowing them on the instance."""
+
+    def __init__(self, scraper) -> None:
+        self.seconds = 0.0
+        self.calls = 0
+        for name in ("_parse_listing", "_parse_product_page"):
+            setattr(scraper, name, self._wrap(getattr(scraper, name)))
+
+    def _wrap(self, method: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - started
+                self.calls += 1
+
+        return timed
+
+
+def _targets(platform: str, kind: str, base_url: str, pages: int) -> List[str]:
+    if kind == "search":
+        return [f"benchmark query {i}" for i in range(pages)]
+    return [base_url + PRODUCT_PATHS[platform].format(i) for i in range(pages)]
+
+
+def _run_sync(scraper, kind: str, targets: List[str]) -> tuple[int, int]:
+    records = errors = 0
+    for target in targets:
+        try:
+            if kind == "search":
+                records += len(scraper.search(target, limit=50))
+            else:
+                records += scraper.scrape_product_page(target) is not None
+        except Exception:
+            errors += 1
+    return records, errors
+
+
+async def _run_async(scraper, kind: str, targets: List[str], concurrency: int) -> tuple[int, int]:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(target: str):
+        async with gate:
+            if kind == "search":
+                return len(await scraper.search_async(target, limit=50))
+            return int(await scraper.scrape_product_page_async(target) is not None)
+
+    try:
+        outcomes = await asyncio.gather(*(one(t) for t in targets), return_exceptions=True)
+    finally:
+        await scraper.aclose()
+    errors = sum(isinstance(o, BaseException) for o in outcomes)
+    return sum(o for o in outcomes if not isinstance(o, BaseException)), errors
+
+
+def bench_http(platform: str, mode: str, kind: str, base_url: str, pages: int,
+               concurrency: int, trace_memory: bool) -> Dict:
+    def run() -> tuple[int, int, float, _ParseTimer]:
+        scraper = SCRAPERS[platform](base_url=base_url, cache=False)
+        timer = _ParseTimer(scraper)
+        targets = _targets(platform, kind, base_url, pages)
+        started = time.perf_counter()
+        if mode == "sync":
+            with scraper:
+                records, errors = _run_sync(scraper, kind, targets)
+        else:
+            records, errors = asyncio.run(_run_async(scraper, kind, targets, concurrency))
+        return records, errors, time.perf_counter() - started, timer
+
+    before = _server_stats(base_url)
+    records, errors, seconds, timer = run()
+    after = _server_stats(base_url)
+    row = {
+        "scraper": SCRAPERS[platform].__name__,
+        "mode": mode,
+        "kind": kind,
+        "pages": pages,
+        "concurrency": concurrency if mode == "async" else 1,
+        "seconds": round(seconds, 4),
+        "pagesPerSec": round(pages / seconds, 2),
+        "parseMsPerPage": round(timer.seconds / timer.calls * 1000, 3) if timer.calls else None,
+        "records": records,
+        "errors": errors,
+        "requests": after["requests"] - before["requests"],
+        "injectedErrors": after["errors"] - before["errors"],
+        "bytesReceived": after["bytesSent"] - before["bytesSent"],
+        "peakMemoryMb": None,
+    }
+    if trace_memory:
+        # A second, traced pass: tracemalloc slows allocation-heavy code too much to time the first
+        tracemalloc.start()
+        try:
+            run()
+            row["peakMemoryMb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        finally:
+            tracemalloc.stop()
+    return row
+
+
+async def bench_headless(platform: str, base_url: str, pages: int, concurrency: int) -> Dict:
+    row: Dict = {"scraper": f"{platform.title()}HeadlessScraper", "mode": "headless", "kind": "search",
+                 "pages": pages, "concurrency": concurrency}
+    try:
+        from headless_scraper.browser_pool import BrowserPool
+        from headless_scraper.platforms import PLATFORM_SCRAPERS
+        from headless_scraper.readiness import navigation_pacer
+    except ImportError as e:
+        return {**row, "skipped": f"playwright unavailable: {e}"}
+
+    pool = BrowserPool(size=concurrency)
+    started = time.perf_counter()
+    try:
+        await pool.start()
+    except Exception as e:
+        return {**row, "skipped": f"browser launch failed: {str(e).splitlines()[0]}"}
+    row["browserLaunchSec"] = round(time.perf_counter() - started, 3)
+
+    # The politeness gap is for real sites; the stand-in answers as fast as it can
+    navigation_pacer.min_delay = navigation_pacer.max_delay = 0.0
+    scraper = PLATFORM_SCRAPERS[platform](pool=pool)
+    scraper.base_url = base_url
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> int:
+        async with gate:
+            return len(await scraper.search_products(f"benchmark query {i}", limit=50))
+
+    try:
+        started = time.perf_counter()
+        counts = await asyncio.gather(*(one(i) for i in range(pages)))
+        seconds = time.perf_counter() - started
+    finally:
+        await pool.close()
+    return {**row, "seconds": round(seconds, 4), "pagesPerSec": round(pages / seconds, 2),
+            "parseMsPerPage": None, "records": sum(counts), "errors": counts.count(0)}
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> Dict:
+    results = []
+    with storefront(args.latency, args.jitter, args.error_rate) as base_url:
+        # The stand-in is local; per-host politeness limits would only measure the limiter
+        configure_host(base_url, rate=1e9, burst=1e9, jitter=0.0)
+        for platform in args.platforms:
+            for mode in args.modes:
+                for kind in ("search", "product"):
+                    results.append(bench_http(platform, mode, kind, base_url, args.pages,
+                                              args.concurrency, not args.no_memory))
+        if args.headless:
+            for platform in args.platforms:
+                results.append(asyncio.run(bench_headless(platform, base_url, args.headless_pages,
+                                                          args.concurrency)))
+    return {
+        "commit": _commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "machine": platform_info.platform(),
+        "settings": {"pages": args.pages, "concurrency": args.concurrency, "latency": args.latency,
+                     "jitter": args.jitter, "errorRate": args.error_rate,
+                     "headlessPages": args.headless_pages if args.headless else 0},
+        "maxRssMb": _max_rss_mb(),
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers end to end against a local storefront")
+    parser.add_argument("--pages", type=int, default=100, help="Pages fetched per scraper, mode and kind")
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight requests for async/headless runs")
+    parser.add_argument("--latency", type=float, default=0.02, help="Storefront seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random storefront seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--platforms", nargs="+", choices=list(SCRAPERS), default=list(SCRAPERS))
+    parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    parser.add_argument("--no-headless", dest="headless", action="store_false", help="Skip the Playwright scrapers")
+    parser.add_argument("--headless-pages", type=int, default=20)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced pass that measures peak memory")
+    parser.add_argument("--output", "-o", help="Write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    # Retry warnings from the scrapers go to stderr so stdout carries only the JSON document
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        for row in report["results"]:
+            if "skipped" in row:
+                print(f"{row['scraper']:<26}{row['mode']:<10}skipped: {row['skipped']}")
+            else:
+                print(f"{row['scraper']:<26}{row['mode']:<10}{row['kind']:<9}{row['pagesPerSec']:>9.1f} pages/s")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Local stand-in for the backend's /api/scrape routes, for offline submit benchmarks."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+
+from aiohttp import web
+
+
+class StubBackend:
+    """Accept single records on ``/api/scrape`` and arrays on ``/api/scrape/batch``.
+
+    ``latency`` seconds are added to every request and ``error_rate`` of requests
+    answer HTTP 503, so retry behaviour can be exercised too.
+    """
+
+    def __init__(self, *, latency: float = 0.01, error_rate: float = 0.0) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.records = 0
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=32 * 1024 * 1024)
+        app.router.add_post("/api/scrape", self.handle_single)
+        app.router.add_post("/api/scrape/batch", self.handle_batch)
+        return app
+
+    async def _respond(self, count: int) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            return web.json_response({"success": False, "message": "injected failure"}, status=503)
+        self.records += count
+        return web.json_response({"success": True, "count": count})
+
+    async def handle_single(self, request: web.Request) -> web.Response:
+        await request.json()
+        return await self._respond(1)
+
+    async def handle_batch(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if not isinstance(body, list):
+            return web.json_response({"success": False, "message": "expected an array"}, status=400)
+        return await self._respond(len(body))
+
+
+async def start_stub(host: str = "127.0.0.1", port: int = 0, **options: float) -> tuple[StubBackend, web.AppRunner, str]:
+    """Start a stub on ``port`` (0 picks a free one); returns (stub, runner, base_url)."""
+    stub = StubBackend(**options)
+    runner = web.AppRunner(stub.build_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    return stub, runner, f"http://{host}:{bound_port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stand-in backend for offline benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds added to each request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    stub = StubBackend(latency=args.latency, error_rate=args.error_rate)
+    web.run_app(stub.build_app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
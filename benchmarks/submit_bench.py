@@ -0,0 +1,93 @@
+"""Measure backend submission throughput against the local stub backend.
+
+    python -m benchmarks.submit_bench --records 2000 --latency 0.01
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+# Repo root on the path, so `python benchmarks/<name>.py` works as well as `-m`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.stub_backend import start_stub
+from data_sender import BulkSubmitter, batch_endpoint_for
+
+
+def _payloads(count: int) -> list[dict]:
+    return [
+        {
+            "productName": f"Benchmark Product {i}",
+            "platform": "Amazon" if i % 2 else "Flipkart",
+            "price": 1000.0 + i,
+            "rating": 4.2,
+            "url": f"https://example.invalid/p/{i}",
+            "timestamp": "2026-01-01T00:00:00+00:00",
+        }
+        for i in range(count)
+    ]
+
+
+async def _sequential_baseline(endpoint: str, payloads: list[dict]) -> None:
+    """The previous behaviour: one POST per record, one at a time, fresh connection each."""
+    timeout = aiohttp.ClientTimeout(total=30)
+    for payload in payloads:
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.post(endpoint, json=payload) as response:
+                await response.read()
+
+
+async def run(records: int, latency: float, error_rate: float, chunk_sizes: list[int], concurrency: int) -> list[dict]:
+    stub, runner, base_url = await start_stub(latency=latency, error_rate=error_rate)
+    endpoint = f"{base_url}/api/scrape"
+    payloads = _payloads(records)
+    results = []
+    try:
+        started = time.perf_counter()
+        await _sequential_baseline(endpoint, payloads)
+        elapsed = time.perf_counter() - started
+        results.append({"mode": "sequential", "chunk": 1, "seconds": elapsed,
+                        "recordsPerSec": records / elapsed, "failed": 0, "retries": 0})
+
+        for chunk_size in chunk_sizes:
+            started = time.perf_counter()
+            async with BulkSubmitter(endpoint, batch_endpoint=batch_endpoint_for(endpoint),
+                                     chunk_size=chunk_size, concurrency=concurrency,
+                                     retry_delay=0.05) as submitter:
+                report = await submitter.submit(payloads)
+            elapsed = time.perf_counter() - started
+            results.append({"mode": "bulk", "chunk": chunk_size, "seconds": elapsed,
+                            "recordsPerSec": records / elapsed, "failed": report.failed,
+                            "retries": report.retries})
+    finally:
+        await runner.cleanup()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark backend submission throughput offline")
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.01, help="Stub latency per request (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests failing with 503")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.records, args.latency, args.error_rate, args.chunk_sizes, args.concurrency))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':<12}{'chunk':>7}{'seconds':>10}{'rec/s':>12}{'failed':>8}{'retries':>9}")
+    for row in results:
+        print(f"{row['mode']:<12}{row['chunk']:>7}{row['seconds']:>10.2f}"
+              f"{row['recordsPerSec']:>12.0f}{row['failed']:>8}{row['retries']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Vectorized price and rating normalization for many records at once.
+
+Same rules as ``scraper_utils.normalize_price``/``normalize_rating``: the
+number starts at the first digit; prices may carry thousands or Indian lakh
+grouping commas ("₹1,09,900" -> 109900.0) and an optional decimal part, or
+start at a decimal point (".99" -> 0.99) that does not follow a letter, ratings are digits with an optional decimal part ("4.5 out of 5" -> 4.5).
+Currency symbols, "Rs.", no-break spaces and other text around the number
+are ignored. Missing or unparseable values come back as NaN.
+
+The strings are laid out as a fixed-width UCS-4 array and scanned column by
+column for all rows at once, so there is no per-string regex or ``float()``
+call.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Tuple, Union
+
+import numpy as np
+
+from scraper_utils import normalize_price, normalize_rating
+
+Values = Union[Iterable[object], np.ndarray]
+
+_ZERO, _NINE, _COMMA, _DOT = ord("0"), ord("9"), ord(","), ord(".")
+# Characters classified per chunk; bounds temporary memory for long strings
+_CHUNK_CELLS = 1 << 20
+# Digits an int64 mantissa always holds; longer numbers go through the scalar parser
+_MAX_DIGITS = 18
+
+
+def normalize_prices(values: Values) -> np.ndarray:
+    """float64 prices for raw price strings (or numbers / None), NaN where there is none."""
+    return _normalize(values, grouping=True)
+
+
+def normalize_ratings(values: Values) -> np.ndarray:
+    """float64 ratings for raw rating strings (or numbers / None), NaN where there is none."""
+    return _normalize(values, grouping=False)
+
+
+def _normalize(values: Values, *, grouping: bool) -> np.ndarray:
+    if not isinstance(values, (list, tuple, np.ndarray)):
+        values = list(values)
+    array = np.asarray(values)
+    if array.dtype.kind in "fiub":
+        return array.astype(np.float64)
+    if array.dtype.kind != "U":
+        # Mixed input: None becomes "None" and numbers their repr, both handled below
+        array = array.astype(str)
+    array = np.ascontiguousarray(array.reshape(-1))
+    out = np.full(len(array), np.nan)
+    width = array.dtype.itemsize // 4
+    if width == 0:
+        return out
+    step = max(1, _CHUNK_CELLS // width)
+    for start in range(0, len(array), step):
+        chunk = array[start:start + step]
+        codes = chunk.view(np.uint32).reshape(len(chunk), width)
+        values, overflowed = _leading_numbers(codes, grouping)
+        scalar = normalize_price if grouping else normalize_rating
+        for row in np.flatnonzero(overflowed).tolist():
+            parsed = scalar(str(chunk[row]))
+            values[row] = np.nan if parsed is None else parsed
+        out[start:start + len(chunk)] = values
+    return out
+
+
+def _leading_numbers(codes: np.ndarray, grouping: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Value of the first number in each row of code points, and which rows had too many digits."""
+    rows, width = codes.shape
+    # Column-major, so each step of the scan reads contiguous memory
+    text = np.ascontiguousarray(codes.T)
+    is_digit = (text >= _ZERO) & (text <= _NINE)
+    starts = is_digit
+    if grouping:
+        # A price may also open on its decimal point (".99"), but not on the one in "Rs.99"
+        lead_dot = text == _DOT
+        lead_dot[:-1] &= is_digit[1:]
+        lead_dot[-1] = False
+        lower = text | 0x20
+        lead_dot[1:] &= ~((lower[:-1] >= ord("a")) & (lower[:-1] <= ord("z")))
+        starts = is_digit | lead_dot
+    found = starts.any(axis=0)
+    first = starts.argmax(axis=0)
+
+    # Scan one column at a time, all rows at once: wait for the first digit
+    # (or leading decimal point), then the integer part, then an optional fraction
+    mantissa = np.zeros(rows, dtype=np.int64)
+    decimals = np.zeros(rows, dtype=np.int64)
+    kept = np.zeros(rows, dtype=np.int64)
+    waiting = found.copy()
+    in_int = np.zeros(rows, dtype=bool)
+    in_frac = np.zeros(rows, dtype=bool)
+    start = int(first[found].min()) if found.any() else width
+    for col in range(start, width):
+        opening = waiting & (first == col)
+        dot_open = opening & ~is_digit[col]
+        in_int |= opening & is_digit[col]
+        waiting &= first > col
+        active = in_int | in_frac | dot_open
+        if not active.any():
+            if not waiting.any():
+                break
+            continue
+        digit = is_digit[col]
+        code = text[col]
+        take = active & digit
+        mantissa = np.where(take, mantissa * 10 + (code.astype(np.int64) - _ZERO), mantissa)
+        kept += take
+        decimals += take & in_frac
+        to_frac = in_int & (code == _DOT) & (is_digit[col + 1] if col + 1 < width else False)
+        in_int &= (digit | (code == _COMMA)) if grouping else digit
+        in_frac = (in_frac & digit) | to_frac | dot_open
+    # Exact as float() for up to 15 significant digits: one rounding, in the division
+    values = np.where(found, mantissa / 10.0 ** decimals, np.nan)
+    return values, kept > _MAX_DIGITS
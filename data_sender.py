@@ -1,25 +1,218 @@
 """Utility for sending scraped payloads to the backend service."""
 from __future__ import annotations
 
-from typing import Iterable
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional, Sequence
 
-import requests
+import aiohttp
 
-from scraper_config import BACKEND_ENDPOINT, REQUEST_TIMEOUT
-from scraper_utils import ProductRecord
+from scraper_config import (
+    BACKEND_ENDPOINT,
+    REQUEST_TIMEOUT,
+    SUBMIT_CHUNK_SIZE,
+    SUBMIT_CONCURRENCY,
+    SUBMIT_MAX_RETRIES,
+    SUBMIT_RETRY_DELAY,
+)
+from scrape_metrics import Span, get_metrics, span
+from scraper_utils import ProductRecord, dumps_json
+
+Payload = dict[str, Any]
+
+# Statuses worth retrying; any other 4xx means the chunk itself is bad
+_RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def batch_endpoint_for(endpoint: str) -> str:
+    """Bulk route served next to a single-record endpoint (`/api/scrape` -> `/api/scrape/batch`)."""
+    return endpoint.rstrip("/") + "/batch"
+
+
+@dataclass(slots=True)
+class SubmitReport:
+    sent: int = 0
+    failed: int = 0
+    chunks: int = 0
+    retries: int = 0
+    responses: list[Any] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.failed == 0
+
+
+# Called once per finished chunk with (chunk, response body or None, error or None)
+ChunkCallback = Callable[[Sequence[Payload], Any, Optional[str]], None]
+
+
+class BulkSubmitter:
+    """Chunked, pipelined POSTs of scraped payloads over keep-alive connections.
+
+    With ``chunk_size == 1`` every payload is posted on its own to ``endpoint``
+    (the single-record contract). Otherwise payloads are grouped into JSON
+    arrays posted to ``batch_endpoint``, which stores each chunk in one
+    transaction, so a chunk the backend failed is never half stored; records
+    it rejects as invalid count as failed. A timeout or dropped connection
+    after the backend committed is still retried, so that chunk can be
+    stored twice. Up to ``concurrency`` chunks are in
+    flight at once and failed chunks are retried with exponential backoff.
+    Use as an async context manager to keep one connection pool across calls.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        *,
+        batch_endpoint: str | None = None,
+        chunk_size: int = SUBMIT_CHUNK_SIZE,
+        concurrency: int = SUBMIT_CONCURRENCY,
+        max_retries: int = SUBMIT_MAX_RETRIES,
+        retry_delay: float = SUBMIT_RETRY_DELAY,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.endpoint = endpoint
+        self.batch_endpoint = batch_endpoint or endpoint
+        self.chunk_size = chunk_size
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self._session: aiohttp.ClientSession | None = None
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            json_serialize=dumps_json,
+        )
+
+    async def __aenter__(self) -> "BulkSubmitter":
+        self._session = self._new_session()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _post(self, session: aiohttp.ClientSession, url: str, body: Any) -> tuple[Any, str | None, int]:
+        """POST one chunk with retries; returns (response body, error, retries used)."""
+        records = len(body) if isinstance(body, list) else 1
+        with span("submit", records=records) as timing:
+            body, error, retries = await self._post_attempts(session, url, body, timing)
+            timing.set(retries=retries)
+            if error is not None:
+                timing.set(failure=error)
+        if retries:
+            get_metrics().count("retries", "submit", value=retries)
+        if error is not None:
+            get_metrics().count("errors", "submit")
+        return body, error, retries
+
+    async def _post_attempts(self, session: aiohttp.ClientSession, url: str, body: Any,
+                             timing: Span) -> tuple[Any, str | None, int]:
+        # Serialized once, not once per attempt
+        data = dumps_json(body).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        error: str | None = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = self.retry_delay * (2 ** (attempt - 1))
+                await asyncio.sleep(delay + random.uniform(0, self.retry_delay))
+            try:
+                timing.sent(len(data))
+                async with session.post(url, data=data, headers=headers) as response:
+                    if response.status < 400:
+                        try:
+                            return await response.json(content_type=None), None, attempt
+                        except ValueError:
+                            return None, None, attempt
+                    text = await response.text()
+                    error = f"HTTP {response.status}: {text[:100]}"
+                    if response.status not in _RETRYABLE_STATUS:
+                        return None, error, attempt
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                error = f"{type(exc).__name__}: {str(exc)[:100]}"
+        return None, error, self.max_retries
+
+    async def submit(self, payloads: Sequence[Payload], *, on_chunk: ChunkCallback | None = None) -> SubmitReport:
+        report = SubmitReport()
+        if not payloads:
+            return report
+
+        if self.chunk_size == 1:
+            chunks = [[payload] for payload in payloads]
+        else:
+            chunks = [list(payloads[i:i + self.chunk_size]) for i in range(0, len(payloads), self.chunk_size)]
+        report.chunks = len(chunks)
+
+        session = self._session or self._new_session()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(chunk: list[Payload]) -> None:
+            async with semaphore:
+                if self.chunk_size == 1:
+                    body, error, retries = await self._post(session, self.endpoint, chunk[0])
+                else:
+                    body, error, retries = await self._post(session, self.batch_endpoint, chunk)
+            report.retries += retries
+            if error is None:
+                # The batch route stores the valid records and lists the ones it rejected
+                rejected = body.get("rejected") if isinstance(body, dict) else None
+                if rejected:
+                    report.failed += len(rejected)
+                    report.errors.append(f"{len(rejected)} records rejected: {rejected[0].get('errors')}")
+                report.sent += len(chunk) - len(rejected or ())
+                report.responses.append(body)
+            else:
+                report.failed += len(chunk)
+                report.errors.append(error)
+            if on_chunk is not None:
+                on_chunk(chunk, body, error)
+
+        try:
+            await asyncio.gather(*(send(chunk) for chunk in chunks))
+        finally:
+            if session is not self._session:
+                await session.close()
+        return report
+
+
+async def submit_payloads(
+    payloads: Sequence[Payload],
+    endpoint: str,
+    *,
+    on_chunk: ChunkCallback | None = None,
+    **options: Any,
+) -> SubmitReport:
+    async with BulkSubmitter(endpoint, **options) as submitter:
+        return await submitter.submit(payloads, on_chunk=on_chunk)
 
 
 def send_to_backend(
     records: Iterable[ProductRecord],
     *,
     endpoint: str = BACKEND_ENDPOINT,
-) -> dict | None:
+    chunk_size: int | None = None,
+) -> dict | list | None:
+    """POST the records as one JSON array and return the decoded response (None if not JSON).
+
+    With ``chunk_size`` the records are split into arrays of that size and a
+    list with one response body per chunk is returned instead.
+    """
     payload = [record.to_payload() for record in records]
     if not payload:
         return None
-    response = requests.post(endpoint, json=payload, timeout=REQUEST_TIMEOUT)
-    response.raise_for_status()
-    try:
-        return response.json()
-    except ValueError:
-        return None
+    # This endpoint takes JSON arrays directly, so chunks go to the same URL.
+    # Unchunked sends stay one array, never the single-object form used for size 1
+    size = chunk_size or max(len(payload), 2)
+    report = asyncio.run(submit_payloads(payload, endpoint, batch_endpoint=endpoint, chunk_size=size))
+    if not report.ok:
+        raise RuntimeError(f"{report.failed}/{len(payload)} records not submitted: {report.errors[0]}")
+    return report.responses if chunk_size else report.responses[0]
@@ -1,22 +1,21 @@
 """Amazon headless scraper with Playwright"""
 import time
-import asyncio
 from datetime import datetime
-from typing import List, Dict, Optional
-from playwright.async_api import async_playwright, Page, Browser
+from typing import AsyncIterator, List, Dict, Optional
 from urllib.parse import quote_plus
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from headless_scraper.config import (
-    get_random_user_agent,
-    get_random_viewport,
-    random_delay,
     PAGE_TIMEOUT,
-    MIN_PAGE_LOAD_DELAY,
-    MAX_PAGE_LOAD_DELAY
+    BLOCK_RESOURCES
 )
+from headless_scraper.browser_pool import BrowserPool
+from headless_scraper.request_filter import RequestFilter
+from headless_scraper.readiness import navigation_pacer, wait_for_results
+from bulk_normalize import normalize_prices
+from scrape_metrics import span
 
 def safe_print(text: str):
     """Safely print text with Unicode characters"""
@@ -31,125 +30,112 @@ def safe_print(text: str):
 class AmazonHeadlessScraper:
     """Amazon scraper using headless Playwright"""
     
-    def __init__(self):
+    def __init__(self, pool: Optional[BrowserPool] = None, block_resources: bool = BLOCK_RESOURCES,
+                 log_products: bool = True):
         self.platform = "Amazon"
         self.base_url = "https://www.amazon.in"
-        self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        # Borrow pages from a shared pool if given, otherwise own a single-browser pool
+        self.pool = pool
+        self._owns_pool = pool is None
+        # Skip images, fonts, media and trackers; only a few text nodes are read
+        self.request_filter = RequestFilter(self.platform) if block_resources else None
+        # Off when the caller reports each product itself (e.g. as progress events)
+        self.log_products = log_products
     
     async def init_browser(self):
         """Initialize headless browser with stealth settings"""
-        playwright = await async_playwright().start()
-        
-        # Launch browser in headless mode
-        self.browser = await playwright.chromium.launch(
-            headless=True,  # No browser UI
-            args=[
-                '--disable-blink-features=AutomationControlled',  # Hide automation
-                '--disable-dev-shm-usage',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-            ]
-        )
-        
-        # Create context with random user agent and viewport
-        context = await self.browser.new_context(
-            user_agent=get_random_user_agent(),
-            viewport=get_random_viewport(),
-            locale='en-IN',
-            timezone_id='Asia/Kolkata',
-            extra_http_headers={
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-IN,en;q=0.9,hi;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
-        )
-        
-        # Additional stealth: Override navigator properties
-        await context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [1, 2, 3, 4, 5]
-            });
-        """)
-        
-        self.page = await context.new_page()
+        if self.pool is None:
+            self.pool = BrowserPool(size=1)
+        await self.pool.start()
         print(f"[Amazon] Browser initialized in headless mode")
     
+    def search_url(self, query: str) -> str:
+        return f"{self.base_url}/s?k={quote_plus(query)}"
+
     async def search_products(self, query: str, limit: int = 5) -> List[Dict]:
         """Search for products and extract data"""
-        if not self.page:
+        with span("search", self.platform, query=query):
+            return [product async for product in self.stream_products(query, limit)]
+    
+    async def stream_products(self, query: str, limit: int = 5) -> AsyncIterator[Dict]:
+        """Search for products, yielding each one as soon as it is formatted"""
+        if self.pool is None or not self.pool.started:
             await self.init_browser()
         
-        search_url = f"{self.base_url}/s?k={quote_plus(query)}"
+        search_url = self.search_url(query)
         print(f"[Amazon] Searching for: {query}")
         print(f"[Amazon] URL: {search_url}")
         
         try:
-            # Navigate to search page
-            await self.page.goto(search_url, wait_until='domcontentloaded', timeout=PAGE_TIMEOUT)
-            
-            # Random delay to mimic human behavior
-            await asyncio.sleep(random_delay(MIN_PAGE_LOAD_DELAY, MAX_PAGE_LOAD_DELAY))
+            async with self.pool.page() as page:
+                if self.request_filter:
+                    await self.request_filter.attach(page)
+                # Politeness gap between navigations, not a fixed sleep per page load
+                await navigation_pacer.wait(self.platform)
+                
+                # Navigate to search page
+                with span("navigation", self.platform, url=search_url):
+                    await page.goto(search_url, wait_until='domcontentloaded', timeout=PAGE_TIMEOUT)
             
-            # Wait for search results
-            try:
-                await self.page.wait_for_selector('div[data-component-type="s-search-result"]', timeout=10000)
-            except:
-                print(f"[Amazon] Warning: Search results selector not found, continuing...")
+                # Return as soon as the result cards are present and stable
+                try:
+                    with span("selector_wait", self.platform):
+                        card_count = await wait_for_results(page, 'div[data-component-type="s-search-result"]')
+                    print(f"[Amazon] {card_count} result cards ready")
+                except:
+                    print(f"[Amazon] Warning: Search results selector not found, continuing...")
             
-            # Extract products
-            products = await self.page.evaluate("""() => {
-                const results = [];
-                const cards = document.querySelectorAll('div[data-component-type="s-search-result"]');
+                # Extract products
+                with span("evaluate", self.platform):
+                    products = await page.evaluate("""() => {
+                        const results = [];
+                        const cards = document.querySelectorAll('div[data-component-type="s-search-result"]');
                 
-                cards.forEach(card => {
-                    try {
-                        // Extract title
-                        const titleEl = card.querySelector('h2 a span') || 
-                                      card.querySelector('h2 span') ||
-                                      card.querySelector('.a-size-medium.a-text-normal');
-                        const title = titleEl ? titleEl.innerText.trim() : '';
+                        cards.forEach(card => {
+                            try {
+                                // Extract title
+                                const titleEl = card.querySelector('h2 a span') || 
+                                              card.querySelector('h2 span') ||
+                                              card.querySelector('.a-size-medium.a-text-normal');
+                                const title = titleEl ? titleEl.innerText.trim() : '';
                         
-                        // Extract link
-                        const linkEl = card.querySelector('h2 a') || 
-                                     card.querySelector('a.a-link-normal');
-                        const href = linkEl ? linkEl.getAttribute('href') : '';
+                                // Extract link
+                                const linkEl = card.querySelector('h2 a') || 
+                                             card.querySelector('a.a-link-normal');
+                                const href = linkEl ? linkEl.getAttribute('href') : '';
                         
-                        // Extract price
-                        const priceEl = card.querySelector('span.a-price span.a-offscreen') ||
-                                      card.querySelector('.a-price .a-offscreen');
-                        const price = priceEl ? priceEl.innerText.trim() : '';
+                                // Extract price
+                                const priceEl = card.querySelector('span.a-price span.a-offscreen') ||
+                                              card.querySelector('.a-price .a-offscreen');
+                                const price = priceEl ? priceEl.innerText.trim() : '';
                         
-                        // Extract rating
-                        const ratingEl = card.querySelector('span.a-icon-alt') ||
-                                       card.querySelector('[aria-label*="out of"]');
-                        const rating = ratingEl ? ratingEl.innerText.trim() : '';
+                                // Extract rating
+                                const ratingEl = card.querySelector('span.a-icon-alt') ||
+                                               card.querySelector('[aria-label*="out of"]');
+                                const rating = ratingEl ? ratingEl.innerText.trim() : '';
                         
-                        if (title && href) {
-                            results.push({
-                                title: title,
-                                link: href,
-                                price: price,
-                                rating: rating
-                            });
-                        }
-                    } catch (e) {
-                        console.error('Error parsing product card:', e);
-                    }
-                });
+                                if (title && href) {
+                                    results.push({
+                                        title: title,
+                                        link: href,
+                                        price: price,
+                                        rating: rating
+                                    });
+                                }
+                            } catch (e) {
+                                console.error('Error parsing product card:', e);
+                            }
+                        });
                 
-                return results;
-            }""")
+                        return results;
+                    }""")
             
-            # Format results
-            formatted_products = []
-            for i, product in enumerate(products[:limit]):
+            # Format results; all prices parsed in one pass, NaN where a card had none
+            products = products[:limit]
+            with span("normalize", self.platform, records=len(products)):
+                prices = normalize_prices([product['price'] for product in products]).tolist()
+            extracted = 0
+            for i, (product, price) in enumerate(zip(products, prices)):
                 try:
                     # Build full URL
                     product_url = product['link']
@@ -158,12 +144,7 @@ class AmazonHeadlessScraper:
                     elif not product_url.startswith('http'):
                         product_url = f"{self.base_url}/{product_url}"
                     
-                    # Clean price: remove currency symbols and convert to float
-                    price_str = product['price'].replace('₹', '').strip()
-                    try:
-                        price_float = float(price_str.replace(',', ''))
-                    except:
-                        price_float = 0.0
+                    price_float = 0.0 if price != price else price  # NaN: no readable price
                     
                     formatted_product = {
                         "productName": product['title'],
@@ -173,27 +154,30 @@ class AmazonHeadlessScraper:
                         "url": product_url,
                         "timestamp": datetime.now().isoformat()
                     }
-                    formatted_products.append(formatted_product)
+                    extracted += 1
                     
                     # Safe print with Unicode handling
-                    title_safe = product['title'][:60].encode('ascii', errors='replace').decode('ascii')
-                    price_safe = product['price'].encode('ascii', errors='replace').decode('ascii')
-                    safe_print(f"[Amazon] [{i+1}] {title_safe}... - {price_safe}")
+                    if self.log_products:
+                        title_safe = product['title'][:60].encode('ascii', errors='replace').decode('ascii')
+                        price_safe = product['price'].encode('ascii', errors='replace').decode('ascii')
+                        safe_print(f"[Amazon] [{i+1}] {title_safe}... - {price_safe}")
+                    yield formatted_product
                 except Exception as e:
                     safe_print(f"[Amazon] Error formatting product: {str(e)}")
                     continue
             
-            safe_print(f"[Amazon] Extracted {len(formatted_products)} products")
-            return formatted_products
+            safe_print(f"[Amazon] Extracted {extracted} products")
+            if self.request_filter:
+                safe_print(f"[Amazon] {self.request_filter.summary()}")
             
         except Exception as e:
             safe_print(f"[Amazon] Error during scraping: {str(e)}")
             import traceback
             traceback.print_exc()
-            return []
     
     async def close(self):
         """Close browser"""
-        if self.browser:
-            await self.browser.close()
+        if self.pool and self._owns_pool:
+            await self.pool.close()
+            self.pool = None
             safe_print(f"[Amazon] Browser closed")
@@ -0,0 +1,165 @@
+"""Pool of warm headless browsers shared by the platform scrapers"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from headless_scraper.config import (
+    get_random_user_agent,
+    get_random_viewport,
+    BROWSER_POOL_SIZE,
+    BROWSER_MAX_NAVIGATIONS,
+    BROWSER_LAUNCH_ARGS,
+    CONTEXT_EXTRA_HEADERS,
+    STEALTH_INIT_SCRIPT,
+)
+
+
+async def new_stealth_context(browser: Browser) -> BrowserContext:
+    """Create a browser context with random user agent, viewport and stealth script"""
+    context = await browser.new_context(
+        user_agent=get_random_user_agent(),
+        viewport=get_random_viewport(),
+        locale='en-IN',
+        timezone_id='Asia/Kolkata',
+        extra_http_headers=CONTEXT_EXTRA_HEADERS,
+    )
+    await context.add_init_script(STEALTH_INIT_SCRIPT)
+    return context
+
+
+class _PooledBrowser:
+    """One warm browser plus its pre-built stealth context"""
+
+    def __init__(self, browser: Browser, context: BrowserContext):
+        self.browser = browser
+        self.context = context
+        self.navigations = 0
+
+    def is_healthy(self) -> bool:
+        return self.browser.is_connected()
+
+    async def close(self):
+        try:
+            await self.context.close()
+        except Exception:
+            pass
+        try:
+            await self.browser.close()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """
+    Keep N Chromium instances warm and lease pages from them.
+
+    Each browser is recycled after `max_navigations` main-frame navigations or
+    as soon as it is found disconnected. Use as an async context manager, or
+    call start()/close() explicitly.
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE,
+                 max_navigations: int = BROWSER_MAX_NAVIGATIONS):
+        if size < 1:
+            raise ValueError("BrowserPool size must be at least 1")
+        self.size = size
+        self.max_navigations = max_navigations
+        self._playwright: Optional[Playwright] = None
+        self._slots: List[_PooledBrowser] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+        self._closed = False
+        self.launches = 0
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self):
+        """Start Playwright and launch all browsers concurrently"""
+        async with self._start_lock:
+            if self.started:
+                return
+            if self._closed:
+                raise RuntimeError("BrowserPool is closed")
+            self._playwright = await async_playwright().start()
+            self._idle = asyncio.Queue()
+            try:
+                slots = await asyncio.gather(*(self._launch() for _ in range(self.size)))
+            except Exception:
+                await self._playwright.stop()
+                self._playwright = None
+                raise
+            for slot in slots:
+                self._slots.append(slot)
+                self._idle.put_nowait(slot)
+
+    async def _launch(self) -> _PooledBrowser:
+        browser = await self._playwright.chromium.launch(
+            headless=True,  # No browser UI
+            args=BROWSER_LAUNCH_ARGS,
+        )
+        self.launches += 1
+        try:
+            context = await new_stealth_context(browser)
+        except Exception:
+            await browser.close()
+            raise
+        return _PooledBrowser(browser, context)
+
+    async def _recycle(self, slot: _PooledBrowser) -> _PooledBrowser:
+        if slot in self._slots:
+            self._slots.remove(slot)
+        await slot.close()
+        fresh = await self._launch()
+        self._slots.append(fresh)
+        return fresh
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Lease a fresh page from an idle browser; it is closed on exit"""
+        if not self.started:
+            await self.start()
+        slot = await self._idle.get()
+        try:
+            if not slot.is_healthy() or slot.navigations >= self.max_navigations:
+                slot = await self._recycle(slot)
+            page = await slot.context.new_page()
+
+            def _count_navigation(frame):
+                if frame == page.main_frame:
+                    slot.navigations += 1
+
+            page.on('framenavigated', _count_navigation)
+            try:
+                yield page
+            finally:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+        finally:
+            if self._closed:
+                await slot.close()
+            else:
+                self._idle.put_nowait(slot)
+
+    async def close(self):
+        """Close every browser and stop the Playwright driver"""
+        self._closed = True
+        slots, self._slots = self._slots, []
+        await asyncio.gather(*(slot.close() for slot in slots))
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -19,17 +19,98 @@ VIEWPORTS: List[Dict[str, int]] = [
 ]
 
 # Random delay ranges (seconds)
-MIN_PAGE_LOAD_DELAY = 2.0
-MAX_PAGE_LOAD_DELAY = 4.0
+# Politeness gap between two navigations to the same platform (not per page load)
+MIN_NAVIGATION_DELAY = 2.0
+MAX_NAVIGATION_DELAY = 4.0
 MIN_ACTION_DELAY = 1.0
 MAX_ACTION_DELAY = 2.5
 
 # Backend API
 API_ENDPOINT = "http://localhost:3001/api/scrape"
 
+# Request interception: abort heavy resources and third-party trackers
+BLOCK_RESOURCES = True
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+
+# Hosts (and their subdomains) each platform's pages may load from
+PLATFORM_ALLOWED_DOMAINS: Dict[str, List[str]] = {
+    'amazon': ['amazon.in', 'media-amazon.com', 'ssl-images-amazon.com'],
+    'flipkart': ['flipkart.com', 'flixcart.com'],
+}
+
+# Ad and analytics hosts blocked even when they sit under an allowed domain
+BLOCKED_DOMAINS: List[str] = [
+    'amazon-adsystem.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'google-analytics.com',
+    'googletagmanager.com',
+    'facebook.net',
+    'scorecardresearch.com',
+    'criteo.com',
+    'hotjar.com',
+    'nr-data.net',
+    'unagi.amazon.in',
+    'fls-eu.amazon.in',
+    'aax-eu.amazon.in',
+]
+
+# Typical transfer sizes (bytes) used to estimate what blocking saved
+BLOCKED_SIZE_ESTIMATES: Dict[str, int] = {
+    'image': 25_000,
+    'media': 250_000,
+    'font': 40_000,
+    'script': 30_000,
+    'stylesheet': 15_000,
+}
+DEFAULT_BLOCKED_SIZE_ESTIMATE = 5_000
+
+# Scraper daemon (scraper_server.py)
+SCRAPER_SERVER_HOST = "127.0.0.1"
+SCRAPER_SERVER_PORT = 5000  # matches the backend's default SCRAPER_URL
+SCRAPER_WORKERS = 2  # jobs scraped at the same time
+SCRAPER_QUEUE_LIMIT = 100  # pending jobs before new ones are rejected
+JOB_HISTORY_LIMIT = 500  # finished jobs kept for status lookups
+
 # Scraping limits
 DEFAULT_PRODUCT_LIMIT = 5
 PAGE_TIMEOUT = 30000  # 30 seconds
+RESULTS_TIMEOUT = 10000  # ms to wait for the first result card
+RESULTS_QUIET_MS = 400  # result count must hold this long to count as settled
+RESULTS_SETTLE_MAX_MS = 3000  # stop waiting for the count to settle after this
+PLATFORM_TIMEOUT = 90.0  # seconds allowed for one platform's whole search
+
+# Browser pool
+BROWSER_POOL_SIZE = 2  # warm browsers shared by all platform scrapers
+BROWSER_MAX_NAVIGATIONS = 50  # recycle a browser after this many page loads
+
+# Chromium launch flags
+BROWSER_LAUNCH_ARGS: List[str] = [
+    '--disable-blink-features=AutomationControlled',  # Hide automation
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+]
+
+# Headers sent by every stealth context
+CONTEXT_EXTRA_HEADERS: Dict[str, str] = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-IN,en;q=0.9,hi;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Override navigator properties that give away automation
+STEALTH_INIT_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+"""
 
 def get_random_user_agent() -> str:
     """Get random user agent"""
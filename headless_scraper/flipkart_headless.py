@@ -1,22 +1,21 @@
 """Flipkart headless scraper with Playwright"""
 import time
-import asyncio
 from datetime import datetime
-from typing import List, Dict, Optional
-from playwright.async_api import async_playwright, Page, Browser
+from typing import AsyncIterator, List, Dict, Optional
 from urllib.parse import quote_plus
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from headless_scraper.config import (
-    get_random_user_agent,
-    get_random_viewport,
-    random_delay,
     PAGE_TIMEOUT,
-    MIN_PAGE_LOAD_DELAY,
-    MAX_PAGE_LOAD_DELAY
+    BLOCK_RESOURCES
 )
+from headless_scraper.browser_pool import BrowserPool
+from headless_scraper.request_filter import RequestFilter
+from headless_scraper.readiness import navigation_pacer, wait_for_results
+from bulk_normalize import normalize_prices
+from scrape_metrics import span
 
 def safe_print(text: str):
     """Safely print text with Unicode characters"""
@@ -30,131 +29,118 @@ def safe_print(text: str):
 class FlipkartHeadlessScraper:
     """Flipkart scraper using headless Playwright"""
     
-    def __init__(self):
+    def __init__(self, pool: Optional[BrowserPool] = None, block_resources: bool = BLOCK_RESOURCES,
+                 log_products: bool = True):
         self.platform = "Flipkart"
         self.base_url = "https://www.flipkart.com"
-        self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        # Borrow pages from a shared pool if given, otherwise own a single-browser pool
+        self.pool = pool
+        self._owns_pool = pool is None
+        # Skip images, fonts, media and trackers; only a few text nodes are read
+        self.request_filter = RequestFilter(self.platform) if block_resources else None
+        # Off when the caller reports each product itself (e.g. as progress events)
+        self.log_products = log_products
     
     async def init_browser(self):
         """Initialize headless browser with stealth settings"""
-        playwright = await async_playwright().start()
-        
-        # Launch browser in headless mode
-        self.browser = await playwright.chromium.launch(
-            headless=True,  # No browser UI
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--disable-dev-shm-usage',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-            ]
-        )
-        
-        # Create context with random user agent and viewport
-        context = await self.browser.new_context(
-            user_agent=get_random_user_agent(),
-            viewport=get_random_viewport(),
-            locale='en-IN',
-            timezone_id='Asia/Kolkata',
-            extra_http_headers={
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-IN,en;q=0.9,hi;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
-        )
-        
-        # Additional stealth
-        await context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [1, 2, 3, 4, 5]
-            });
-        """)
-        
-        self.page = await context.new_page()
+        if self.pool is None:
+            self.pool = BrowserPool(size=1)
+        await self.pool.start()
         safe_print(f"[Flipkart] Browser initialized in headless mode")
     
+    def search_url(self, query: str) -> str:
+        return f"{self.base_url}/search?q={quote_plus(query)}"
+
     async def search_products(self, query: str, limit: int = 5) -> List[Dict]:
         """Search for products and extract data"""
-        if not self.page:
+        with span("search", self.platform, query=query):
+            return [product async for product in self.stream_products(query, limit)]
+    
+    async def stream_products(self, query: str, limit: int = 5) -> AsyncIterator[Dict]:
+        """Search for products, yielding each one as soon as it is formatted"""
+        if self.pool is None or not self.pool.started:
             await self.init_browser()
         
-        search_url = f"{self.base_url}/search?q={quote_plus(query)}"
+        search_url = self.search_url(query)
         safe_print(f"[Flipkart] Searching for: {query}")
         safe_print(f"[Flipkart] URL: {search_url}")
         
         try:
-            # Navigate to search page
-            await self.page.goto(search_url, wait_until='domcontentloaded', timeout=PAGE_TIMEOUT)
-            
-            # Random delay
-            await asyncio.sleep(random_delay(MIN_PAGE_LOAD_DELAY, MAX_PAGE_LOAD_DELAY))
+            async with self.pool.page() as page:
+                if self.request_filter:
+                    await self.request_filter.attach(page)
+                # Politeness gap between navigations, not a fixed sleep per page load
+                await navigation_pacer.wait(self.platform)
+                
+                # Navigate to search page
+                with span("navigation", self.platform, url=search_url):
+                    await page.goto(search_url, wait_until='domcontentloaded', timeout=PAGE_TIMEOUT)
             
-            # Wait for products to load
-            try:
-                await self.page.wait_for_selector('div._1AtVbE, div[data-id], a._1fQZEK', timeout=10000)
-            except:
-                safe_print(f"[Flipkart] Warning: Product selector not found, continuing...")
+                # Wait until product cards are present and stable
+                try:
+                    with span("selector_wait", self.platform):
+                        card_count = await wait_for_results(page, 'div._1AtVbE, div[data-id], a._1fQZEK')
+                    safe_print(f"[Flipkart] {card_count} product cards ready")
+                except:
+                    safe_print(f"[Flipkart] Warning: Product selector not found, continuing...")
             
-            # Extract products using JavaScript evaluation
-            products = await self.page.evaluate("""() => {
-                const results = [];
+                # Extract products using JavaScript evaluation
+                with span("evaluate", self.platform):
+                    products = await page.evaluate("""() => {
+                        const results = [];
                 
-                // Try multiple selector patterns for Flipkart
-                const cards = document.querySelectorAll('div._1AtVbE, div[data-id], div._2kHMtA, div._13oc-S');
+                        // Try multiple selector patterns for Flipkart
+                        const cards = document.querySelectorAll('div._1AtVbE, div[data-id], div._2kHMtA, div._13oc-S');
                 
-                cards.forEach(card => {
-                    try {
-                        // Extract title - multiple patterns
-                        const titleEl = card.querySelector('a._1fQZEK') ||
-                                      card.querySelector('div._4rR01T') ||
-                                      card.querySelector('a.IRpwTa') ||
-                                      card.querySelector('a.s1Q9rs');
-                        const title = titleEl ? titleEl.innerText.trim() : '';
+                        cards.forEach(card => {
+                            try {
+                                // Extract title - multiple patterns
+                                const titleEl = card.querySelector('a._1fQZEK') ||
+                                              card.querySelector('div._4rR01T') ||
+                                              card.querySelector('a.IRpwTa') ||
+                                              card.querySelector('a.s1Q9rs');
+                                const title = titleEl ? titleEl.innerText.trim() : '';
                         
-                        // Extract link
-                        const linkEl = card.querySelector('a._1fQZEK') ||
-                                     card.querySelector('a[href*="/p/"]') ||
-                                     card.querySelector('a.IRpwTa');
-                        const href = linkEl ? linkEl.getAttribute('href') : '';
+                                // Extract link
+                                const linkEl = card.querySelector('a._1fQZEK') ||
+                                             card.querySelector('a[href*="/p/"]') ||
+                                             card.querySelector('a.IRpwTa');
+                                const href = linkEl ? linkEl.getAttribute('href') : '';
                         
-                        // Extract price
-                        const priceEl = card.querySelector('div._30jeq3') ||
-                                      card.querySelector('div._3I9_wc') ||
-                                      card.querySelector('div._25b18c');
-                        const price = priceEl ? priceEl.innerText.trim() : '';
+                                // Extract price
+                                const priceEl = card.querySelector('div._30jeq3') ||
+                                              card.querySelector('div._3I9_wc') ||
+                                              card.querySelector('div._25b18c');
+                                const price = priceEl ? priceEl.innerText.trim() : '';
                         
-                        // Extract rating
-                        const ratingEl = card.querySelector('div._3LWZlK') ||
-                                       card.querySelector('div._1lRcqv') ||
-                                       card.querySelector('span._1lRcqv');
-                        const rating = ratingEl ? ratingEl.innerText.trim() : '';
+                                // Extract rating
+                                const ratingEl = card.querySelector('div._3LWZlK') ||
+                                               card.querySelector('div._1lRcqv') ||
+                                               card.querySelector('span._1lRcqv');
+                                const rating = ratingEl ? ratingEl.innerText.trim() : '';
                         
-                        if (title && href) {
-                            results.push({
-                                title: title,
-                                link: href,
-                                price: price,
-                                rating: rating
-                            });
-                        }
-                    } catch (e) {
-                        console.error('Error parsing product card:', e);
-                    }
-                });
+                                if (title && href) {
+                                    results.push({
+                                        title: title,
+                                        link: href,
+                                        price: price,
+                                        rating: rating
+                                    });
+                                }
+                            } catch (e) {
+                                console.error('Error parsing product card:', e);
+                            }
+                        });
                 
-                return results;
-            }""")
+                        return results;
+                    }""")
             
-            # Format results
-            formatted_products = []
-            for i, product in enumerate(products[:limit]):
+            # Format results; all prices parsed in one pass, NaN where a card had none
+            products = products[:limit]
+            with span("normalize", self.platform, records=len(products)):
+                prices = normalize_prices([product['price'] for product in products]).tolist()
+            extracted = 0
+            for i, (product, price) in enumerate(zip(products, prices)):
                 try:
                     # Build full URL
                     product_url = product['link']
@@ -163,12 +149,7 @@ class FlipkartHeadlessScraper:
                     elif not product_url.startswith('http'):
                         product_url = f"{self.base_url}/{product_url}"
                     
-                    # Clean price - remove rupee symbol and convert to numeric
-                    price_str = product['price'].replace('₹', '').replace('Rs', '').strip()
-                    try:
-                        price_numeric = float(price_str.split(',')[0]) if price_str else 0.0
-                    except (ValueError, IndexError):
-                        price_numeric = 0.0
+                    price_numeric = 0.0 if price != price else price  # NaN: no readable price
                     
                     formatted_product = {
                         "productName": product['title'],
@@ -178,22 +159,25 @@ class FlipkartHeadlessScraper:
                         "url": product_url,
                         "timestamp": datetime.now().isoformat()
                     }
-                    formatted_products.append(formatted_product)
-                    safe_print(f"[Flipkart] [{i+1}] {product['title'][:60]}... - ₹{price_numeric:.2f}")
+                    extracted += 1
+                    if self.log_products:
+                        safe_print(f"[Flipkart] [{i+1}] {product['title'][:60]}... - ₹{price_numeric:.2f}")
+                    yield formatted_product
                 except Exception as e:
                     safe_print(f"[Flipkart] Error formatting product: {str(e)}")
             
-            safe_print(f"[Flipkart] Extracted {len(formatted_products)} products")
-            return formatted_products
+            safe_print(f"[Flipkart] Extracted {extracted} products")
+            if self.request_filter:
+                safe_print(f"[Flipkart] {self.request_filter.summary()}")
             
         except Exception as e:
             safe_print(f"[Flipkart] Error during scraping: {str(e)}")
             import traceback
             traceback.print_exc()
-            return []
     
     async def close(self):
         """Close browser"""
-        if self.browser:
-            await self.browser.close()
+        if self.pool and self._owns_pool:
+            await self.pool.close()
+            self.pool = None
             safe_print(f"[Flipkart] Browser closed")
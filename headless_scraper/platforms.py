@@ -0,0 +1,193 @@
+"""Run platform scrapers side by side with per-platform timeouts"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Union
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from headless_scraper.amazon_headless import AmazonHeadlessScraper
+from headless_scraper.flipkart_headless import FlipkartHeadlessScraper
+from headless_scraper.browser_pool import BrowserPool
+from headless_scraper.config import DEFAULT_PRODUCT_LIMIT, PLATFORM_TIMEOUT
+from http_cache import ResponseCache, get_cache
+from product_identity import get_index, merge_records, query_key
+from scraper_config import HTTP_CACHE_ENABLED, HTTP_CACHE_TTL
+from single_flight import flight_key, flights
+
+# Platform key -> scraper class. Register new marketplaces here.
+PLATFORM_SCRAPERS = {
+    'amazon': AmazonHeadlessScraper,
+    'flipkart': FlipkartHeadlessScraper,
+}
+
+
+@dataclass
+class PlatformResult:
+    """Outcome of scraping one platform"""
+    platform: str
+    products: List[Dict] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    stats: Dict = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _cache_platform(scraper) -> str:
+    # Extracted products, not HTML, so keep them apart from the HTML scrapers' entries
+    return f"{scraper.platform}:headless"
+
+
+def _cache_url(scraper, query: str) -> str:
+    # Keyed by the canonical query so "iphone-15" and "Apple iPhone 15" share an entry
+    return scraper.search_url(query_key(query))
+
+
+async def _cached_products(cache: ResponseCache, scraper, query: str, limit: int) -> Optional[List[Dict]]:
+    """Fresh cached products for this search, if a previous scrape fetched at least `limit`"""
+    indexed = get_index().get_search(scraper.platform, query, limit, max_age=HTTP_CACHE_TTL)
+    if indexed is not None:
+        return indexed
+    cached = await asyncio.to_thread(cache.get, _cache_url(scraper, query), _cache_platform(scraper))
+    if cached is None or not cached.fresh:
+        return None
+    entry = json.loads(cached.body)
+    if entry['limit'] < limit and len(entry['products']) >= entry['limit']:
+        return None
+    return entry['products'][:limit]
+
+
+def search_flight_key(platform: str, query: str, limit: int) -> str:
+    return flight_key("search", platform, query_key(query), str(limit))
+
+
+async def _search_once(scraper, query: str, limit: int, cache) -> List[Dict]:
+    """
+    Run the search, sharing one browser run among concurrent identical searches
+    from any task, thread or process on this host.
+    """
+    async def search() -> List[Dict]:
+        products = merge_records(await scraper.search_products(query, limit))
+        # search_products returns [] on failure; never cache that
+        if cache and products:
+            get_index().add_search(scraper.platform, query, limit, products)
+            body = json.dumps({'limit': limit, 'products': products}, ensure_ascii=False)
+            await asyncio.to_thread(cache.store, _cache_url(scraper, query), _cache_platform(scraper), body)
+        return products
+
+    return await flights.do(search_flight_key(scraper.platform, query, limit), search)
+
+
+async def scrape_platform(platform: str, query: str, limit: int = DEFAULT_PRODUCT_LIMIT,
+                          pool: Optional[BrowserPool] = None,
+                          timeout: Optional[float] = PLATFORM_TIMEOUT,
+                          cache: Union[ResponseCache, bool] = HTTP_CACHE_ENABLED,
+                          log_products: bool = True) -> PlatformResult:
+    """
+    Scrape a single platform; errors and timeouts are captured, never raised.
+
+    Searches equivalent to one made within the cache TTL (same canonical
+    query) are answered from the product index or the on-disk cache
+    without opening a page, and a search identical to one already
+    running joins it instead of starting another. With `log_products`
+    False the scraper does not print a line per product.
+    """
+    started = time.perf_counter()
+    result = PlatformResult(platform=platform)
+    scraper = PLATFORM_SCRAPERS[platform](pool=pool, log_products=log_products)
+    if cache is True:
+        cache = get_cache()
+    try:
+        if cache:
+            cached = await _cached_products(cache, scraper, query, limit)
+            if cached is not None:
+                result.products = cached
+                result.stats['cache'] = 'hit'
+                return result
+        result.products = await asyncio.wait_for(_search_once(scraper, query, limit, cache), timeout)
+    except asyncio.TimeoutError:
+        result.error = f"timed out after {timeout:g}s"
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+    finally:
+        if getattr(scraper, 'request_filter', None):
+            result.stats.update(scraper.request_filter.stats())
+        try:
+            await scraper.close()
+        except Exception:
+            pass
+        result.elapsed = time.perf_counter() - started
+    return result
+
+
+def _platform_list(platforms: Optional[List[str]]) -> List[str]:
+    if platforms is None:
+        return list(PLATFORM_SCRAPERS)
+    unknown = [p for p in platforms if p not in PLATFORM_SCRAPERS]
+    if unknown:
+        raise ValueError(f"Unknown platform(s): {', '.join(unknown)}")
+    return list(platforms)
+
+
+async def scrape_platforms(query: str, limit: int = DEFAULT_PRODUCT_LIMIT,
+                           platforms: Optional[List[str]] = None,
+                           pool: Optional[BrowserPool] = None,
+                           timeout: Optional[float] = PLATFORM_TIMEOUT,
+                           concurrent: bool = True,
+                           cache: Union[ResponseCache, bool] = HTTP_CACHE_ENABLED,
+                           log_products: bool = True) -> List[PlatformResult]:
+    """
+    Scrape every platform and return one PlatformResult per platform, in order.
+
+    In concurrent mode each platform runs as its own task, so a failure or hang
+    on one side is cut off by its own timeout and never discards the others.
+    """
+    platforms = _platform_list(platforms)
+    if not concurrent:
+        return [await scrape_platform(p, query, limit, pool, timeout, cache, log_products) for p in platforms]
+
+    tasks = [asyncio.create_task(scrape_platform(p, query, limit, pool, timeout, cache, log_products))
+             for p in platforms]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def iter_platforms(query: str, limit: int = DEFAULT_PRODUCT_LIMIT,
+                         platforms: Optional[List[str]] = None,
+                         pool: Optional[BrowserPool] = None,
+                         timeout: Optional[float] = PLATFORM_TIMEOUT,
+                         concurrent: bool = True,
+                         cache: Union[ResponseCache, bool] = HTTP_CACHE_ENABLED,
+                         log_products: bool = True) -> AsyncIterator[PlatformResult]:
+    """
+    Like scrape_platforms, but yield each PlatformResult as soon as its platform finishes.
+
+    Callers can write out or submit the fastest platform's products while
+    the others are still running. Closing the generator early cancels the
+    platforms that have not finished.
+    """
+    platforms = _platform_list(platforms)
+    if not concurrent:
+        for p in platforms:
+            yield await scrape_platform(p, query, limit, pool, timeout, cache, log_products)
+        return
+
+    tasks = [asyncio.create_task(scrape_platform(p, query, limit, pool, timeout, cache, log_products))
+             for p in platforms]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
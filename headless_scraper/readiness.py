@@ -0,0 +1,88 @@
+"""Event-driven page readiness and politeness pacing for headless searches"""
+import asyncio
+import time
+from typing import Dict
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from headless_scraper.config import (
+    random_delay,
+    MIN_NAVIGATION_DELAY,
+    MAX_NAVIGATION_DELAY,
+    RESULTS_TIMEOUT,
+    RESULTS_QUIET_MS,
+    RESULTS_SETTLE_MAX_MS,
+)
+
+# Resolves once the number of matching cards has not changed for quietMs,
+# or after maxMs regardless. Unrelated DOM churn (carousels, ads) does not
+# reset the timer; only a change in card count does.
+_CARD_COUNT_PLATEAU_JS = """({selector, quietMs, maxMs}) => new Promise(resolve => {
+    const count = () => document.querySelectorAll(selector).length;
+    let last = count();
+    let quiet;
+    const finish = () => {
+        observer.disconnect();
+        clearTimeout(quiet);
+        clearTimeout(cap);
+        resolve(count());
+    };
+    const observer = new MutationObserver(() => {
+        const current = count();
+        if (current !== last) {
+            last = current;
+            clearTimeout(quiet);
+            quiet = setTimeout(finish, quietMs);
+        }
+    });
+    observer.observe(document.documentElement, {childList: true, subtree: true});
+    quiet = setTimeout(finish, quietMs);
+    const cap = setTimeout(finish, maxMs);
+})"""
+
+
+async def wait_for_results(page, selector: str, timeout: int = RESULTS_TIMEOUT,
+                           quiet_ms: int = RESULTS_QUIET_MS,
+                           max_settle_ms: int = RESULTS_SETTLE_MAX_MS) -> int:
+    """
+    Return as soon as result cards are present and their count has settled.
+
+    Raises Playwright's TimeoutError if no card appears within `timeout` ms.
+    Returns the settled card count.
+    """
+    await page.wait_for_selector(selector, timeout=timeout)
+    return await page.evaluate(_CARD_COUNT_PLATEAU_JS, {
+        'selector': selector,
+        'quietMs': quiet_ms,
+        'maxMs': max_settle_ms,
+    })
+
+
+class NavigationPacer:
+    """
+    Keep a random politeness gap between consecutive navigations to one platform.
+
+    The first navigation goes out immediately; later ones wait only for
+    whatever is left of the gap since the previous navigation started.
+    """
+
+    def __init__(self, min_delay: float = MIN_NAVIGATION_DELAY,
+                 max_delay: float = MAX_NAVIGATION_DELAY):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._next_allowed: Dict[str, float] = {}
+
+    async def wait(self, platform: str) -> float:
+        # No await between reading and reserving the slot, so no lock is needed
+        now = time.monotonic()
+        start = max(now, self._next_allowed.get(platform, now))
+        self._next_allowed[platform] = start + random_delay(self.min_delay, self.max_delay)
+        delay = start - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+# Shared by every scraper in the process so parallel searches stay polite
+navigation_pacer = NavigationPacer()
@@ -1,29 +1,44 @@
 """Main orchestrator for headless scraping"""
 import asyncio
 import argparse
+import contextlib
 import json
-import requests
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from headless_scraper.amazon_headless import AmazonHeadlessScraper
-from headless_scraper.flipkart_headless import FlipkartHeadlessScraper
-from headless_scraper.config import API_ENDPOINT, DEFAULT_PRODUCT_LIMIT
-from headless_scraper.utils import clean_product_data
+from headless_scraper.browser_pool import BrowserPool
+from headless_scraper.platforms import PLATFORM_SCRAPERS, iter_platforms
+from headless_scraper.config import API_ENDPOINT, DEFAULT_PRODUCT_LIMIT, PLATFORM_TIMEOUT
+from headless_scraper.utils import clean_products
+from data_sender import batch_endpoint_for, submit_payloads
+from scraper_config import SUBMIT_CHUNK_SIZE
+from scraper_utils import NDJSONWriter, dump_records
+from scrape_metrics import configure_tracing, span, write_prometheus
 
 class ScraperOrchestrator:
     """Orchestrate scraping from multiple platforms"""
     
-    def __init__(self, api_endpoint: str = API_ENDPOINT):
+    def __init__(self, api_endpoint: str = API_ENDPOINT, pool: BrowserPool = None):
         self.api_endpoint = api_endpoint
         self.results = []
+        # Warm browsers reused across scrape_all calls; closed by close()
+        self.pool = pool or BrowserPool()
     
     async def scrape_all(self, query: str, limit: int = DEFAULT_PRODUCT_LIMIT, 
-                        platforms: List[str] = None):
+                        platforms: List[str] = None, concurrent: bool = True,
+                        timeout: float = PLATFORM_TIMEOUT):
         """Scrape from all specified platforms"""
+        async for product in self.stream_all(query, limit, platforms, concurrent, timeout):
+            self.results.append(product)
+        return self.results
+    
+    async def stream_all(self, query: str, limit: int = DEFAULT_PRODUCT_LIMIT,
+                         platforms: List[str] = None, concurrent: bool = True,
+                         timeout: float = PLATFORM_TIMEOUT) -> AsyncIterator[Dict]:
+        """Yield products from all specified platforms as soon as each platform finishes"""
         if platforms is None:
-            platforms = ['amazon', 'flipkart']
+            platforms = list(PLATFORM_SCRAPERS)
         
         print(f"\n{'='*60}")
         print(f"Starting Headless Scraper for: {query}")
@@ -31,28 +46,20 @@ class ScraperOrchestrator:
         print(f"Limit: {limit} products per platform")
         print(f"{'='*60}\n")
         
-        # Scrape Amazon
-        if 'amazon' in platforms:
-            amazon_scraper = AmazonHeadlessScraper()
-            try:
-                amazon_products = await amazon_scraper.search_products(query, limit)
-                self.results.extend(amazon_products)
-            finally:
-                await amazon_scraper.close()
-        
-        # Scrape Flipkart
-        if 'flipkart' in platforms:
-            flipkart_scraper = FlipkartHeadlessScraper()
-            try:
-                flipkart_products = await flipkart_scraper.search_products(query, limit)
-                self.results.extend(flipkart_products)
-            finally:
-                await flipkart_scraper.close()
-        
-        return self.results
+        # Platforms run as parallel tasks, each bounded by its own timeout
+        async for result in iter_platforms(query, limit, platforms, pool=self.pool,
+                                           timeout=timeout, concurrent=concurrent):
+            if not result.ok:
+                print(f"[{result.platform.title()}] Failed after {result.elapsed:.1f}s: {result.error}")
+            for product in result.products:
+                yield product
+    
+    async def close(self):
+        """Shut down the shared browser pool"""
+        await self.pool.close()
     
-    def send_to_api(self, products: List[Dict]) -> int:
-        """Send scraped products to backend API"""
+    async def send_to_api(self, products: List[Dict], chunk_size: int = SUBMIT_CHUNK_SIZE) -> int:
+        """Send scraped products to backend API in pipelined chunks"""
         if not products:
             print("\n[API] No products to send")
             return 0
@@ -62,39 +69,28 @@ class ScraperOrchestrator:
         print(f"Endpoint: {self.api_endpoint}")
         print(f"{'='*60}\n")
         
-        success_count = 0
-        for i, product in enumerate(products, 1):
-            try:
-                # Clean product data for API compatibility
-                cleaned_product = clean_product_data(product)
-                
-                response = requests.post(
-                    self.api_endpoint,
-                    json=cleaned_product,
-                    headers={'Content-Type': 'application/json'},
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    print(f"[API] [{i}/{len(products)}] ✓ {product['productName'][:50]}...")
-                    success_count += 1
-                else:
-                    print(f"[API] [{i}/{len(products)}] ✗ Failed: {response.status_code}")
-                    if response.text:
-                        print(f"       Error: {response.text[:100]}")
-                    
-            except Exception as e:
-                print(f"[API] [{i}/{len(products)}] ✗ Error: {str(e)}")
+        # Clean product data for API compatibility
+        payloads = clean_products(products)
+        
+        def report_chunk(chunk, body, error):
+            label = chunk[0]['productName'][:50] if len(chunk) == 1 else f"{len(chunk)} products"
+            if error is None:
+                print(f"[API] ✓ {label}")
+            else:
+                print(f"[API] ✗ {label} Failed: {error}")
+        
+        report = await submit_payloads(payloads, self.api_endpoint,
+                                       batch_endpoint=batch_endpoint_for(self.api_endpoint),
+                                       chunk_size=chunk_size, on_chunk=report_chunk)
         
-        print(f"\n[API] Successfully sent {success_count}/{len(products)} products")
-        return success_count
+        print(f"\n[API] Successfully sent {report.sent}/{len(products)} products")
+        return report.sent
     
     def save_to_file(self, products: List[Dict], filename: str = "scraped_data.json"):
-        """Save results to JSON file"""
+        """Save results to a JSON file (JSON lines for .ndjson/.jsonl names)"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(products, f, indent=2, ensure_ascii=False)
-            print(f"\n[File] Saved {len(products)} products to {filename}")
+            saved = dump_records(products, filename)
+            print(f"\n[File] Saved {saved} products to {filename}")
         except Exception as e:
             print(f"\n[File] Error saving to file: {str(e)}")
 
@@ -117,37 +113,109 @@ async def main():
     parser.add_argument(
         '--platforms', '-p',
         nargs='+',
-        choices=['amazon', 'flipkart'],
-        default=['amazon', 'flipkart'],
-        help='Platforms to scrape (default: both)'
+        choices=list(PLATFORM_SCRAPERS),
+        default=list(PLATFORM_SCRAPERS),
+        help='Platforms to scrape (default: all)'
+    )
+    parser.add_argument(
+        '--sequential',
+        action='store_true',
+        help='Scrape platforms one after another instead of concurrently'
+    )
+    parser.add_argument(
+        '--platform-timeout',
+        type=float,
+        default=PLATFORM_TIMEOUT,
+        help=f'Seconds allowed per platform (default: {PLATFORM_TIMEOUT:.0f})'
     )
     parser.add_argument(
         '--api', '-a',
         default=API_ENDPOINT,
         help=f'Backend API endpoint (default: {API_ENDPOINT})'
     )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=SUBMIT_CHUNK_SIZE,
+        help=f'Products per API request, 1 = one per request (default: {SUBMIT_CHUNK_SIZE})'
+    )
     parser.add_argument(
         '--save', '-s',
         action='store_true',
         help='Save results to scraped_data.json'
     )
+    parser.add_argument(
+        '--output', '-o',
+        help="Stream each product as a JSON line to this file as soon as it is scraped ('-' for stdout)"
+    )
+    parser.add_argument(
+        '--gzip',
+        action='store_true',
+        help='Gzip the --output stream (implied by a .gz file name)'
+    )
     parser.add_argument(
         '--no-send',
         action='store_true',
         help='Do not send to API (just scrape and optionally save)'
     )
+    parser.add_argument(
+        '--metrics-file',
+        help='Write per-stage timings and counters here in Prometheus text format on exit'
+    )
+    parser.add_argument(
+        '--trace-file',
+        help='Append every timed stage of this run to this file as JSON lines'
+    )
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const='scrape-profile',
+        metavar='PREFIX',
+        help='Profile the run; writes PREFIX.pstats/.collapsed/.json and prints a summary to stderr'
+    )
     
     args = parser.parse_args()
     
+    with contextlib.ExitStack() as stack:
+        writer = None
+        if args.output:
+            writer = stack.enter_context(NDJSONWriter(args.output, compress=args.gzip or None))
+            if args.output == '-':
+                # Keep progress output off stdout so it carries only products
+                stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        if args.trace_file:
+            configure_tracing(args.trace_file)
+            stack.callback(configure_tracing, None)
+        if args.metrics_file:
+            stack.callback(write_prometheus, args.metrics_file)
+        if args.profile:
+            # Imported only when asked for, so normal runs carry none of it
+            from scrape_profiler import ScrapeProfiler
+            stack.enter_context(ScrapeProfiler(args.profile)).instrument_loop()
+        with span('scrape', query=args.query):
+            await run(args, writer)
+
+
+async def run(args, writer: NDJSONWriter = None):
+    """Scrape, stream, send and save as requested by the parsed arguments"""
     # Create orchestrator
     orchestrator = ScraperOrchestrator(api_endpoint=args.api)
     
-    # Scrape products
-    products = await orchestrator.scrape_all(
-        query=args.query,
-        limit=args.limit,
-        platforms=args.platforms
-    )
+    # Scrape products, writing each one out as soon as its platform finishes
+    products = []
+    try:
+        async for product in orchestrator.stream_all(
+            query=args.query,
+            limit=args.limit,
+            platforms=args.platforms,
+            concurrent=not args.sequential,
+            timeout=args.platform_timeout
+        ):
+            if writer is not None:
+                writer.write(product)
+            products.append(product)
+    finally:
+        await orchestrator.close()
     
     # Display results
     print(f"\n{'='*60}")
@@ -161,7 +229,7 @@ async def main():
     
     # Send to API
     if not args.no_send and products:
-        orchestrator.send_to_api(products)
+        await orchestrator.send_to_api(products, chunk_size=args.chunk_size)
     
     # Save to file
     if args.save and products:
@@ -1,50 +1,27 @@
 """Utility functions for headless scraper"""
-import re
-from typing import Optional
+import math
+from typing import Dict, List, Optional
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bulk_normalize import normalize_prices, normalize_ratings
+from scraper_utils import normalize_price, normalize_rating
+from scrape_metrics import span
 
 def parse_price(price_text: str) -> Optional[float]:
     """
     Parse price text and extract numeric value
     Examples: "₹1,09,900" -> 109900, "$99.99" -> 99.99
     """
-    if not price_text:
-        return None
-    
-    try:
-        # Remove all non-numeric characters except decimal point
-        # Keep only digits and period
-        numeric = re.sub(r'[^\d.]', '', price_text)
-        
-        if not numeric:
-            return None
-        
-        # Handle different formats
-        # If there's more than one decimal point, it's likely comma-separated (Indian format)
-        if numeric.count('.') > 1:
-            # Indian format: 1,09,900 -> remove last comma and periods
-            numeric = numeric.replace('.', '')
-        
-        return float(numeric)
-    except (ValueError, AttributeError):
-        return None
+    return normalize_price(price_text) if price_text else None
 
 def parse_rating(rating_text: str) -> Optional[float]:
     """
     Parse rating text
     Examples: "4.5 out of 5 stars" -> 4.5, "4.2" -> 4.2
     """
-    if not rating_text:
-        return None
-    
-    try:
-        # Extract first decimal number
-        match = re.search(r'\d+\.?\d*', rating_text)
-        if match:
-            return float(match.group())
-    except (ValueError, AttributeError):
-        pass
-    
-    return None
+    return normalize_rating(rating_text) if rating_text else None
 
 def clean_product_data(product: dict) -> dict:
     """
@@ -67,3 +44,20 @@ def clean_product_data(product: dict) -> dict:
             cleaned['rating'] = rating_value
     
     return cleaned
+
+def clean_products(products: List[Dict]) -> List[Dict]:
+    """
+    clean_product_data for a whole list, parsing all prices and ratings in one vectorized pass
+    """
+    with span("normalize", records=len(products)):
+        prices = normalize_prices([p.get('price') if isinstance(p.get('price'), str) else '' for p in products])
+        ratings = normalize_ratings([p.get('rating') if isinstance(p.get('rating'), str) else '' for p in products])
+    cleaned = []
+    for product, price, rating in zip(products, prices.tolist(), ratings.tolist()):
+        product = product.copy()
+        if isinstance(product.get('price'), str):
+            product['price'] = 0 if math.isnan(price) else price  # Default if parsing fails
+        if isinstance(product.get('rating'), str) and not math.isnan(rating):
+            product['rating'] = rating
+        cleaned.append(product)
+    return cleaned
@@ -0,0 +1,230 @@
+"""Local price-history store: scraped observations in SQLite (WAL) with indexed time-series queries.
+
+    python history_store.py latest "Apple Iphone 15"
+    python history_store.py history "Apple Iphone 15" --platform Amazon --days 30
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+from bulk_normalize import normalize_prices, normalize_ratings
+from scraper_config import HISTORY_BATCH_SIZE, HISTORY_DB_PATH
+from scraper_utils import ProductRecord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    product TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    observed_at REAL NOT NULL,
+    price REAL,
+    rating REAL,
+    url TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_product_platform_time
+    ON observations (product, platform, observed_at);
+"""
+
+_COLUMNS = "product, platform, observed_at, price, rating, url"
+
+Record = Union[ProductRecord, Mapping[str, object]]
+
+
+@dataclass(slots=True)
+class Observation:
+    product: str
+    platform: str
+    observed_at: float
+    price: Optional[float]
+    rating: Optional[float]
+    url: str
+
+    @property
+    def timestamp(self) -> str:
+        return datetime.fromtimestamp(self.observed_at).astimezone().isoformat()
+
+
+def _epoch(timestamp: object) -> float:
+    """ISO-8601 (aware, or naive local time as the headless scrapers write it) to epoch seconds."""
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if not timestamp:
+        return time.time()
+    return datetime.fromisoformat(str(timestamp).replace("Z", "+00:00")).timestamp()
+
+
+def _or_none(value: float) -> Optional[float]:
+    return None if value != value else value  # NaN -> NULL
+
+
+def _rows(records: List[Record]) -> List[tuple]:
+    """Table rows for a batch; payload prices and ratings are parsed in one vectorized pass."""
+    payloads = [record for record in records if not isinstance(record, ProductRecord)]
+    prices = iter(normalize_prices([payload.get("price") for payload in payloads]).tolist())
+    ratings = iter(normalize_ratings([payload.get("rating") for payload in payloads]).tolist())
+    rows = []
+    for record in records:
+        if isinstance(record, ProductRecord):
+            rows.append((record.productName, record.platform, float(record.observed_at),
+                         record.price, record.rating, record.url))
+            continue
+        rows.append((
+            str(record["productName"]),
+            str(record["platform"]),
+            _epoch(record.get("timestamp")),
+            _or_none(next(prices)),
+            _or_none(next(ratings)),
+            str(record.get("url", "")),
+        ))
+    return rows
+
+
+class HistoryStore:
+    """Append-mostly table of price observations.
+
+    Inserts are batched, one transaction per ``batch_size`` rows. WAL lets
+    readers run alongside the writer, so nothing ever rewrites the whole
+    file. Every query is served by the composite
+    ``(product, platform, observed_at)`` index. Thread-safe.
+    """
+
+    def __init__(self, path: str = HISTORY_DB_PATH, *, batch_size: int = HISTORY_BATCH_SIZE) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Durable at each checkpoint; a power cut can lose only the last transactions
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def add(self, records: Iterable[Record]) -> int:
+        """Insert observations in batched transactions; returns the number inserted."""
+        records = iter(records)
+        inserted = 0
+        while True:
+            batch = _rows(list(islice(records, self.batch_size)))
+            if not batch:
+                return inserted
+            with self._lock, self._db:
+                self._db.executemany(
+                    f"INSERT INTO observations ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)", batch
+                )
+            inserted += len(batch)
+
+    def _query(self, sql: str, params: tuple) -> List[Observation]:
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [Observation(*row) for row in rows]
+
+    def latest(self, product: str) -> Dict[str, Observation]:
+        """Most recent observation of ``product`` on each platform."""
+        observations = self._query(
+            f"""
+            SELECT {_COLUMNS} FROM observations AS o
+            WHERE o.product = ? AND o.observed_at = (
+                SELECT MAX(observed_at) FROM observations
+                WHERE product = o.product AND platform = o.platform
+            )
+            ORDER BY o.platform
+            """,
+            (product,),
+        )
+        return {obs.platform: obs for obs in observations}
+
+    def history(
+        self,
+        product: str,
+        *,
+        platform: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Observation]:
+        """Observations of ``product`` in ``[since, until)`` (epoch seconds), oldest first."""
+        clauses = ["product = ?"]
+        params: list = [product]
+        if platform is not None:
+            clauses.append("platform = ?")
+            params.append(platform)
+        if since is not None:
+            clauses.append("observed_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("observed_at < ?")
+            params.append(until)
+        sql = f"SELECT {_COLUMNS} FROM observations WHERE {' AND '.join(clauses)} ORDER BY observed_at"
+        if limit is not None:
+            # Newest `limit` rows, still returned oldest first
+            sql = f"SELECT * FROM ({sql} DESC LIMIT ?) ORDER BY observed_at"
+            params.append(limit)
+        return self._query(sql, tuple(params))
+
+    def iter_all(self, batch: int = 10_000) -> Iterator[Observation]:
+        """Every observation in insertion order, fetched ``batch`` rows at a time."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT id, {_COLUMNS} FROM observations WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch),
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for row in rows:
+                yield Observation(*row[1:])
+
+    def products(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT product FROM observations ORDER BY product").fetchall()
+        return [row[0] for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the local price-history store")
+    parser.add_argument("--db", default=HISTORY_DB_PATH, help="SQLite history file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    latest = commands.add_parser("latest", help="Latest observation per platform")
+    latest.add_argument("product")
+    history = commands.add_parser("history", help="Observations over a time window")
+    history.add_argument("product")
+    history.add_argument("--platform")
+    history.add_argument("--days", type=float, help="Only the last N days")
+    history.add_argument("--limit", type=int, help="Only the newest N observations")
+    args = parser.parse_args()
+
+    with HistoryStore(args.db) as store:
+        if args.command == "latest":
+            rows = list(store.latest(args.product).values())
+        else:
+            since = time.time() - args.days * 86400 if args.days else None
+            rows = store.history(args.product, platform=args.platform, since=since, limit=args.limit)
+    for obs in rows:
+        print(json.dumps({**asdict(obs), "timestamp": obs.timestamp}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Pluggable HTML parser backends for listing and product-page extraction."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from scraper_config import HTML_PARSER, PARTIAL_PARSING
+
+try:  # pragma: no cover - selectolax is optional
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+
+    SELECTOLAX_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    try:
+        from selectolax.parser import HTMLParser as _SelectolaxParser
+
+        SELECTOLAX_AVAILABLE = True
+    except ImportError:
+        _SelectolaxParser = None  # type: ignore
+        SELECTOLAX_AVAILABLE = False
+
+try:  # pragma: no cover - cssselect is optional
+    import cssselect
+    import lxml.etree
+    import lxml.html
+
+    LXML_CSS_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    LXML_CSS_AVAILABLE = False
+
+try:
+    import lxml  # noqa: F401
+
+    LXML_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    LXML_AVAILABLE = False
+
+# Field name -> (fallback CSS selectors tried in order, attribute to read or None for text)
+FieldMap = Dict[str, Tuple[Tuple[str, ...], Optional[str]]]
+# Extracted values: None when no selector matched, otherwise text/attribute ("" if empty/missing)
+Extracted = Dict[str, Optional[str]]
+
+
+def _token_matcher(classes: Tuple[str, ...]) -> Callable[[object], bool]:
+    wanted = frozenset(classes)
+
+    def match(value: object) -> bool:
+        if not value:
+            return False
+        tokens = value.split() if isinstance(value, str) else value
+        return any(token in wanted for token in tokens)
+
+    return match
+
+
+@dataclass(frozen=True)
+class ExtractionSpec:
+    """What to pull out of a page.
+
+    ``cards`` are tried in order and the first selector with matches wins;
+    each match is one record. Without ``cards`` the whole document is one
+    record. ``keep_tags``/``keep_ids``/``keep_classes`` describe the subtrees
+    a partial parse has to materialise for the selectors to still match.
+    """
+
+    fields: FieldMap
+    cards: Tuple[str, ...] = ()
+    keep_tags: Tuple[str, ...] = ()
+    keep_ids: Tuple[str, ...] = ()
+    keep_classes: Tuple[str, ...] = ()
+    keep_attrs: Dict[str, str] = field(default_factory=dict)
+
+    def strainer(self) -> Optional[SoupStrainer]:
+        """SoupStrainer keeping only the needed subtrees (attributes combine with AND)."""
+        attrs: Dict[str, object] = dict(self.keep_attrs)
+        if self.keep_ids:
+            attrs["id"] = _token_matcher(self.keep_ids)
+        if self.keep_classes:
+            attrs["class"] = _token_matcher(self.keep_classes)
+        if not attrs:
+            return None
+        return SoupStrainer(list(self.keep_tags) or None, attrs=attrs)
+
+
+class ParserBackend(ABC):
+    name: str
+
+    @abstractmethod
+    def extract(self, html: str, spec: ExtractionSpec) -> List[Extracted]:
+        raise NotImplementedError
+
+    def warm(self, spec: ExtractionSpec) -> None:
+        """Precompile whatever the backend caches for ``spec``'s selectors."""
+
+
+class SoupBackend(ParserBackend):
+    """BeautifulSoup with ``html.parser`` or ``lxml``; optionally a SoupStrainer partial parse."""
+
+    def __init__(self, features: str = "html.parser", *, partial: bool = PARTIAL_PARSING) -> None:
+        self.features = features
+        self.partial = partial
+        self.name = f"bs4-{features}{'-partial' if partial else ''}"
+
+    @staticmethod
+    def _value(node, attr: Optional[str]) -> str:
+        if attr:
+            return node.get(attr) or ""
+        return node.get_text(strip=True)
+
+    def _fields(self, root, fields: FieldMap) -> Extracted:
+        out: Extracted = {}
+        for name, (selectors, attr) in fields.items():
+            out[name] = None
+            for selector in selectors:
+                node = root.select_one(selector)
+                if node is not None:
+                    out[name] = self._value(node, attr)
+                    break
+        return out
+
+    def extract(self, html: str, spec: ExtractionSpec) -> List[Extracted]:
+        strainer = spec.strainer() if self.partial else None
+        soup = BeautifulSoup(html, self.features, parse_only=strainer)
+        if not spec.cards:
+            return [self._fields(soup, spec.fields)]
+        for selector in spec.cards:
+            cards = soup.select(selector)
+            if cards:
+                return [self._fields(card, spec.fields) for card in cards]
+        return []
+
+
+class SelectolaxBackend(ParserBackend):
+    """selectolax (Lexbor) full parse in C; the fastest option when installed."""
+
+    name = "selectolax"
+
+    @staticmethod
+    def _value(node, attr: Optional[str]) -> str:
+        if attr:
+            return node.attributes.get(attr) or ""
+        return node.text(strip=True)
+
+    @staticmethod
+    def _first(root, selector: str):
+        # Node.css() also matches the node itself; bs4's select_one only looks at descendants
+        root_id = getattr(root, "mem_id", None)
+        for node in root.css(selector):
+            if node.mem_id != root_id:
+                return node
+        return None
+
+    def _fields(self, root, fields: FieldMap) -> Extracted:
+        out: Extracted = {}
+        for name, (selectors, attr) in fields.items():
+            out[name] = None
+            for selector in selectors:
+                node = self._first(root, selector)
+                if node is not None:
+                    out[name] = self._value(node, attr)
+                    break
+        return out
+
+    def extract(self, html: str, spec: ExtractionSpec) -> List[Extracted]:
+        tree = _SelectolaxParser(html)
+        if not spec.cards:
+            return [self._fields(tree, spec.fields)]
+        for selector in spec.cards:
+            cards = tree.css(selector)
+            if cards:
+                return [self._fields(card, spec.fields) for card in cards]
+        return []
+
+
+class LxmlBackend(ParserBackend):
+    """lxml.html full parse with cssselect-compiled XPath (selectors cached per process)."""
+
+    name = "lxml"
+
+    def __init__(self) -> None:
+        self._compiled: Dict[str, object] = {}
+
+    def _css(self, selector: str):
+        compiled = self._compiled.get(selector)
+        if compiled is None:
+            # descendant:: (not descendant-or-self::) so a card never matches itself, as in bs4
+            xpath = cssselect.HTMLTranslator().css_to_xpath(selector, prefix="descendant::")
+            compiled = self._compiled[selector] = lxml.etree.XPath(xpath)
+        return compiled
+
+    def warm(self, spec: ExtractionSpec) -> None:
+        for selector in spec.cards:
+            self._css(selector)
+        for selectors, _ in spec.fields.values():
+            for selector in selectors:
+                self._css(selector)
+
+    @staticmethod
+    def _value(node, attr: Optional[str]) -> str:
+        if attr:
+            return node.get(attr) or ""
+        # Match BeautifulSoup's get_text(strip=True): stripped text nodes, comments skipped
+        return "".join(
+            piece.strip() for piece in node.xpath(".//text()[not(parent::script or parent::style)]") if piece.strip()
+        )
+
+    def _first(self, root, selector: str):
+        matches = self._css(selector)(root)
+        return matches[0] if matches else None
+
+    def _fields(self, root, fields: FieldMap) -> Extracted:
+        out: Extracted = {}
+        for name, (selectors, attr) in fields.items():
+            out[name] = None
+            for selector in selectors:
+                node = self._first(root, selector)
+                if node is not None:
+                    out[name] = self._value(node, attr)
+                    break
+        return out
+
+    def extract(self, html: str, spec: ExtractionSpec) -> List[Extracted]:
+        if not html.strip():
+            return [dict.fromkeys(spec.fields)] if not spec.cards else []
+        tree = lxml.html.fromstring(html)
+        if not spec.cards:
+            return [self._fields(tree, spec.fields)]
+        for selector in spec.cards:
+            cards = self._css(selector)(tree)
+            if cards:
+                return [self._fields(card, spec.fields) for card in cards]
+        return []
+
+
+def available_parsers() -> List[str]:
+    names = []
+    if SELECTOLAX_AVAILABLE:
+        names.append("selectolax")
+    if LXML_CSS_AVAILABLE:
+        names.append("lxml")
+    if LXML_AVAILABLE:
+        names.append("bs4-lxml")
+    names.append("bs4")
+    return names
+
+
+def get_parser(name: Union[str, ParserBackend] = HTML_PARSER, *, partial: bool = PARTIAL_PARSING) -> ParserBackend:
+    """Resolve a backend by name; ``"auto"`` picks the fastest one installed.
+
+    Names: ``selectolax``, ``lxml``, ``bs4-lxml``, ``bs4`` (``html.parser``).
+    ``partial`` applies to the BeautifulSoup backends, which otherwise build the
+    whole tree in Python; the C parsers always parse the full document.
+    """
+    if isinstance(name, ParserBackend):
+        return name
+    if name == "auto":
+        name = available_parsers()[0]
+    if name == "selectolax":
+        if not SELECTOLAX_AVAILABLE:
+            raise RuntimeError("selectolax is not installed; pick another HTML parser.")
+        return SelectolaxBackend()
+    if name == "lxml":
+        if not LXML_CSS_AVAILABLE:
+            raise RuntimeError("lxml/cssselect are not installed; pick another HTML parser.")
+        return LxmlBackend()
+    if name == "bs4-lxml":
+        return SoupBackend("lxml", partial=partial)
+    if name == "bs4":
+        return SoupBackend("html.parser", partial=partial)
+    raise ValueError(f"Unknown HTML parser: {name}")
@@ -0,0 +1,253 @@
+"""On-disk HTTP response cache with TTL, conditional revalidation and LRU eviction."""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from scraper_config import (
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_IGNORED_PARAMS,
+    HTTP_CACHE_MAX_BYTES,
+    HTTP_CACHE_TTL,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    body_hash TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS bodies (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of ``url`` for cache keys.
+
+    Lower-cases scheme and host, drops the fragment, Amazon's ``/ref=...``
+    path suffix and click-tracking query parameters, and sorts the rest.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path or "/"
+    if "/ref=" in path:
+        path = path[: path.index("/ref=")] or "/"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in HTTP_CACHE_IGNORED_PARAMS and not key.startswith("utm_")
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def cache_key(url: str, platform: str) -> str:
+    return hashlib.sha256(f"{platform.lower()}\n{normalize_url(url)}".encode("utf-8")).hexdigest()
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    body: str
+    stored_at: float
+    ttl: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    @property
+    def fresh(self) -> bool:
+        return self.age < self.ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if self.etag:
+            headers["if-none-match"] = self.etag
+        if self.last_modified:
+            headers["if-modified-since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Response bodies keyed by (platform, normalized URL).
+
+    Bodies are zlib-compressed and stored content-addressed under
+    ``bodies/``, so identical pages reached through different URLs are kept
+    once. A small SQLite index holds validators and access times; when the
+    compressed bodies exceed ``max_bytes`` the least recently used entries
+    are evicted. Safe to share between threads and processes.
+    """
+
+    def __init__(
+        self,
+        directory: str = HTTP_CACHE_DIR,
+        *,
+        ttl: float = HTTP_CACHE_TTL,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.stale = self.revalidated = 0
+        (self.directory / "bodies").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.directory / "index.sqlite3", timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def _body_path(self, body_hash: str) -> Path:
+        return self.directory / "bodies" / body_hash[:2] / f"{body_hash}.z"
+
+    def get(self, url: str, platform: str) -> Optional[CachedResponse]:
+        """The cached response, fresh or stale (check ``.fresh``), or None."""
+        key = cache_key(url, platform)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body_hash, stored_at, etag, last_modified FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            body_hash, stored_at, etag, last_modified = row
+            try:
+                body = zlib.decompress(self._body_path(body_hash).read_bytes()).decode("utf-8")
+            except (OSError, zlib.error):
+                # Body evicted by another process or damaged; treat as a miss
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        entry = CachedResponse(body, stored_at, self.ttl, etag, last_modified)
+        if entry.fresh:
+            self.hits += 1
+        else:
+            self.stale += 1
+        return entry
+
+    def store(
+        self,
+        url: str,
+        platform: str,
+        body: str,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        raw = body.encode("utf-8")
+        body_hash = hashlib.sha256(raw).hexdigest()
+        path = self._body_path(body_hash)
+        now = time.time()
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp.write_bytes(zlib.compress(raw, 6))
+                os.replace(tmp, path)
+            size = path.stat().st_size
+            key = cache_key(url, platform)
+            previous = self._db.execute("SELECT body_hash FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR IGNORE INTO bodies (hash, size) VALUES (?, ?)", (body_hash, size))
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_url(url), platform, body_hash, now, now, etag, last_modified),
+            )
+            if previous and previous[0] != body_hash:
+                self._drop_orphan(previous[0])
+            self._evict()
+            self._db.commit()
+
+    def mark_revalidated(self, url: str, platform: str) -> None:
+        """The origin answered 304: the stored body is fresh for another TTL."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, cache_key(url, platform)),
+            )
+            self._db.commit()
+        self.revalidated += 1
+
+    def _drop_orphan(self, body_hash: str) -> None:
+        if self._db.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone():
+            return
+        self._db.execute("DELETE FROM bodies WHERE hash = ?", (body_hash,))
+        try:
+            self._body_path(body_hash).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+        while total > self.max_bytes:
+            row = self._db.execute(
+                "SELECT key, body_hash FROM entries ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (row[0],))
+            self._drop_orphan(row[1])
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            hashes = [row[0] for row in self._db.execute("SELECT hash FROM bodies")]
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM bodies")
+            self._db.commit()
+            for body_hash in hashes:
+                try:
+                    self._body_path(body_hash).unlink()
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), (SELECT COALESCE(SUM(size), 0) FROM bodies) FROM entries"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "revalidated": self.revalidated,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_CACHE: Optional[ResponseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    """Return the process-wide cache in ``HTTP_CACHE_DIR``, opening it on first use."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = ResponseCache()
+    return _CACHE
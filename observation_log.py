@@ -0,0 +1,448 @@
+"""Columnar, append-only observation log with memory-mapped NumPy reads.
+
+    python observation_log.py stats observations/
+    python observation_log.py export observations/ prices.ndjson
+    python observation_log.py compact observations/
+
+A log is a directory of segments. Each segment is a directory of fixed-width
+column files, appended in place, and an append-only string table:
+
+    seg-000000/
+        observed_at.f8  price.f8  rating.f8     float64 (NaN = missing)
+        name.u4  platform.u4  url.u4            uint32 ids into strings.txt
+        strings.txt                             one JSON string per line, id = line number
+
+A segment holds at most ``segment_rows`` rows; appends then start the next
+one. Readers map each column with ``numpy.memmap``, so opening a segment
+copies nothing. A crash between column writes is repaired on the next open
+by truncating every column to the shortest one.
+
+Appends and compaction hold an exclusive lock on ``.lock`` in the log
+directory, so several processes can append to one log. Compaction stages
+new segments under fresh numbers, commits by writing ``compact.json``
+(which segments go, which come), then swaps them in; a log opened after a
+crash mid-swap finishes the swap, and an unfinished staging area is dropped.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Union
+
+import numpy as np
+
+from bulk_normalize import normalize_prices, normalize_ratings
+from scraper_config import OBS_LOG_DIR, OBS_SEGMENT_ROWS
+from scraper_utils import ProductRecord
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None  # type: ignore
+
+FLOAT_COLUMNS = ("observed_at", "price", "rating")
+STRING_COLUMNS = ("name", "platform", "url")
+_DTYPES = {**{c: np.dtype("<f8") for c in FLOAT_COLUMNS}, **{c: np.dtype("<u4") for c in STRING_COLUMNS}}
+_SUFFIX = {"<f8": "f8", "<u4": "u4"}
+
+Record = Union[ProductRecord, Mapping[str, object]]
+
+_STAGING = "compact.tmp"
+_RETIRED = "compact.old"
+_MANIFEST = "compact.json"
+
+
+@contextlib.contextmanager
+def _exclusive(path: Path) -> Iterator[None]:
+    """Block until this process holds the exclusive lock file ``path``."""
+    with open(path, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:  # pragma: no cover
+            while True:
+                try:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:  # pragma: no cover
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _column_path(directory: Path, column: str) -> Path:
+    return directory / f"{column}.{_SUFFIX[_DTYPES[column].str]}"
+
+
+def _epoch(timestamp: object) -> float:
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if not timestamp:
+        return float("nan")
+    return datetime.fromisoformat(str(timestamp).replace("Z", "+00:00")).timestamp()
+
+
+def _rows(records: List[Record]) -> List[tuple]:
+    """Column values per record; payload prices and ratings are parsed in one vectorized pass."""
+    payloads = [record for record in records if not isinstance(record, ProductRecord)]
+    prices = iter(normalize_prices([payload.get("price") for payload in payloads]).tolist())
+    ratings = iter(normalize_ratings([payload.get("rating") for payload in payloads]).tolist())
+    rows = []
+    for record in records:
+        if isinstance(record, ProductRecord):
+            rows.append((record.productName, record.platform, record.url, float(record.observed_at),
+                         float("nan") if record.price is None else record.price,
+                         float("nan") if record.rating is None else record.rating))
+            continue
+        rows.append((
+            str(record["productName"]),
+            str(record["platform"]),
+            str(record.get("url", "")),
+            _epoch(record.get("timestamp")),
+            next(prices),
+            next(ratings),
+        ))
+    return rows
+
+
+@dataclass
+class Segment:
+    """Read-only view of one segment; column arrays are memory-mapped, not loaded."""
+
+    path: Path
+    rows: int
+    strings: List[str]
+    columns: Dict[str, np.ndarray]
+
+    @classmethod
+    def open(cls, path: Path) -> "Segment":
+        rows = _row_count(path)
+        columns = {}
+        for column, dtype in _DTYPES.items():
+            if rows:
+                columns[column] = np.memmap(_column_path(path, column), dtype=dtype, mode="r", shape=(rows,))
+            else:
+                columns[column] = np.empty(0, dtype=dtype)
+        return cls(path, rows, _read_strings(path), columns)
+
+    def __getattr__(self, column: str) -> np.ndarray:
+        try:
+            return self.__dict__["columns"][column]
+        except KeyError:
+            raise AttributeError(column) from None
+
+    def decode(self, column: str) -> np.ndarray:
+        """A string column as an object array of str (this one does copy)."""
+        table = np.array(self.strings, dtype=object)
+        return table[self.columns[column]] if self.rows else np.empty(0, dtype=object)
+
+    def string_id(self, value: str) -> Optional[int]:
+        """Id of ``value`` in this segment, e.g. for ``segment.name == segment.string_id("...")``."""
+        ids = self.__dict__.get("_ids")
+        if ids is None:
+            ids = self.__dict__["_ids"] = {string: i for i, string in enumerate(self.strings)}
+        return ids.get(value)
+
+    def records(self) -> Iterator[Dict]:
+        cols = self.columns
+        for i in range(self.rows):
+            price, rating, ts = float(cols["price"][i]), float(cols["rating"][i]), float(cols["observed_at"][i])
+            yield {
+                "productName": self.strings[cols["name"][i]],
+                "platform": self.strings[cols["platform"][i]],
+                "price": None if np.isnan(price) else price,
+                "rating": None if np.isnan(rating) else rating,
+                "url": self.strings[cols["url"][i]],
+                "timestamp": None if np.isnan(ts) else datetime.fromtimestamp(ts).astimezone().isoformat(),
+            }
+
+
+def _read_strings(path: Path) -> List[str]:
+    table = path / "strings.txt"
+    if not table.exists():
+        return []
+    with open(table, encoding="utf-8") as f:
+        strings = []
+        for line in f:
+            if not line.endswith("\n"):
+                break  # torn final write; the columns never reference it
+            strings.append(json.loads(line))
+    return strings
+
+
+def _row_count(path: Path) -> int:
+    """Rows present in every column; a writer may be part-way through appending the rest."""
+    counts = []
+    for column, dtype in _DTYPES.items():
+        file = _column_path(path, column)
+        counts.append((file.stat().st_size if file.exists() else 0) // dtype.itemsize)
+    return min(counts)
+
+
+def _repair(path: Path) -> int:
+    """Writer only: truncate columns to a common row count after a crash mid-append."""
+    rows = _row_count(path)
+    for column, dtype in _DTYPES.items():
+        file = _column_path(path, column)
+        if file.stat().st_size != rows * dtype.itemsize:
+            with open(file, "r+b") as f:
+                f.truncate(rows * dtype.itemsize)
+    return rows
+
+
+class _SegmentWriter:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.mkdir(parents=True, exist_ok=True)
+        for column in _DTYPES:
+            _column_path(path, column).touch()
+        self.rows = _repair(path)
+        self.strings = {value: i for i, value in enumerate(_read_strings(path))}
+        # Drop a torn final string-table line so new strings get the right ids
+        with open(path / "strings.txt", "a+b") as f:
+            f.seek(0)
+            data = f.read()
+            keep = data.rfind(b"\n") + 1
+            if keep != len(data):
+                f.truncate(keep)
+        self.strings_size = keep
+
+    def stale(self) -> bool:
+        """Another process appended to (or compacted away) this segment since we last wrote."""
+        table = self.path / "strings.txt"
+        return (not table.exists() or table.stat().st_size != self.strings_size
+                or _row_count(self.path) != self.rows)
+
+    def _intern(self, value: str, pending: List[str]) -> int:
+        sid = self.strings.get(value)
+        if sid is None:
+            sid = self.strings[value] = len(self.strings)
+            pending.append(value)
+        return sid
+
+    def append(self, rows: List[tuple]) -> None:
+        new_strings: List[str] = []
+        ids = {c: np.empty(len(rows), dtype=_DTYPES[c]) for c in STRING_COLUMNS}
+        floats = {c: np.empty(len(rows), dtype=_DTYPES[c]) for c in FLOAT_COLUMNS}
+        for i, (name, platform, url, ts, price, rating) in enumerate(rows):
+            ids["name"][i] = self._intern(name, new_strings)
+            ids["platform"][i] = self._intern(platform, new_strings)
+            ids["url"][i] = self._intern(url, new_strings)
+            floats["observed_at"][i] = ts
+            floats["price"][i] = price
+            floats["rating"][i] = rating
+        # Strings first: a column row must never reference an id that is not on disk yet
+        if new_strings:
+            with open(self.path / "strings.txt", "ab") as f:
+                f.write("".join(json.dumps(s, ensure_ascii=False) + "\n" for s in new_strings).encode("utf-8"))
+                self.strings_size = f.tell()
+        for column, values in {**floats, **ids}.items():
+            with open(_column_path(self.path, column), "ab") as f:
+                f.write(values.tobytes())
+        self.rows += len(rows)
+
+
+class ObservationLog:
+    """Append ``ProductRecord``s (or payload dicts) to a segmented columnar log.
+
+    Any number of writer processes (they take turns on the directory lock)
+    and readers.
+    """
+
+    def __init__(self, directory: str = OBS_LOG_DIR, *, segment_rows: int = OBS_SEGMENT_ROWS) -> None:
+        self.directory = Path(directory)
+        self.segment_rows = segment_rows
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._writer: Optional[_SegmentWriter] = None
+        with self._locked():
+            self._recover()
+
+    def _locked(self) -> contextlib.AbstractContextManager:
+        return _exclusive(self.directory / ".lock")
+
+    def _recover(self) -> None:
+        """Finish a compaction that committed but crashed mid-swap; drop one that never committed."""
+        manifest = self.directory / _MANIFEST
+        staging = self.directory / _STAGING
+        retired = self.directory / _RETIRED
+        if manifest.exists():
+            plan = json.loads(manifest.read_text(encoding="utf-8"))
+            self._swap(plan["old"], plan["new"])
+        else:
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.rmtree(retired, ignore_errors=True)
+            (self.directory / f"{_MANIFEST}.tmp").unlink(missing_ok=True)
+
+    def _swap(self, old: List[str], new: List[str]) -> None:
+        """Move the ``old`` segments aside, the staged ``new`` ones in, then delete the old; idempotent."""
+        staging = self.directory / _STAGING
+        retired = self.directory / _RETIRED
+        retired.mkdir(exist_ok=True)
+        for name in old:
+            if (self.directory / name).exists():
+                os.replace(self.directory / name, retired / name)
+        for name in new:
+            if (staging / name).exists():
+                os.replace(staging / name, self.directory / name)
+        shutil.rmtree(retired)
+        shutil.rmtree(staging, ignore_errors=True)
+        (self.directory / _MANIFEST).unlink()
+
+    def segment_paths(self) -> List[Path]:
+        return sorted(p for p in self.directory.glob("seg-*") if p.is_dir() and not p.name.endswith(".tmp"))
+
+    def _next_segment_path(self) -> Path:
+        paths = self.segment_paths()
+        number = int(paths[-1].name.split("-")[1]) + 1 if paths else 0
+        return self.directory / f"seg-{number:06d}"
+
+    def _current_writer(self) -> _SegmentWriter:
+        if self._writer is not None and self._writer.stale():
+            self._writer = None
+        if self._writer is None:
+            paths = self.segment_paths()
+            self._writer = _SegmentWriter(paths[-1] if paths else self._next_segment_path())
+        if self._writer.rows >= self.segment_rows:
+            self._writer = _SegmentWriter(self._next_segment_path())
+        return self._writer
+
+    def append(self, records: Iterable[Record]) -> int:
+        """Append records, rolling over to a new segment every ``segment_rows``; returns the count."""
+        rows = _rows(list(records))
+        written = 0
+        with self._locked():
+            while written < len(rows):
+                writer = self._current_writer()
+                take = min(len(rows) - written, self.segment_rows - writer.rows)
+                writer.append(rows[written:written + take])
+                written += take
+        return written
+
+    def segments(self) -> List[Segment]:
+        return [Segment.open(path) for path in self.segment_paths()]
+
+    def __len__(self) -> int:
+        return sum(_row_count(path) for path in self.segment_paths())
+
+    def column(self, name: str) -> np.ndarray:
+        """One column across all segments (zero-copy when there is a single segment)."""
+        arrays = [segment.columns[name] for segment in self.segments()]
+        if not arrays:
+            return np.empty(0, dtype=_DTYPES[name])
+        return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+    def records(self) -> Iterator[Dict]:
+        for segment in self.segments():
+            yield from segment.records()
+
+    def export_json(self, out: TextIO, *, lines: bool = True) -> int:
+        """Write every record as NDJSON (or one JSON array); returns the count."""
+        count = 0
+        if not lines:
+            out.write("[")
+        for record in self.records():
+            if lines:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            else:
+                out.write(("," if count else "") + "\n  " + json.dumps(record, ensure_ascii=False))
+            count += 1
+        if not lines:
+            out.write("\n]\n")
+        return count
+
+    def compact(self, *, sort: bool = True) -> int:
+        """Rewrite all segments as full-size ones with fresh string tables.
+
+        Unreferenced strings are dropped and, with ``sort``, rows are
+        ordered by (name, platform, observed_at) so one product's history is
+        contiguous. Appends wait until it is done. The new segments are
+        written under new numbers and committed by ``compact.json`` before
+        any old segment is touched, so a crash at any point loses nothing.
+        Returns the row count.
+        """
+        with self._locked():
+            self._recover()
+            old = self.segment_paths()
+            if not old:
+                return 0
+            segments = [Segment.open(path) for path in old]
+            names = np.concatenate([s.decode("name") for s in segments])
+            platforms = np.concatenate([s.decode("platform") for s in segments])
+            urls = np.concatenate([s.decode("url") for s in segments])
+            floats = {c: np.concatenate([np.asarray(s.columns[c]) for s in segments]) for c in FLOAT_COLUMNS}
+            order = (np.lexsort((floats["observed_at"], platforms, names)) if sort and len(names)
+                     else np.arange(len(names)))
+
+            staging = self.directory / _STAGING
+            staging.mkdir()
+            rows = [
+                (names[i], platforms[i], urls[i], floats["observed_at"][i], floats["price"][i], floats["rating"][i])
+                for i in order
+            ]
+            # Numbered after the old segments, so recovery can always tell the two sets apart
+            first = int(old[-1].name.split("-")[1]) + 1
+            new = []
+            for number, start in enumerate(range(0, max(len(rows), 1), self.segment_rows), first):
+                name = f"seg-{number:06d}"
+                _SegmentWriter(staging / name).append(rows[start:start + self.segment_rows])
+                new.append(name)
+
+            del segments  # release the maps before moving their files
+            self._writer = None
+            manifest = self.directory / _MANIFEST
+            pending = self.directory / f"{_MANIFEST}.tmp"
+            pending.write_text(json.dumps({"old": [path.name for path in old], "new": new}), encoding="utf-8")
+            os.replace(pending, manifest)
+            self._swap([path.name for path in old], new)
+        return len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect, export or compact an observation log")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("stats", "Segment and row counts"), ("compact", "Merge and sort segments")):
+        commands.add_parser(name, help=help_text).add_argument("log", nargs="?", default=OBS_LOG_DIR)
+    export = commands.add_parser("export", help="Export as NDJSON ('-' for stdout)")
+    export.add_argument("log", nargs="?", default=OBS_LOG_DIR)
+    export.add_argument("output", nargs="?", default="-")
+    export.add_argument("--array", action="store_true", help="One JSON array instead of NDJSON")
+    args = parser.parse_args()
+
+    log = ObservationLog(args.log)
+    if args.command == "stats":
+        segments = log.segments()
+        print(json.dumps({
+            "segments": len(segments),
+            "rows": sum(s.rows for s in segments),
+            "strings": sum(len(s.strings) for s in segments),
+        }))
+    elif args.command == "compact":
+        print(f"Compacted {log.compact()} rows into {len(log.segment_paths())} segment(s)")
+    elif args.output == "-":
+        log.export_json(sys.stdout, lines=not args.array)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            count = log.export_json(f, lines=not args.array)
+        print(f"Exported {count} records to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Process pool for CPU-bound HTML parsing, so parsing scales with cores instead of the GIL."""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+from scraper_config import HTML_PARSER, PARSE_WORKERS
+from scraper_utils import ProductRecord
+
+# (module, class name) of a BaseScraper subclass; classes themselves are resolved in the worker
+ScraperPath = Tuple[str, str]
+# ProductRecord as a plain tuple in field order; cheaper to pickle than the dataclass
+PackedRecord = Tuple
+
+_RECORD_FIELDS = tuple(f.name for f in fields(ProductRecord))
+
+_worker_parser = HTML_PARSER
+_worker_scrapers: Dict[ScraperPath, object] = {}
+
+
+def scraper_path(scraper_cls: Type) -> ScraperPath:
+    return scraper_cls.__module__, scraper_cls.__qualname__
+
+
+def pack(record: ProductRecord) -> PackedRecord:
+    return tuple(getattr(record, name) for name in _RECORD_FIELDS)
+
+
+def unpack(packed: PackedRecord) -> ProductRecord:
+    return ProductRecord(*packed)
+
+
+def _worker_scraper(path: ScraperPath):
+    scraper = _worker_scrapers.get(path)
+    if scraper is None:
+        module, name = path
+        scraper_cls = getattr(importlib.import_module(module), name)
+        scraper = scraper_cls(parser=_worker_parser)
+        for spec in scraper_cls.specs:
+            scraper.parser.warm(spec)
+        _worker_scrapers[path] = scraper
+    return scraper
+
+
+def _init_worker(parser: str, paths: Sequence[ScraperPath]) -> None:
+    """Runs once per worker: resolve the parser and precompile every scraper's selectors."""
+    global _worker_parser
+    _worker_parser = parser
+    for path in paths:
+        _worker_scraper(path)
+
+
+def _parse_listing(path: ScraperPath, html: str) -> List[PackedRecord]:
+    return [pack(record) for record in _worker_scraper(path)._parse_listing(html)]
+
+
+def _parse_product_page(path: ScraperPath, html: str, url: str) -> Optional[PackedRecord]:
+    record = _worker_scraper(path)._parse_product_page(html, url)
+    return pack(record) if record is not None else None
+
+
+class ParseExecutor:
+    """Runs scrapers' ``_parse_listing``/``_parse_product_page`` in worker processes.
+
+    Workers are spawned on first use and warmed with the scrapers in
+    ``scrapers`` (selectors precompiled). Each job ships the raw HTML to a
+    worker and gets compact record tuples back. One executor can be shared
+    by any number of scrapers and threads.
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS, *, parser: str = HTML_PARSER,
+                 scrapers: Sequence[Type] = ()) -> None:
+        self.workers = max(1, workers)
+        self.parser = parser
+        self._paths = [scraper_path(cls) for cls in scrapers]
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the parent may already run Playwright/aiohttp threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.parser, self._paths),
+            )
+        return self._pool
+
+    def parse_listing(self, scraper_cls: Type, html: str) -> List[ProductRecord]:
+        packed = self._get_pool().submit(_parse_listing, scraper_path(scraper_cls), html).result()
+        return [unpack(item) for item in packed]
+
+    def parse_product_page(self, scraper_cls: Type, html: str, url: str) -> Optional[ProductRecord]:
+        packed = self._get_pool().submit(
+            _parse_product_page, scraper_path(scraper_cls), html, url
+        ).result()
+        return unpack(packed) if packed is not None else None
+
+    async def parse_listing_async(self, scraper_cls: Type, html: str) -> List[ProductRecord]:
+        loop = asyncio.get_running_loop()
+        packed = await loop.run_in_executor(
+            self._get_pool(), _parse_listing, scraper_path(scraper_cls), html
+        )
+        return [unpack(item) for item in packed]
+
+    async def parse_product_page_async(self, scraper_cls: Type, html: str, url: str) -> Optional[ProductRecord]:
+        loop = asyncio.get_running_loop()
+        packed = await loop.run_in_executor(
+            self._get_pool(), _parse_product_page, scraper_path(scraper_cls), html, url
+        )
+        return unpack(packed) if packed is not None else None
+
+    def map_listings(self, scraper_cls: Type, pages: Sequence[str]) -> List[List[ProductRecord]]:
+        """Parse many listing pages, spread over all workers, in input order."""
+        path = scraper_path(scraper_cls)
+        chunksize = max(1, len(pages) // (self.workers * 4))
+        results = self._get_pool().map(_parse_listing, [path] * len(pages), pages, chunksize=chunksize)
+        return [[unpack(item) for item in packed] for packed in results]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> "ParseExecutor":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
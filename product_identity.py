@@ -0,0 +1,200 @@
+"""Canonical query keys, stable product identities and an index of scraped products."""
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from scraper_config import IMPLIED_BRANDS, PRODUCT_INDEX_MAX_ITEMS, QUERY_STOPWORDS
+
+# Model codes ("s24", "a15") stay whole, and a trailing "+" is part of the token ("s24+", "pro+")
+_TOKEN = re.compile(r"[^\W\d_]{1,2}\d+\+*|[^\W\d_]+\+*|\d+(?:\.\d+)?\+*")
+_SPACE = re.compile(r"\s+")
+_ASIN = re.compile(r"/(?:dp|gp/product|gp/aw/d|product-reviews|exec/obidos/asin)/([A-Z0-9]{10})(?:[/?]|$)", re.I)
+_FLIPKART_ITEM = re.compile(r"/p/(itm[0-9a-z]+)", re.I)
+
+
+def query_tokens(text: str) -> List[str]:
+    """Lower-cased word and number tokens in any script.
+
+    "iPhone15-Pro" -> ["iphone", "15", "pro"]; "Galaxy S24+" -> ["galaxy", "s24+"].
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    if text.isascii():
+        return _TOKEN.findall(text)
+    # Combining marks (Devanagari vowel signs, nuktas) are not \w and would cut words apart:
+    # match on a copy where they stand in as letters, then slice the original
+    shadow = "".join("a" if unicodedata.category(ch)[0] == "M" else ch for ch in text)
+    return [text[match.start():match.end()] for match in _TOKEN.finditer(shadow)]
+
+
+def canonical_query(query: str) -> str:
+    """Search text with filler words, duplicates and implied brands removed, order kept.
+
+    "Apple iPhone 15 ", "iphone-15" and "iPhone 15" all become "iphone 15". A query
+    with nothing left ("the best") falls back to its normalized text, so it never
+    shares the empty key with unrelated searches.
+    """
+    tokens = [t for t in query_tokens(query) if t not in QUERY_STOPWORDS]
+    implied = {IMPLIED_BRANDS[t] for t in tokens if t in IMPLIED_BRANDS}
+    seen: Set[str] = set()
+    kept = []
+    for token in tokens:
+        if token in implied or token in seen:
+            continue
+        seen.add(token)
+        kept.append(token)
+    if not kept:
+        return _SPACE.sub(" ", unicodedata.normalize("NFKC", query).lower()).strip()
+    return " ".join(kept)
+
+
+def query_key(query: str) -> str:
+    """Order-insensitive key for equivalent searches ("15 iphone" == "iPhone 15")."""
+    return " ".join(sorted(canonical_query(query).split()))
+
+
+def title_key(title: str) -> str:
+    """Identity key for a product title; same normalisation as queries."""
+    return query_key(title)
+
+
+def asin_from_url(url: str) -> Optional[str]:
+    match = _ASIN.search(urlsplit(url).path + "/")
+    return match.group(1).upper() if match else None
+
+
+def flipkart_pid(url: str) -> Optional[str]:
+    """The ``pid`` query parameter of a Flipkart ``/p/`` URL, else its ``itm...`` id."""
+    parts = urlsplit(url)
+    if "/p/" not in parts.path:
+        return None
+    pid = parse_qs(parts.query).get("pid")
+    if pid and pid[0]:
+        return pid[0].upper()
+    match = _FLIPKART_ITEM.search(parts.path)
+    return match.group(1).lower() if match else None
+
+
+def product_key(url: str, platform: str = "") -> Optional[str]:
+    """Stable identity of a product page: ``amazon:<ASIN>`` or ``flipkart:<pid>``."""
+    host = (urlsplit(url).hostname or "").lower()
+    name = platform.lower()
+    if "amazon" in host or name == "amazon":
+        asin = asin_from_url(url)
+        return f"amazon:{asin}" if asin else None
+    if "flipkart" in host or name == "flipkart":
+        pid = flipkart_pid(url)
+        return f"flipkart:{pid}" if pid else None
+    return None
+
+
+def identity_key(url: str, platform: str, title: str) -> str:
+    """Identity of a scraped product: its product key, else platform plus title key."""
+    return product_key(url, platform) or f"{platform.lower()}:title:{title_key(title)}"
+
+
+def record_key(record: Dict) -> str:
+    return identity_key(str(record.get("url", "")), str(record.get("platform", "")),
+                        str(record.get("productName", "")))
+
+
+def merge_records(records: Iterable[Dict]) -> List[Dict]:
+    """Drop duplicate listings of one product (e.g. sponsored and organic cards), keeping the first."""
+    seen: Set[str] = set()
+    merged = []
+    for record in records:
+        key = record_key(record)
+        if key not in seen:
+            seen.add(key)
+            merged.append(record)
+    return merged
+
+
+@dataclass
+class _QueryEntry:
+    keys: List[str]
+    limit: int
+    indexed_at: float = field(default_factory=time.time)
+
+
+class ProductIndex:
+    """In-memory index from identity keys to the latest scraped record.
+
+    Records are reachable by product key (ASIN/pid, or title key when the
+    URL carries none) and searches by ``(platform, query_key)``, each in
+    O(1). Beyond ``max_items`` the least recently indexed products are
+    dropped. Thread-safe.
+    """
+
+    def __init__(self, max_items: int = PRODUCT_INDEX_MAX_ITEMS) -> None:
+        self.max_items = max_items
+        self._records: Dict[str, Tuple[float, Dict]] = {}
+        self._queries: Dict[Tuple[str, str], _QueryEntry] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, record: Dict) -> str:
+        key = record_key(record)
+        with self._lock:
+            # Re-insert so dict order stays least- to most-recently indexed
+            self._records.pop(key, None)
+            self._records[key] = (time.time(), dict(record))
+            while len(self._records) > self.max_items:
+                del self._records[next(iter(self._records))]
+        return key
+
+    def add_search(self, platform: str, query: str, limit: int, records: Iterable[Dict]) -> None:
+        keys = [self.add(record) for record in records]
+        with self._lock:
+            key = (platform.lower(), query_key(query))
+            self._queries.pop(key, None)
+            self._queries[key] = _QueryEntry(keys, limit)
+            while len(self._queries) > self.max_items:
+                del self._queries[next(iter(self._queries))]
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        with self._lock:
+            entry = self._records.get(key)
+        if entry is None or (max_age is not None and time.time() - entry[0] > max_age):
+            return None
+        return dict(entry[1])
+
+    def get_url(self, url: str, platform: str = "", max_age: Optional[float] = None) -> Optional[Dict]:
+        """Latest record for the product behind ``url``, whatever tracking params it carries."""
+        key = product_key(url, platform)
+        return self.get(key, max_age) if key else None
+
+    def get_search(self, platform: str, query: str, limit: int,
+                   max_age: Optional[float] = None) -> Optional[List[Dict]]:
+        """Records of an equivalent earlier search that fetched at least ``limit`` products."""
+        with self._lock:
+            entry = self._queries.get((platform.lower(), query_key(query)))
+        if entry is None or (max_age is not None and time.time() - entry.indexed_at > max_age):
+            return None
+        if entry.limit < limit and len(entry.keys) >= entry.limit:
+            return None
+        records = [self.get(key) for key in entry.keys[:limit]]
+        if any(record is None for record in records):
+            return None  # some were evicted
+        return records
+
+
+_INDEX: Optional[ProductIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_index() -> ProductIndex:
+    """Return the process-wide product index, creating it on first use."""
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = ProductIndex()
+    return _INDEX
@@ -0,0 +1,128 @@
+"""Per-host token-bucket rate limiting shared by every scraper in the process."""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from scraper_config import (
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_DEFAULT,
+    RATE_LIMIT_JITTER,
+    RATE_LIMIT_MIN,
+    RATE_LIMITS,
+)
+
+
+class HostRateLimiter:
+    """Token bucket for one host with AIMD adaptation.
+
+    ``rate`` tokens per second refill up to ``burst``. Callers reserve a token
+    and sleep only as long as the bucket requires, plus a little jitter.
+    ``penalize`` (429/503) halves the rate and honours Retry-After; each
+    success via ``reward`` creeps the rate back towards its configured ceiling.
+    Thread-safe; ``acquire_async`` sleeps without blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_DEFAULT,
+        *,
+        burst: float = RATE_LIMIT_BURST,
+        min_rate: float = RATE_LIMIT_MIN,
+        jitter: float = RATE_LIMIT_JITTER,
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.min_rate = min(min_rate, rate)
+        self.jitter = jitter
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token (possibly going into debt) and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            wait = max(wait, self._blocked_until - now)
+        if wait > 0 and self.jitter:
+            wait += random.uniform(0, self.jitter)
+        return wait
+
+    def acquire(self) -> float:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def reward(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+
+_LIMITERS: Dict[str, HostRateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or url).lower()
+
+
+def get_limiter(url_or_host: str) -> HostRateLimiter:
+    """Return the process-wide limiter for the URL's host, creating it on first use."""
+    host = host_of(url_or_host) if "://" in url_or_host else url_or_host.lower()
+    limiter = _LIMITERS.get(host)
+    if limiter is None:
+        with _LIMITERS_LOCK:
+            limiter = _LIMITERS.get(host)
+            if limiter is None:
+                limiter = HostRateLimiter(RATE_LIMITS.get(host, RATE_LIMIT_DEFAULT))
+                _LIMITERS[host] = limiter
+    return limiter
+
+
+def configure_host(
+    url_or_host: str,
+    rate: float,
+    *,
+    burst: float = RATE_LIMIT_BURST,
+    jitter: float = RATE_LIMIT_JITTER,
+) -> HostRateLimiter:
+    """Replace the limiter for the URL's host, e.g. to lift limits for a local test server."""
+    host = host_of(url_or_host) if "://" in url_or_host else url_or_host.lower()
+    limiter = HostRateLimiter(rate, burst=burst, jitter=jitter)
+    with _LIMITERS_LOCK:
+        _LIMITERS[host] = limiter
+    return limiter
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header; HTTP-date values are ignored."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
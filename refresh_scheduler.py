@@ -0,0 +1,464 @@
+"""Continuous re-scraping of known products, ordered by staleness and price volatility.
+
+    python refresh_scheduler.py --products-db data/products.db --rpm 20
+    python refresh_scheduler.py --input products.txt --history-db price-history.sqlite3 --plan
+
+Every product has a refresh interval between ``REFRESH_MIN_INTERVAL`` and
+``REFRESH_MAX_INTERVAL``. It is seeded from the stored price history: the
+more often consecutive prices moved, the shorter it starts. After each
+refresh it adapts: a price change multiplies it by ``REFRESH_SPEEDUP``, an
+unchanged refresh by ``REFRESH_BACKOFF``. Products wait in a heap ordered by
+their next due time (last seen + interval; never seen means due now), and
+every platform search takes a token from one global requests-per-minute
+budget, so a backlog drains most-overdue first instead of bursting.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import math
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from batch_scraper import read_items
+from bulk_normalize import normalize_prices
+from history_store import HistoryStore
+from rate_limiter import HostRateLimiter
+from headless_scraper.config import API_ENDPOINT
+from scraper_config import (
+    REFRESH_BACKOFF,
+    REFRESH_CHANGE_THRESHOLD,
+    REFRESH_DEFAULT_INTERVAL,
+    REFRESH_MAX_INTERVAL,
+    REFRESH_MIN_INTERVAL,
+    REFRESH_PRODUCTS_DB,
+    REFRESH_RELOAD_INTERVAL,
+    REFRESH_REQUESTS_PER_MINUTE,
+    REFRESH_SPEEDUP,
+    REFRESH_WORKERS,
+)
+from scrape_metrics import configure_tracing, span, write_prometheus
+
+PLATFORMS = ("amazon", "flipkart")
+
+# Returns the scraped products (raw or cleaned) for one product name
+RefreshFn = Callable[[str], Awaitable[List[Dict]]]
+
+
+@dataclass(slots=True)
+class ProductSeed:
+    """What the stores know about a product: when it was last seen and its price series per platform."""
+
+    name: str
+    last_seen: Optional[float] = None
+    series: Dict[str, List[float]] = field(default_factory=dict)  # platform -> prices, oldest first
+
+
+@dataclass(slots=True)
+class RefreshEntry:
+    name: str
+    interval: float
+    next_due: float
+    last_seen: Optional[float] = None
+    prices: Dict[str, float] = field(default_factory=dict)  # platform -> lowest price at the last refresh
+    refreshes: int = 0
+    changes: int = 0
+    failures: int = 0
+    running: bool = False
+    seq: int = 0  # heap generation; older heap items for this product are stale
+
+
+def _epoch(timestamp: object) -> Optional[float]:
+    """SQLite ``datetime('now')`` text (UTC) or ISO-8601 to epoch seconds."""
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    try:
+        parsed = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _changed(old: float, new: float, threshold: float = REFRESH_CHANGE_THRESHOLD) -> bool:
+    return abs(new - old) > threshold * max(abs(old), 1e-9)
+
+
+def change_ratio(series: Dict[str, List[float]]) -> Optional[float]:
+    """Share of consecutive price pairs, over all platforms, that moved; None without any pair."""
+    pairs = moved = 0
+    for prices in series.values():
+        for old, new in zip(prices, prices[1:]):
+            pairs += 1
+            moved += _changed(old, new)
+    return moved / pairs if pairs else None
+
+
+def lowest_prices(products: List[Dict]) -> Dict[str, float]:
+    """Lowest positive price per platform (lower-cased) in one scrape's results."""
+    lowest: Dict[str, float] = {}
+    prices = normalize_prices([product.get("price") for product in products])
+    for product, price in zip(products, prices.tolist()):
+        if not price > 0:  # NaN too
+            continue
+        platform = str(product.get("platform", "")).lower()
+        lowest[platform] = min(price, lowest.get(platform, math.inf))
+    return lowest
+
+
+def _series(rows: Iterable[Tuple[str, str, Optional[float], Optional[float]]]) -> Dict[str, ProductSeed]:
+    """Fold (name, platform, price, epoch) rows into seeds; one scrape's listings collapse to their lowest price."""
+    runs: Dict[Tuple[str, str, float], float] = {}
+    seeds: Dict[str, ProductSeed] = {}
+    for name, platform, price, observed_at in rows:
+        seed = seeds.get(name)
+        if seed is None:
+            seed = seeds[name] = ProductSeed(name)
+        if observed_at is None:
+            continue
+        seed.last_seen = max(seed.last_seen or observed_at, observed_at)
+        if price is None or not price > 0:
+            continue
+        key = (name, platform.lower(), round(observed_at))
+        runs[key] = min(price, runs.get(key, math.inf))
+    for (name, platform, _), price in sorted(runs.items(), key=lambda item: item[0][2]):
+        seeds[name].series.setdefault(platform, []).append(price)
+    return seeds
+
+
+def load_products_db(path: str, *, attempts: int = 3) -> Dict[str, ProductSeed]:
+    """Products and price history from the backend's SQLite file, opened read-only.
+
+    The backend rewrites the whole file when it saves, so a read that lands
+    mid-write is retried.
+    """
+    for attempt in range(attempts):
+        try:
+            db = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                rows = db.execute(
+                    "SELECT p.name, h.platform, h.price, h.timestamp FROM products p "
+                    "LEFT JOIN price_history h ON h.product_id = p.id"
+                ).fetchall()
+            finally:
+                db.close()
+            break
+        except sqlite3.DatabaseError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.5 * (attempt + 1))
+    return _series((name, platform or "", price, _epoch(ts)) for name, platform, price, ts in rows)
+
+
+def load_history_store(path: str) -> Dict[str, ProductSeed]:
+    """Products and price history from a local ``HistoryStore``."""
+    with HistoryStore(path) as history:
+        return _series((obs.product, obs.platform, obs.price, obs.observed_at) for obs in history.iter_all())
+
+
+class RefreshScheduler:
+    """Heap of products by next due time, refreshed under a global requests-per-minute budget.
+
+    ``add``/``sync`` feed it products; ``run`` pops due products and awaits
+    ``refresh(name)`` for each, at most ``workers`` at once. Every refresh
+    searches ``platforms`` platforms, so it takes that many budget tokens.
+    ``complete`` adapts the product's interval to what the refresh found.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: float = REFRESH_REQUESTS_PER_MINUTE,
+        workers: int = REFRESH_WORKERS,
+        platforms: int = len(PLATFORMS),
+        min_interval: float = REFRESH_MIN_INTERVAL,
+        max_interval: float = REFRESH_MAX_INTERVAL,
+        default_interval: float = REFRESH_DEFAULT_INTERVAL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.default_interval = min(max(default_interval, min_interval), self.max_interval)
+        self.workers = workers
+        self.platforms = platforms
+        self.clock = clock
+        # A burst of one refresh: an idle scheduler must not save up a stampede
+        self.budget = HostRateLimiter(requests_per_minute / 60.0, burst=platforms, jitter=0.0)
+        self.entries: Dict[str, RefreshEntry] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count(1)
+        self._wakeup = asyncio.Event()
+        self.refreshes = self.changes = self.failures = 0
+        self.lag = 0.0  # total seconds refreshes started after they were due
+
+    def seed_interval(self, ratio: Optional[float]) -> float:
+        """Geometric blend from the max interval (prices never move) to the min (they always do)."""
+        if ratio is None:
+            return self.default_interval
+        return self.max_interval * (self.min_interval / self.max_interval) ** ratio
+
+    def _push(self, entry: RefreshEntry) -> None:
+        entry.seq = next(self._seq)
+        heapq.heappush(self._heap, (entry.next_due, entry.seq, entry.name))
+        self._wakeup.set()
+
+    def add(self, seed: ProductSeed) -> RefreshEntry:
+        """Track a product (no-op if tracked); never-seen products are due now."""
+        entry = self.entries.get(seed.name)
+        if entry is not None:
+            return entry
+        interval = self.seed_interval(change_ratio(seed.series))
+        now = self.clock()
+        next_due = now if seed.last_seen is None else min(seed.last_seen + interval, now + interval)
+        entry = RefreshEntry(seed.name, interval, next_due, seed.last_seen,
+                             prices={platform: prices[-1] for platform, prices in seed.series.items() if prices})
+        self.entries[seed.name] = entry
+        self._push(entry)
+        return entry
+
+    def sync(self, seeds: Dict[str, ProductSeed]) -> Tuple[int, int]:
+        """Track new products and drop ones no longer listed; returns (added, removed)."""
+        added = sum(name not in self.entries for name in seeds)
+        for seed in seeds.values():
+            self.add(seed)
+        removed = [name for name in self.entries if name not in seeds]
+        for name in removed:
+            # Their heap items go stale; an in-flight refresh finishes and is not requeued
+            del self.entries[name]
+        return added, len(removed)
+
+    def complete(self, entry: RefreshEntry, products: Optional[List[Dict]]) -> None:
+        """Reschedule after a refresh; ``products`` is None when it failed."""
+        now = self.clock()
+        entry.running = False
+        if products is None or not products:
+            # Blocked or broken: retry after the shortest interval, leave the learned one alone
+            entry.failures += 1
+            self.failures += 1
+            entry.next_due = now + self.min_interval
+        else:
+            prices = lowest_prices(products)
+            moved = any(_changed(entry.prices[platform], price)
+                        for platform, price in prices.items() if platform in entry.prices)
+            factor = REFRESH_SPEEDUP if moved else REFRESH_BACKOFF
+            entry.interval = min(self.max_interval, max(self.min_interval, entry.interval * factor))
+            entry.prices.update(prices)
+            entry.last_seen = now
+            entry.refreshes += 1
+            self.refreshes += 1
+            if moved:
+                entry.changes += 1
+                self.changes += 1
+            entry.next_due = now + entry.interval
+        if self.entries.get(entry.name) is entry:
+            self._push(entry)
+
+    def _peek(self) -> Optional[RefreshEntry]:
+        while self._heap:
+            _, seq, name = self._heap[0]
+            entry = self.entries.get(name)
+            if entry is not None and entry.seq == seq and not entry.running:
+                return entry
+            heapq.heappop(self._heap)
+        return None
+
+    def plan(self) -> List[RefreshEntry]:
+        """Tracked products in the order they will be refreshed."""
+        return sorted(self.entries.values(), key=lambda entry: entry.next_due)
+
+    async def _refresh(self, entry: RefreshEntry, refresh: RefreshFn, slots: asyncio.Semaphore) -> None:
+        products = None
+        try:
+            with span("refresh", query=entry.name, interval=round(entry.interval)) as timing:
+                products = await refresh(entry.name)
+                timing.set(records=len(products or []))
+        except Exception as e:
+            print(f"[Scheduler] {entry.name}: refresh failed: {e}", file=sys.stderr)
+        finally:
+            slots.release()
+            self.complete(entry, products)
+
+    async def run(
+        self,
+        refresh: RefreshFn,
+        *,
+        reload: Optional[Callable[[], Dict[str, ProductSeed]]] = None,
+        reload_interval: float = REFRESH_RELOAD_INTERVAL,
+        stop: Optional[asyncio.Event] = None,
+        on_refresh: Optional[Callable[[RefreshEntry], None]] = None,
+    ) -> None:
+        """Refresh products as they fall due until ``stop`` is set; ``reload`` re-reads the product list."""
+        stop = stop or asyncio.Event()
+        slots = asyncio.Semaphore(self.workers)
+        tasks: set = set()
+        next_reload = self.clock() + reload_interval
+        try:
+            while not stop.is_set():
+                now = self.clock()
+                if reload is not None and now >= next_reload:
+                    next_reload = now + reload_interval
+                    try:
+                        added, removed = self.sync(await asyncio.to_thread(reload))
+                        if added or removed:
+                            print(f"[Scheduler] Product list: +{added} -{removed}, "
+                                  f"{len(self.entries)} tracked", file=sys.stderr)
+                    except Exception as e:
+                        print(f"[Scheduler] Reloading products failed: {e}", file=sys.stderr)
+                entry = self._peek()
+                delay = (entry.next_due - now) if entry is not None else math.inf
+                if delay > 0:
+                    if reload is not None:
+                        delay = min(delay, max(0.0, next_reload - now))
+                    self._wakeup.clear()
+                    waiters = [asyncio.ensure_future(stop.wait()), asyncio.ensure_future(self._wakeup.wait())]
+                    try:
+                        await asyncio.wait(waiters, timeout=None if delay == math.inf else delay,
+                                           return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        for waiter in waiters:
+                            waiter.cancel()
+                    continue
+                # Wait for a worker and the budget before committing to this product
+                await slots.acquire()
+                for _ in range(self.platforms):
+                    await self.budget.acquire_async()
+                entry = self._peek()
+                if entry is None or stop.is_set():
+                    slots.release()
+                    continue
+                heapq.heappop(self._heap)
+                entry.running = True
+                self.lag += max(0.0, self.clock() - entry.next_due)
+                if on_refresh is not None:
+                    on_refresh(entry)
+                task = asyncio.create_task(self._refresh(entry, refresh, slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _format_interval(seconds: float) -> str:
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 60:.0f}m"
+
+
+def print_plan(scheduler: RefreshScheduler, limit: int = 50) -> None:
+    now = scheduler.clock()
+    print(f"{'due in':>8}{'interval':>10}  product")
+    for entry in scheduler.plan()[:limit]:
+        due = max(0.0, entry.next_due - now)
+        print(f"{_format_interval(due) if due else 'now':>8}{_format_interval(entry.interval):>10}  {entry.name}")
+    budget = scheduler.budget.max_rate * 3600 / scheduler.platforms
+    demand = sum(3600 / entry.interval for entry in scheduler.entries.values())
+    print(f"\n{len(scheduler.entries)} products, ~{demand:.0f} refreshes/h wanted, budget {budget:.0f}/h")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Keep product prices fresh, refreshing volatile ones most often")
+    parser.add_argument("--products-db", default=None,
+                        help=f"Backend SQLite database to read products and history from "
+                             f"(default {REFRESH_PRODUCTS_DB} unless --input is given)")
+    parser.add_argument("--input", "-i", help="File with one product name per line, instead of the database")
+    parser.add_argument("--history-db", help="Seed history from this local price-history store and record into it")
+    parser.add_argument("--endpoint", default=API_ENDPOINT, help="Backend endpoint to submit refreshed prices to")
+    parser.add_argument("--rpm", type=float, default=REFRESH_REQUESTS_PER_MINUTE,
+                        help="Global budget of platform searches per minute")
+    parser.add_argument("--workers", type=int, default=REFRESH_WORKERS, help="Products refreshed at the same time")
+    parser.add_argument("--min-interval", type=float, default=REFRESH_MIN_INTERVAL, help="Seconds")
+    parser.add_argument("--max-interval", type=float, default=REFRESH_MAX_INTERVAL, help="Seconds")
+    parser.add_argument("--reload-interval", type=float, default=REFRESH_RELOAD_INTERVAL,
+                        help="Seconds between re-reads of the product list")
+    parser.add_argument("--plan", action="store_true", help="Print the refresh order and intervals, then exit")
+    parser.add_argument("--metrics-file", help="Rewrite Prometheus metrics here after every refresh")
+    parser.add_argument("--trace-file", help="Append every timed span here as a JSON line")
+    args = parser.parse_args()
+
+    products_db = args.products_db or (None if args.input else REFRESH_PRODUCTS_DB)
+
+    def load() -> Dict[str, ProductSeed]:
+        seeds: Dict[str, ProductSeed] = {}
+        if args.history_db:
+            seeds.update(load_history_store(args.history_db))
+        if products_db:
+            for name, seed in load_products_db(products_db).items():
+                if name not in seeds or (seed.last_seen or 0) > (seeds[name].last_seen or 0):
+                    seeds[name] = seed
+        if args.input:
+            with open(args.input, encoding="utf-8") as source:
+                names = read_items(source)
+            # The list decides which products are tracked; the stores only add what they know
+            seeds = {name: seeds.get(name) or ProductSeed(name) for name in names}
+        return seeds
+
+    scheduler = RefreshScheduler(requests_per_minute=args.rpm, workers=args.workers,
+                                 min_interval=args.min_interval, max_interval=args.max_interval)
+    scheduler.sync(load())
+    if args.plan:
+        print_plan(scheduler)
+        return
+    if not scheduler.entries:
+        print("[Scheduler] No products to refresh", file=sys.stderr)
+        sys.exit(1)
+
+    # The headless stack is only needed once we actually scrape
+    from headless_scraper.browser_pool import BrowserPool
+    from run_scraper import scrape_and_send
+
+    if args.trace_file:
+        configure_tracing(args.trace_file)
+
+    async def serve() -> None:
+        pool = BrowserPool(size=args.workers * len(PLATFORMS))
+        await pool.start()
+
+        async def refresh(name: str) -> List[Dict]:
+            # Bypass the HTTP cache: a refresh exists to see the current price
+            try:
+                return await scrape_and_send(name, args.endpoint, pool=pool, use_cache=False,
+                                             history_db=args.history_db) or []
+            finally:
+                if args.metrics_file:
+                    write_prometheus(args.metrics_file)
+
+        def started(entry: RefreshEntry) -> None:
+            seen = "never" if entry.last_seen is None else \
+                f"{_format_interval(scheduler.clock() - entry.last_seen)} ago"
+            print(f"[Scheduler] Refreshing {entry.name} (last seen {seen}, "
+                  f"interval {_format_interval(entry.interval)})", file=sys.stderr)
+
+        print(f"[Scheduler] Tracking {len(scheduler.entries)} products, budget {args.rpm:g} requests/min",
+              file=sys.stderr)
+        try:
+            await scheduler.run(refresh, reload=load, reload_interval=args.reload_interval,
+                                on_refresh=started)
+        finally:
+            await pool.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[Scheduler] {scheduler.refreshes} refreshes ({scheduler.changes} with price changes), "
+              f"{scheduler.failures} failed", file=sys.stderr)
+        if args.metrics_file:
+            write_prometheus(args.metrics_file)
+        if args.trace_file:
+            configure_tracing(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@ import asyncio
 import sys
 import os
 import argparse
+import contextlib
 import json
+import time
 from pathlib import Path
 import traceback
 
@@ -11,15 +13,22 @@ import traceback
 sys.path.insert(0, str(Path(__file__).parent))
 
 try:
-    from headless_scraper.amazon_headless import AmazonHeadlessScraper
-    from headless_scraper.flipkart_headless import FlipkartHeadlessScraper
+    from headless_scraper.browser_pool import BrowserPool
+    from headless_scraper.platforms import PLATFORM_SCRAPERS, iter_platforms
+    from headless_scraper.config import PLATFORM_TIMEOUT
 except ImportError as e:
     print(f"[ERROR] Failed to import scrapers: {e}")
     print("[INFO] Make sure Playwright is installed: pip install playwright")
     sys.exit(1)
 
-from headless_scraper.utils import clean_product_data
-import aiohttp
+from headless_scraper.utils import clean_products
+from data_sender import batch_endpoint_for, submit_payloads
+from history_store import HistoryStore
+from observation_log import ObservationLog
+from scraper_config import HTTP_CACHE_ENABLED, SUBMIT_CHUNK_SIZE
+from scrape_events import EventStream
+from scrape_metrics import configure_tracing, span, write_prometheus
+from scraper_utils import NDJSONWriter
 
 
 def safe_print(text: str):
@@ -39,44 +48,71 @@ def safe_print(text: str):
         print(safe_text, flush=True)
 
 
-async def scrape_and_send(product_name: str, endpoint: str):
-    """Scrape Amazon & Flipkart and send to backend endpoint"""
+async def scrape_and_send(product_name: str, endpoint: str, concurrent: bool = True,
+                          platform_timeout: float = PLATFORM_TIMEOUT,
+                          pool: BrowserPool = None, chunk_size: int = SUBMIT_CHUNK_SIZE,
+                          use_cache: bool = HTTP_CACHE_ENABLED, history_db: str = None,
+                          obs_log: str = None, output: NDJSONWriter = None,
+                          events: EventStream = None):
+    """
+    Scrape Amazon & Flipkart and send to backend endpoint.
     
-    all_products = []
-    amazon_scraper = None
-    flipkart_scraper = None
+    Pass a started `pool` to reuse warm browsers across calls; otherwise a
+    pool is created for this call and closed at the end. Returns the scraped
+    products. Submission is skipped when `endpoint` is empty; `chunk_size`
+    records are posted per request (1 posts each record on its own).
+    Searches repeated within the cache TTL are served from disk unless
+    `use_cache` is False. With `history_db` the products are also appended
+    to that local price-history store, and with `obs_log` to that columnar
+    observation log. With `output` each product is written as an NDJSON line
+    the moment its platform finishes, before the slower platform is done.
+    With `events`, record, platform_done, submitted and error events replace
+    the per-record log lines.
+    """
     
-    # Scrape Amazon
-    try:
-        print(f"[Amazon] Searching for: {product_name}")
-        amazon_scraper = AmazonHeadlessScraper()
-        amazon_products = await amazon_scraper.search_products(product_name, limit=5)
-        print(f"[Amazon] Found {len(amazon_products)} products")
-        all_products.extend(amazon_products)
-    except Exception as e:
-        print(f"[Amazon] Error: {str(e)}")
-        traceback.print_exc()
-    finally:
-        if amazon_scraper:
-            try:
-                await amazon_scraper.close()
-            except:
-                pass
+    all_products = []
+    payloads = []
+    results = []
+    # One warm browser pool shared by both platforms, stopped once at the end
+    owns_pool = pool is None
+    if owns_pool:
+        pool = BrowserPool()
     
-    # Scrape Flipkart
     try:
-        print(f"[Flipkart] Searching for: {product_name}")
-        flipkart_scraper = FlipkartHeadlessScraper()
-        flipkart_products = await flipkart_scraper.search_products(product_name, limit=5)
-        print(f"[Flipkart] Found {len(flipkart_products)} products")
-        all_products.extend(flipkart_products)
-    except Exception as e:
-        print(f"[Flipkart] Error: {str(e)}")
-        traceback.print_exc()
+        # Each platform gets its own timeout; one failing never drops the other's results
+        print(f"[INFO] Searching for: {product_name} ({'concurrent' if concurrent else 'sequential'})")
+        async for result in iter_platforms(product_name, limit=5, pool=pool,
+                                           timeout=platform_timeout, concurrent=concurrent,
+                                           cache=use_cache, log_products=events is None):
+            results.append(result)
+            label = result.platform.title()
+            if result.stats.get('cache') == 'hit':
+                print(f"[{label}] Found {len(result.products)} products in cache")
+            elif result.ok:
+                print(f"[{label}] Found {len(result.products)} products in {result.elapsed:.1f}s")
+            else:
+                print(f"[{label}] Error: {result.error}")
+            cleaned = clean_products(result.products)
+            if output is not None:
+                output.write_all(cleaned)
+            if events is not None:
+                for product in cleaned:
+                    events.emit("record", platform=result.platform, product=product)
+                if not result.ok:
+                    events.emit("error", stage="platform", platform=result.platform, message=result.error)
+                events.emit("platform_done", platform=result.platform, count=len(cleaned),
+                            elapsed=round(result.elapsed, 6), cached=result.stats.get('cache') == 'hit',
+                            error=result.error)
+            payloads.extend(cleaned)
+            all_products.extend(result.products)
+        saved = sum(r.stats.get('estimatedBytesSaved', 0) for r in results)
+        blocked = sum(r.stats.get('blockedRequests', 0) for r in results)
+        if blocked:
+            print(f"[INFO] Blocked {blocked} heavy/tracker requests (~{saved / 1024:.0f} KB saved)")
     finally:
-        if flipkart_scraper:
+        if owns_pool:
             try:
-                await flipkart_scraper.close()
+                await pool.close()
             except:
                 pass
     
@@ -85,58 +121,136 @@ async def scrape_and_send(product_name: str, endpoint: str):
         print("  1. Chromium browser is not installed (run: python -m playwright install chromium)")
         print("  2. The websites are blocking the scraper")
         print("  3. Search results page structure changed")
-        return
+        return all_products
     
-    # Send to backend
+    if history_db:
+        with HistoryStore(history_db) as history:
+            stored = await asyncio.to_thread(history.add, payloads)
+        print(f"[INFO] Recorded {stored} observations in {history_db}")
+    if obs_log:
+        logged = await asyncio.to_thread(ObservationLog(obs_log).append, payloads)
+        print(f"[INFO] Appended {logged} observations to {obs_log}")
+    
+    if not endpoint:
+        return all_products
+    
+    # Send to backend in chunks over pooled keep-alive connections
     print(f"\nSubmitting {len(all_products)} products to {endpoint}...")
+    
+    submit_started = time.perf_counter()
+    
+    def report_chunk(chunk, body, error):
+        if events is not None:
+            # A stored batch can still list records the backend refused
+            if error is not None:
+                rejected = len(chunk)
+            else:
+                rejected = len(body.get("rejected") or ()) if isinstance(body, dict) else 0
+            events.emit("submitted", records=len(chunk), accepted=len(chunk) - rejected,
+                        rejected=rejected, ok=error is None, error=error,
+                        elapsed=round(time.perf_counter() - submit_started, 6))
+            return
+        first = chunk[0]
+        label = f"{first['productName']} - {first['platform']}" if len(chunk) == 1 else f"{len(chunk)} products"
+        if error is None:
+            safe_print(f"  [OK] {label}")
+        else:
+            safe_print(f"  [X] {label} Failed: {error}")
+    
     try:
-        timeout = aiohttp.ClientTimeout(total=30)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            for idx, product in enumerate(all_products, 1):
-                try:
-                    # Clean data for API compatibility
-                    cleaned = clean_product_data(product)
-                    
-                    async with session.post(endpoint, json=cleaned) as resp:
-                        if resp.status == 200:
-                            safe_print(f"  [OK] [{idx}/{len(all_products)}] {cleaned['productName']} - {cleaned['platform']}")
-                        elif resp.status == 201:
-                            safe_print(f"  [OK] [{idx}/{len(all_products)}] {cleaned['productName']} - {cleaned['platform']} (Created)")
-                        else:
-                            safe_print(f"  [X] [{idx}/{len(all_products)}] Failed: HTTP {resp.status}")
-                except asyncio.TimeoutError:
-                    safe_print(f"  [X] [{idx}/{len(all_products)}] Timeout sending to backend")
-                except Exception as e:
-                    safe_print(f"  [X] [{idx}/{len(all_products)}] Error: {str(e)}")
+        report = await submit_payloads(payloads, endpoint,
+                                       batch_endpoint=batch_endpoint_for(endpoint),
+                                       chunk_size=chunk_size, on_chunk=report_chunk)
+        safe_print(f"Submitted {report.sent}/{len(payloads)} products in {report.chunks} requests"
+                   f" ({report.retries} retries)")
     except Exception as e:
         safe_print(f"[ERROR] Failed to send products to backend: {e}")
         traceback.print_exc()
+        if events is not None:
+            events.emit("error", stage="submit", message=str(e) or type(e).__name__)
     
     safe_print("\n[SUCCESS] Scraping complete!")
+    return all_products
 
 
 def main():
     parser = argparse.ArgumentParser(description="Headless scraper for Amazon & Flipkart")
     parser.add_argument("--product-name", required=True, help="Product name to search for")
     parser.add_argument("--endpoint", default="http://localhost:3001/api/scrape", help="Backend API endpoint")
+    parser.add_argument("--sequential", action="store_true", help="Scrape platforms one after another instead of concurrently")
+    parser.add_argument("--chunk-size", type=int, default=SUBMIT_CHUNK_SIZE, help="Records per backend request (1 = one record per request)")
+    parser.add_argument("--platform-timeout", type=float, default=PLATFORM_TIMEOUT, help="Seconds allowed per platform before it is cancelled")
+    parser.add_argument("--no-cache", action="store_true", help="Always scrape live instead of reusing recent results")
+    parser.add_argument("--history-db", help="Also append results to this local SQLite price history")
+    parser.add_argument("--obs-log", help="Also append results to this columnar observation log directory")
+    parser.add_argument("--output", "-o", help="Also stream results as JSON lines to this file ('-' for stdout)")
+    parser.add_argument("--gzip", action="store_true", help="Gzip the --output stream (implied by a .gz file name)")
+    parser.add_argument("--metrics-file", help="Write per-stage timings and counters here in Prometheus text format on exit")
+    parser.add_argument("--trace-file", help="Append every timed stage of this run to this file as JSON lines")
+    parser.add_argument("--events", nargs="?", const="-", metavar="FILE",
+                        help="Emit progress events as JSON lines to stdout (or FILE); log lines move to stderr")
+    parser.add_argument("--events-fd", type=int, metavar="FD",
+                        help="Emit progress events as JSON lines to this inherited file descriptor")
+    parser.add_argument("--quiet", action="store_true", help="Drop human-readable log lines")
+    parser.add_argument("--profile", nargs="?", const="scrape-profile", metavar="PREFIX",
+                        help="Profile the run; writes PREFIX.pstats/.collapsed/.json and prints a summary to stderr")
     
     args = parser.parse_args()
+    if args.output == "-" and args.events == "-":
+        parser.error("--output - and --events share stdout; send one of them elsewhere")
     
-    print(f"[INFO] Starting scraper for: {args.product_name}")
-    print(f"[INFO] Backend endpoint: {args.endpoint}")
-    
-    try:
-        # Run async scraper
-        asyncio.run(scrape_and_send(args.product_name, args.endpoint))
-        safe_print("[SUCCESS] Scraper completed successfully")
-    except KeyboardInterrupt:
-        safe_print("\n[INFO] Scraper interrupted by user")
-        sys.exit(0)
-    except Exception as e:
-        safe_print(f"[ERROR] Scraper failed: {e}")
-        traceback.print_exc()
-        sys.exit(1)
-
+    with contextlib.ExitStack() as stack:
+        output = None
+        if args.output:
+            output = stack.enter_context(NDJSONWriter(args.output, compress=args.gzip or None))
+        events = None
+        if args.events_fd is not None:
+            events = stack.enter_context(EventStream(args.events_fd))
+        elif args.events:
+            events = stack.enter_context(EventStream(args.events))
+        if args.quiet:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        elif "-" in (args.output, args.events):
+            # Keep log lines off stdout so it carries only results or events
+            stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        if args.trace_file:
+            configure_tracing(args.trace_file)
+            stack.callback(configure_tracing, None)
+        if args.metrics_file:
+            stack.callback(write_prometheus, args.metrics_file)
+        profiler = None
+        if args.profile:
+            # Imported only when asked for, so normal runs carry none of it
+            from scrape_profiler import ScrapeProfiler
+            profiler = stack.enter_context(ScrapeProfiler(args.profile))
+        
+        print(f"[INFO] Starting scraper for: {args.product_name}")
+        print(f"[INFO] Backend endpoint: {args.endpoint}")
+        
+        try:
+            # Run async scraper; every stage span of this run shares the scrape span's trace id
+            run_events = (events.run(query=args.product_name, platforms=list(PLATFORM_SCRAPERS),
+                                     concurrent=not args.sequential)
+                          if events is not None else contextlib.nullcontext())
+            with run_events, span("scrape", query=args.product_name):
+                scrape = scrape_and_send(args.product_name, args.endpoint,
+                                         concurrent=not args.sequential,
+                                         platform_timeout=args.platform_timeout,
+                                         chunk_size=args.chunk_size,
+                                         use_cache=not args.no_cache,
+                                         history_db=args.history_db,
+                                         obs_log=args.obs_log,
+                                         output=output,
+                                         events=events)
+                asyncio.run(profiler.instrumented(scrape) if profiler else scrape)
+            safe_print("[SUCCESS] Scraper completed successfully")
+        except KeyboardInterrupt:
+            safe_print("\n[INFO] Scraper interrupted by user")
+            sys.exit(0)
+        except Exception as e:
+            safe_print(f"[ERROR] Scraper failed: {e}")
+            traceback.print_exc()
+            sys.exit(1)
 
 if __name__ == "__main__":
     main()
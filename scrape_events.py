@@ -0,0 +1,86 @@
+"""Machine-readable progress of a scrape run as JSON lines, for the process that launched it.
+
+Every line is one event with ``event`` (its name), ``t`` (seconds since the
+run started, monotonic) and ``ts`` (epoch seconds), plus event fields:
+
+- ``started``: ``query``, ``platforms``, ``concurrent``, ``pid``
+- ``record``: ``platform`` and ``product`` (the cleaned payload as submitted)
+- ``platform_done``: ``platform``, ``count``, ``elapsed``, ``cached``, ``error``
+- ``submitted``: ``records``, ``accepted``, ``rejected``, ``ok``, ``error``, ``elapsed``
+  (one per backend chunk; ``rejected`` counts records the backend refused)
+- ``error``: ``stage``, ``message`` and ``platform`` where there is one
+- ``finished``: ``ok``, ``records``, ``submitted``, ``failed``, ``elapsed``
+
+``finished`` is always the last line, also when the run fails.
+"""
+from __future__ import annotations
+
+import contextlib
+import os
+import threading
+import time
+from typing import Any, Iterator, Union
+
+from scraper_utils import NDJSONWriter
+
+EVENT_NAMES = frozenset({"started", "record", "platform_done", "submitted", "error", "finished"})
+
+
+class EventStream:
+    """Write scrape events to ``"-"`` (stdout), a path, or an inherited file descriptor number.
+
+    Record and submission events are tallied as they are emitted, so
+    ``finished`` carries the totals without the scrape code counting twice.
+    """
+
+    def __init__(self, destination: Union[str, int] = "-") -> None:
+        if isinstance(destination, int):
+            # The caller keeps its end of the pipe; closing ours must not close the fd twice
+            stream = os.fdopen(destination, "w", encoding="utf-8", buffering=1, closefd=False)
+            self._writer = NDJSONWriter(stream)
+            self._stream = stream
+        else:
+            self._writer = NDJSONWriter(destination)
+            self._stream = None
+        self.records = self.submitted = self.failed = 0
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields: Any) -> None:
+        if event not in EVENT_NAMES:
+            raise ValueError(f"Unknown event: {event}")
+        line = {"event": event, "t": round(time.perf_counter() - self._started, 6), "ts": round(time.time(), 6)}
+        line.update(fields)
+        with self._lock:
+            if event == "record":
+                self.records += 1
+            elif event == "submitted":
+                self.submitted += fields.get("accepted", 0)
+                self.failed += fields.get("rejected", 0)
+            self._writer.write(line)
+
+    @contextlib.contextmanager
+    def run(self, **fields: Any) -> Iterator["EventStream"]:
+        """Emit ``started`` with ``fields``, then ``finished`` (after an ``error`` if the block raised)."""
+        self.emit("started", pid=os.getpid(), **fields)
+        ok = False
+        try:
+            yield self
+            ok = True
+        except BaseException as e:
+            self.emit("error", stage="run", message=str(e) or type(e).__name__)
+            raise
+        finally:
+            self.emit("finished", ok=ok, records=self.records, submitted=self.submitted,
+                      failed=self.failed, elapsed=round(time.perf_counter() - self._started, 6))
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._stream is not None:
+            self._stream.close()
+
+    def __enter__(self) -> "EventStream":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
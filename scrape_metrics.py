@@ -0,0 +1,269 @@
+"""Per-stage timing spans and counters for every scrape, exported as Prometheus text and JSON-lines traces.
+
+Stages recorded by the scrapers:
+
+- ``fetch``: one page fetch as seen by the scraper, cache lookups included
+- ``rate_limit``: time spent waiting on the per-host limiter before a request
+- ``request``: one HTTP attempt, from sending to the body being read
+- ``dns`` / ``connect``: name resolution and new connections (aiohttp engine)
+- ``search``: one headless search, parent of the stages below
+- ``navigation`` / ``selector_wait`` / ``evaluate``: the Playwright steps of a headless search
+- ``parse`` / ``normalize``: HTML extraction and price/rating normalization
+- ``submit``: one chunk POSTed to the backend, retries included
+
+Durations go into one histogram per (stage, platform); retries, errors and
+bytes into counters. When tracing is configured every span is also written
+as a JSON line carrying its trace id and parent span, so one scrape can be
+followed across tasks and threads (``contextvars`` follow both).
+"""
+from __future__ import annotations
+
+import bisect
+import contextvars
+import itertools
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO, Tuple, Union
+
+from scraper_config import METRICS_BUCKETS
+from scraper_utils import NDJSONWriter
+
+_COUNTERS = {
+    "retries": "Attempts retried after a failure.",
+    "errors": "Spans that ended with an exception.",
+    "bytes_received": "Response body bytes received.",
+    "bytes_sent": "Request body bytes sent.",
+}
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("scrape_span", default=None)
+_span_ids = itertools.count(1)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * (buckets + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class ScrapeMetrics:
+    """Thread-safe histograms of stage durations and counters, keyed by (stage, platform)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = METRICS_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._histograms: Dict[Tuple[str, str], _Histogram] = {}
+        self._counters: Dict[Tuple[str, str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, platform: str, seconds: float) -> None:
+        key = (stage, platform)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(len(self.buckets))
+            histogram.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+
+    def count(self, name: str, stage: str, platform: str = "", value: float = 1) -> None:
+        if name not in _COUNTERS:
+            raise ValueError(f"Unknown counter: {name}")
+        key = (name, stage, platform)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, List[dict]]:
+        """Plain-data copy: per-stage count/sum/mean seconds and the counters."""
+        with self._lock:
+            stages = [
+                {"stage": stage, "platform": platform, "count": h.count, "seconds": h.sum,
+                 "meanSeconds": h.sum / h.count if h.count else 0.0}
+                for (stage, platform), h in sorted(self._histograms.items())
+            ]
+            counters = [
+                {"name": name, "stage": stage, "platform": platform, "value": value}
+                for (name, stage, platform), value in sorted(self._counters.items())
+            ]
+        return {"stages": stages, "counters": counters}
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            histograms = sorted((key, list(h.counts), h.sum, h.count) for key, h in self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = [
+            "# HELP scraper_stage_seconds Time spent in each scrape stage.",
+            "# TYPE scraper_stage_seconds histogram",
+        ]
+        for (stage, platform), counts, total, count in histograms:
+            labels = f'stage="{_escape(stage)}",platform="{_escape(platform)}"'
+            cumulative = 0
+            for bound, hits in zip(self.buckets, counts):
+                cumulative += hits
+                lines.append(f'scraper_stage_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'scraper_stage_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"scraper_stage_seconds_sum{{{labels}}} {total!r}")
+            lines.append(f"scraper_stage_seconds_count{{{labels}}} {count}")
+        for name, help_text in _COUNTERS.items():
+            rows = [(key, value) for key, value in counters if key[0] == name]
+            if not rows:
+                continue
+            lines.append(f"# HELP scraper_{name}_total {help_text}")
+            lines.append(f"# TYPE scraper_{name}_total counter")
+            for (_, stage, platform), value in rows:
+                lines.append(f'scraper_{name}_total{{stage="{_escape(stage)}",platform="{_escape(platform)}"}} '
+                             f"{value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _TraceSink:
+    """NDJSONWriter shared by every thread that ends a span."""
+
+    def __init__(self, writer: NDJSONWriter) -> None:
+        self.writer = writer
+        self._lock = threading.Lock()
+
+    def write(self, line: dict) -> None:
+        with self._lock:
+            self.writer.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            self.writer.close()
+
+
+_METRICS: Optional[ScrapeMetrics] = None
+_METRICS_LOCK = threading.Lock()
+_tracer: Optional[_TraceSink] = None
+
+
+def get_metrics() -> ScrapeMetrics:
+    """Process-wide metrics registry that every span reports to."""
+    global _METRICS
+    if _METRICS is None:
+        with _METRICS_LOCK:
+            if _METRICS is None:
+                _METRICS = ScrapeMetrics()
+    return _METRICS
+
+
+def configure_tracing(destination: Union[str, Path, TextIO, None]) -> None:
+    """Write every finished span as a JSON line to ``destination`` (a path, ``"-"`` or a stream); None stops."""
+    global _tracer
+    previous, _tracer = _tracer, None
+    if previous is not None:
+        previous.close()
+    if destination is not None:
+        # Appended, so several runs (or processes) can share one trace file
+        _tracer = _TraceSink(NDJSONWriter(destination, append=True))
+
+
+def write_prometheus(path: Union[str, Path]) -> None:
+    """Write the current metrics atomically, e.g. for node_exporter's textfile collector."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(get_metrics().render(), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class Span:
+    """Times one stage; use via :func:`span` as a context manager.
+
+    ``set`` adds attributes to the trace line; ``received``/``sent`` count
+    bytes towards both the trace line and the byte counters.
+    """
+
+    __slots__ = ("stage", "platform", "attrs", "id", "parent", "trace", "_started", "_token")
+
+    def __init__(self, stage: str, platform: str, attrs: dict) -> None:
+        self.stage = stage
+        self.platform = platform
+        self.attrs = attrs
+        self.id = 0
+        self.parent: Optional[Span] = None
+        self.trace = ""
+        self._started = 0.0
+        self._token = None
+
+    def set(self, **attrs: object) -> None:
+        self.attrs.update(attrs)
+
+    def received(self, size: int) -> None:
+        self.attrs["bytesReceived"] = self.attrs.get("bytesReceived", 0) + size
+
+    def sent(self, size: int) -> None:
+        self.attrs["bytesSent"] = self.attrs.get("bytesSent", 0) + size
+
+    def __enter__(self) -> "Span":
+        self.parent = _current.get()
+        self.trace = self.parent.trace if self.parent is not None else os.urandom(8).hex()
+        self.id = next(_span_ids)
+        self._token = _current.set(self)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        seconds = time.perf_counter() - self._started
+        _current.reset(self._token)
+        error = None
+        if exc_type is not None:
+            error = exc_type.__name__
+            get_metrics().count("errors", self.stage, self.platform)
+        _finish(self, seconds, error)
+
+
+def span(stage: str, platform: str = "", **attrs: object) -> Span:
+    """Context manager timing ``stage``; ``attrs`` only go into the trace line."""
+    return Span(stage, platform, attrs)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def record(stage: str, seconds: float, platform: str = "", **attrs: object) -> None:
+    """Report a stage timed elsewhere (e.g. from client callbacks) as a child of the current span."""
+    finished = Span(stage, platform, attrs)
+    finished.parent = _current.get()
+    finished.trace = finished.parent.trace if finished.parent is not None else os.urandom(8).hex()
+    finished.id = next(_span_ids)
+    _finish(finished, seconds, None)
+
+
+def _finish(finished: Span, seconds: float, error: Optional[str]) -> None:
+    metrics = get_metrics()
+    metrics.observe(finished.stage, finished.platform, seconds)
+    attrs = finished.attrs
+    if "bytesReceived" in attrs:
+        metrics.count("bytes_received", finished.stage, finished.platform, attrs["bytesReceived"])
+    if "bytesSent" in attrs:
+        metrics.count("bytes_sent", finished.stage, finished.platform, attrs["bytesSent"])
+    tracer = _tracer
+    if tracer is None:
+        return
+    line = {
+        "trace": finished.trace,
+        "span": finished.id,
+        "parent": finished.parent.id if finished.parent is not None else None,
+        "stage": finished.stage,
+        "platform": finished.platform,
+        "start": round(time.time() - seconds, 6),
+        "seconds": round(seconds, 6),
+    }
+    if error is not None:
+        line["error"] = error
+    line.update(attrs)
+    tracer.write(line)
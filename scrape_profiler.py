@@ -0,0 +1,293 @@
+"""Opt-in profiling of a whole scrape run: cProfile, tracemalloc, asyncio task timing and stack samples.
+
+Nothing here is imported into the scrape path or installed unless a run asks
+for it (``--profile``), so a normal run pays nothing. A profiled run writes:
+
+- ``<prefix>.pstats``: cProfile stats of the event-loop thread (snakeviz, ``pstats``)
+- ``<prefix>.collapsed``: sampled stacks of every thread, one ``frame;frame;... count``
+  line per stack, for flamegraph.pl, speedscope or inferno
+- ``<prefix>.json``: the summary below as data
+
+and prints a summary table: wall vs CPU time, the hottest functions, the
+largest allocation sites, the per-stage timings from ``scrape_metrics`` and,
+per coroutine, how long its tasks were alive versus how long they actually
+ran on the loop. A task alive for seconds but busy for milliseconds was
+waiting on Playwright or the site, not on Python.
+"""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import collections
+import collections.abc
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Coroutine, Dict, List, Optional, TextIO, Tuple
+
+from scraper_config import PROFILE_SAMPLE_INTERVAL, PROFILE_TOP
+from scrape_metrics import get_metrics
+
+
+class _TaskTimes:
+    __slots__ = ("created", "busy", "steps")
+
+    def __init__(self) -> None:
+        self.created = time.perf_counter()
+        self.busy = 0.0
+        self.steps = 0
+
+
+class _TimedCoroutine(collections.abc.Coroutine):
+    """Wraps a task's coroutine and adds up the time each step runs on the loop."""
+
+    __slots__ = ("_coro", "_times")
+
+    def __init__(self, coro: Coroutine, times: _TaskTimes) -> None:
+        self._coro = coro
+        self._times = times
+
+    def send(self, value: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return self._coro.send(value)
+        finally:
+            self._times.busy += time.perf_counter() - started
+            self._times.steps += 1
+
+    def throw(self, *args: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return self._coro.throw(*args)
+        finally:
+            self._times.busy += time.perf_counter() - started
+            self._times.steps += 1
+
+    def close(self) -> None:
+        self._coro.close()
+
+    def __next__(self) -> Any:
+        return self.send(None)
+
+    def __iter__(self) -> "_TimedCoroutine":
+        return self
+
+    def __await__(self) -> "_TimedCoroutine":
+        # Awaiting drives send/throw above, so time spent under a plain await is counted too
+        return self
+
+    def __repr__(self) -> str:
+        return repr(self._coro)
+
+
+def _coroutine_name(coro: Any) -> str:
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stacks of all other threads every ``interval`` seconds."""
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.samples: collections.Counter = collections.Counter()
+        self._labels: Dict[Any, str] = {}
+        self._stop_event = threading.Event()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (f"{code.co_name} "
+                                          f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        return label
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class ScrapeProfiler:
+    """Profile everything between ``start`` and ``stop``; use as a context manager around a run.
+
+    cProfile sees only the thread that started it (the event loop's, for the
+    CLIs); the stack sampler sees every thread, including the Playwright and
+    ``asyncio.to_thread`` workers. Task timing needs ``instrument_loop`` (or
+    ``instrumented``) to be called on the running loop.
+    """
+
+    def __init__(self, prefix: str, *, interval: float = PROFILE_SAMPLE_INTERVAL, top: int = PROFILE_TOP,
+                 report: Optional[TextIO] = None) -> None:
+        self.prefix = prefix
+        self.interval = interval
+        self.top = top
+        self.report = report
+        self._profile = cProfile.Profile()
+        self._sampler = _StackSampler(interval)
+        self._tasks: Dict[str, List[float]] = {}  # coroutine -> [tasks, alive, busy, steps, longest]
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._previous_factory = None
+        self._started = self._cpu_started = 0.0
+        self.wall = self.cpu = 0.0
+        self._allocations: List[Tuple[str, int, int]] = []
+        self._peak_memory = 0
+        self._traced_before = False
+
+    def start(self) -> "ScrapeProfiler":
+        self._traced_before = tracemalloc.is_tracing()
+        if not self._traced_before:
+            tracemalloc.start()
+        self._sampler.start()
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._profile.enable()
+        return self
+
+    def instrument_loop(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Time every task created on ``loop`` (the running loop by default) from now on."""
+        self._loop = loop or asyncio.get_running_loop()
+        self._previous_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._task_factory)
+
+    async def instrumented(self, coro: Coroutine) -> Any:
+        """Run ``coro`` with task timing on; for ``asyncio.run(profiler.instrumented(main()))``."""
+        self.instrument_loop()
+        times = _TaskTimes()
+        try:
+            return await _TimedCoroutine(coro, times)
+        finally:
+            self._task_done(_coroutine_name(coro), times)
+
+    def _task_factory(self, loop: asyncio.AbstractEventLoop, coro: Coroutine, **kwargs: Any) -> asyncio.Future:
+        times = _TaskTimes()
+        name = _coroutine_name(coro)
+        task = asyncio.Task(_TimedCoroutine(coro, times), loop=loop, **kwargs)
+        task.add_done_callback(lambda _: self._task_done(name, times))
+        return task
+
+    def _task_done(self, name: str, times: _TaskTimes) -> None:
+        alive = time.perf_counter() - times.created
+        entry = self._tasks.setdefault(name, [0, 0.0, 0.0, 0, 0.0])
+        entry[0] += 1
+        entry[1] += alive
+        entry[2] += times.busy
+        entry[3] += times.steps
+        entry[4] = max(entry[4], alive)
+
+    def stop(self) -> None:
+        self._profile.disable()
+        self.wall = time.perf_counter() - self._started
+        self.cpu = time.process_time() - self._cpu_started
+        self._sampler.stop()
+        if self._loop is not None:
+            self._loop.set_task_factory(self._previous_factory)
+            self._loop = None
+        snapshot = tracemalloc.take_snapshot()
+        self._peak_memory = tracemalloc.get_traced_memory()[1]
+        if not self._traced_before:
+            tracemalloc.stop()
+        # Leave out the profiler's own bookkeeping (stack samples, task wrappers)
+        snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                           tracemalloc.Filter(False, __file__)))
+        self._allocations = [
+            (f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size, stat.count)
+            for stat in snapshot.statistics("lineno")[:self.top]
+        ]
+
+    def _functions(self) -> List[dict]:
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        rows = []
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():  # type: ignore[attr-defined]
+            rows.append({"function": f"{name} ({os.path.basename(filename)}:{line})", "calls": calls,
+                         "ownSeconds": own, "cumulativeSeconds": cumulative})
+        rows.sort(key=lambda row: row["cumulativeSeconds"], reverse=True)
+        return rows[:self.top]
+
+    def summary(self) -> dict:
+        tasks = [
+            {"coroutine": name, "tasks": int(count), "aliveSeconds": alive, "busySeconds": busy,
+             "steps": int(steps), "longestSeconds": longest}
+            for name, (count, alive, busy, steps, longest) in self._tasks.items()
+        ]
+        tasks.sort(key=lambda row: row["aliveSeconds"], reverse=True)
+        stages = sorted(get_metrics().snapshot()["stages"], key=lambda row: row["seconds"], reverse=True)
+        return {
+            "wallSeconds": self.wall,
+            "cpuSeconds": self.cpu,
+            "peakTracedMb": self._peak_memory / (1024 * 1024),
+            "samples": sum(self._sampler.samples.values()),
+            "functions": self._functions(),
+            "allocations": [{"site": site, "bytes": size, "blocks": count}
+                            for site, size, count in self._allocations],
+            "tasks": tasks[:self.top],
+            "stages": stages[:self.top],
+        }
+
+    def write(self) -> Dict[str, Path]:
+        """Write the stats, collapsed stacks and JSON summary next to ``prefix``."""
+        paths = {kind: Path(f"{self.prefix}.{kind}") for kind in ("pstats", "collapsed", "json")}
+        for path in paths.values():
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._profile.dump_stats(paths["pstats"])
+        with open(paths["collapsed"], "w", encoding="utf-8") as handle:
+            for stack, count in self._sampler.samples.most_common():
+                handle.write(f"{stack} {count}\n")
+        paths["json"].write_text(json.dumps(self.summary(), indent=2), encoding="utf-8")
+        return paths
+
+    def format_summary(self, summary: Optional[dict] = None) -> str:
+        summary = summary or self.summary()
+        lines = [
+            f"Profile: {summary['wallSeconds']:.2f}s wall, {summary['cpuSeconds']:.2f}s CPU, "
+            f"{summary['peakTracedMb']:.1f} MB peak traced, {summary['samples']} stack samples",
+            "",
+            f"{'cumulative s':>12}{'own s':>9}{'calls':>10}  function (event-loop thread)",
+        ]
+        for row in summary["functions"]:
+            lines.append(f"{row['cumulativeSeconds']:>12.3f}{row['ownSeconds']:>9.3f}{row['calls']:>10}  "
+                         f"{row['function']}")
+        if summary["tasks"]:
+            lines += ["", f"{'tasks':>6}{'alive s':>10}{'busy s':>9}{'busy %':>8}{'longest s':>11}  coroutine"]
+            for row in summary["tasks"]:
+                busy_share = row["busySeconds"] / row["aliveSeconds"] * 100 if row["aliveSeconds"] else 0.0
+                lines.append(f"{row['tasks']:>6}{row['aliveSeconds']:>10.3f}{row['busySeconds']:>9.3f}"
+                             f"{busy_share:>7.1f}%{row['longestSeconds']:>11.3f}  {row['coroutine']}")
+        if summary["stages"]:
+            lines += ["", f"{'spans':>6}{'total s':>10}{'mean ms':>10}  stage"]
+            for row in summary["stages"]:
+                label = f"{row['stage']} [{row['platform']}]" if row["platform"] else row["stage"]
+                lines.append(f"{row['count']:>6}{row['seconds']:>10.3f}{row['meanSeconds'] * 1000:>10.2f}  {label}")
+        if summary["allocations"]:
+            lines += ["", f"{'KB':>10}{'blocks':>9}  allocated at (still live at the end)"]
+            for row in summary["allocations"]:
+                lines.append(f"{row['bytes'] / 1024:>10.1f}{row['blocks']:>9}  {row['site']}")
+        return "\n".join(lines)
+
+    def __enter__(self) -> "ScrapeProfiler":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+        paths = self.write()
+        report = self.report or sys.stderr
+        print(self.format_summary(), file=report)
+        print("Profile written to " + ", ".join(str(path) for path in paths.values()), file=report)
@@ -1,7 +1,9 @@
 """Central configuration for the Real-Time Product Price Intelligence scraper."""
 from __future__ import annotations
 
+import os
 import random
+import tempfile
 from typing import Final
 
 BACKEND_ENDPOINT: Final[str] = "http://localhost:3000/scrape"
@@ -16,11 +18,24 @@ USER_AGENTS: Final[list[str]] = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
 ]
 
+# Only advertise brotli when a decoder is installed; otherwise br bodies arrive undecodable
+try:
+    import brotli  # noqa: F401
+
+    ACCEPT_ENCODING: Final[str] = "gzip, deflate, br"
+except ImportError:  # pragma: no cover - brotli is optional
+    try:
+        import brotlicffi  # noqa: F401
+
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
 def get_random_headers() -> dict[str, str]:
     """Generate realistic browser headers with rotation."""
     return {
         "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-        "accept-encoding": "gzip, deflate, br",
+        "accept-encoding": ACCEPT_ENCODING,
         "accept-language": "en-US,en;q=0.9,hi;q=0.8",
         "cache-control": "max-age=0",
         "sec-ch-ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
@@ -36,17 +51,90 @@ def get_random_headers() -> dict[str, str]:
 
 REQUEST_HEADERS: Final[dict[str, str]] = get_random_headers()
 
+# Async fetch engine (aiohttp) connection pool
+ASYNC_MAX_CONNECTIONS: Final[int] = 32
+ASYNC_CONNECTIONS_PER_HOST: Final[int] = 4
+
 # Retry configuration
 MAX_RETRIES: Final[int] = 3
-RETRY_DELAY_BASE: Final[float] = 2.0  # seconds
+RETRY_DELAY_BASE: Final[float] = 2.0  # seconds, doubled per retry not paced by the limiter
 RETRY_DELAY_MAX: Final[float] = 10.0  # seconds
 
-# Random delay ranges (seconds) to simulate human behavior
-MIN_DELAY_BETWEEN_REQUESTS: Final[float] = 2.0
-MAX_DELAY_BETWEEN_REQUESTS: Final[float] = 5.0
+# Bulk submission to the backend
+SUBMIT_CHUNK_SIZE: Final[int] = 50  # records per POST; 1 sends single objects
+SUBMIT_CONCURRENCY: Final[int] = 4  # chunks in flight over keep-alive connections
+SUBMIT_MAX_RETRIES: Final[int] = 3
+SUBMIT_RETRY_DELAY: Final[float] = 0.5  # seconds, doubled per retry
+
+# Per-host request rate limits (requests/second), shared by all scrapers in a process
+RATE_LIMIT_DEFAULT: Final[float] = 1.0
+RATE_LIMITS: Final[dict[str, float]] = {
+    "www.amazon.in": 1.0,
+    "www.flipkart.com": 1.0,
+}
+RATE_LIMIT_BURST: Final[float] = 2.0  # requests allowed back to back on an idle host
+RATE_LIMIT_MIN: Final[float] = 0.1  # floor after repeated 429/503 slowdowns
+RATE_LIMIT_JITTER: Final[float] = 0.5  # max random seconds added to each wait
+
+# On-disk HTTP response cache shared by every scraper process on this machine
+HTTP_CACHE_ENABLED: Final[bool] = True
+HTTP_CACHE_DIR: Final[str] = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".scraper_cache")
+HTTP_CACHE_TTL: Final[float] = 900.0  # seconds a response is served without touching the network
+HTTP_CACHE_MAX_BYTES: Final[int] = 256 * 1024 * 1024  # compressed bodies; least recently used go first
+# Query parameters that only track clicks/sessions and never change the page
+HTTP_CACHE_IGNORED_PARAMS: Final[frozenset[str]] = frozenset({
+    "ref", "ref_", "qid", "sprefix", "crid", "sr", "otracker", "otracker1", "fm", "iid", "ssid", "srno",
+})
+
+# Concurrent identical scrapes share one in-flight run (across threads, tasks and processes)
+SINGLE_FLIGHT_ENABLED: Final[bool] = True
+SINGLE_FLIGHT_DIR: Final[str] = os.path.join(tempfile.gettempdir(), "price-scraper-flights")
+SINGLE_FLIGHT_POLL: Final[float] = 0.2  # seconds between checks while another process holds a flight
+
+# Query canonicalisation: filler words and brands implied by a product-line token
+QUERY_STOPWORDS: Final[frozenset[str]] = frozenset({
+    "an", "the", "and", "for", "with", "of", "in", "new", "latest", "buy", "online", "price", "best",
+})
+IMPLIED_BRANDS: Final[dict[str, str]] = {
+    "iphone": "apple", "ipad": "apple", "macbook": "apple", "airpods": "apple", "imac": "apple",
+    "galaxy": "samsung", "pixel": "google", "redmi": "xiaomi", "thinkpad": "lenovo",
+    "playstation": "sony", "xbox": "microsoft",
+}
+# Previously scraped products kept for identity lookups (oldest dropped first)
+PRODUCT_INDEX_MAX_ITEMS: Final[int] = 100_000
 
 AMAZON_BASE_URL: Final[str] = "https://www.amazon.in"
 FLIPKART_BASE_URL: Final[str] = "https://www.flipkart.com"
 DEFAULT_RESULT_LIMIT: Final[int] = 5
 SCRAPE_OUTPUT_PATH: Final[str] = "scrape-output.json"
+# Local price history (history_store.py)
+HISTORY_DB_PATH: Final[str] = "price-history.sqlite3"
+HISTORY_BATCH_SIZE: Final[int] = 1000  # rows per insert transaction
+# Columnar observation log for analytics (observation_log.py)
+OBS_LOG_DIR: Final[str] = "observations"
+OBS_SEGMENT_ROWS: Final[int] = 1_000_000  # rows per segment before rolling over
 PLAYWRIGHT_WAIT_SELECTOR: Final[str | None] = None
+# HTML parser backend: "auto" (fastest installed), "selectolax", "lxml", "bs4-lxml" or "bs4"
+HTML_PARSER: Final[str] = "auto"
+PARTIAL_PARSING: Final[bool] = True  # bs4 backends only build the result-card subtrees
+# Worker processes for HTML parsing (0 parses inline on the fetching thread)
+PARSE_WORKERS: Final[int] = max(1, (os.cpu_count() or 2) - 1)
+PLAYWRIGHT_PAGE_USES: Final[int] = 20  # navigations before the dynamic page/context is recycled
+# Histogram bucket bounds (seconds) for per-stage timings (scrape_metrics.py)
+METRICS_BUCKETS: Final[tuple[float, ...]] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+# --profile runs (scrape_profiler.py)
+PROFILE_SAMPLE_INTERVAL: Final[float] = 0.005  # seconds between stack samples of every thread
+PROFILE_TOP: Final[int] = 25  # rows per table in the profile summary
+# Continuous re-scraping by staleness and volatility (refresh_scheduler.py)
+REFRESH_PRODUCTS_DB: Final[str] = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "products.db")
+REFRESH_REQUESTS_PER_MINUTE: Final[float] = 20.0  # platform searches per minute across all products
+REFRESH_WORKERS: Final[int] = 2  # products refreshed at the same time
+REFRESH_MIN_INTERVAL: Final[float] = 15 * 60.0  # seconds; the most volatile products
+REFRESH_MAX_INTERVAL: Final[float] = 24 * 3600.0  # seconds; products whose prices never move
+REFRESH_DEFAULT_INTERVAL: Final[float] = 4 * 3600.0  # seconds, for products with no price history
+REFRESH_SPEEDUP: Final[float] = 0.5  # interval factor after a price change
+REFRESH_BACKOFF: Final[float] = 1.5  # interval factor after an unchanged refresh
+REFRESH_CHANGE_THRESHOLD: Final[float] = 0.005  # relative price move that counts as a change
+REFRESH_RELOAD_INTERVAL: Final[float] = 300.0  # seconds between re-reads of the product list
@@ -0,0 +1,234 @@
+"""Long-running scraper daemon - HTTP job API on top of warm headless browsers"""
+import asyncio
+import argparse
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+import traceback
+
+# Add headless_scraper to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from aiohttp import web
+
+from run_scraper import scrape_and_send, safe_print
+from scrape_metrics import configure_tracing, get_metrics, span
+from headless_scraper.browser_pool import BrowserPool
+from headless_scraper.config import (
+    API_ENDPOINT,
+    JOB_HISTORY_LIMIT,
+    SCRAPER_QUEUE_LIMIT,
+    SCRAPER_SERVER_HOST,
+    SCRAPER_SERVER_PORT,
+    SCRAPER_WORKERS,
+)
+
+
+class ScrapeJob:
+    """A queued scrape request and its outcome"""
+
+    def __init__(self, product_name: str, product_url: str = None,
+                 endpoint: str = API_ENDPOINT, concurrent: bool = True):
+        self.id = uuid.uuid4().hex
+        self.product_name = product_name
+        self.product_url = product_url
+        self.endpoint = endpoint
+        self.concurrent = concurrent
+        self.status = "queued"
+        self.products = []
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = asyncio.Event()
+
+    def to_dict(self, include_products: bool = True) -> dict:
+        data = {
+            "jobId": self.id,
+            "status": self.status,
+            "productName": self.product_name,
+            "productUrl": self.product_url,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "productCount": len(self.products),
+            "error": self.error,
+        }
+        if include_products:
+            data["products"] = self.products
+        return data
+
+
+class ScraperServer:
+    """
+    Accept scrape jobs over HTTP, queue them and run them on a shared pool
+    of warm browsers.
+
+    POST /scrape      {"productName": ..., "productUrl": ..., "wait": false}
+    GET  /jobs        recent jobs (without products)
+    GET  /jobs/{id}   job status and scraped products
+    GET  /health      queue depth and worker count
+    GET  /metrics     per-stage timings and counters (Prometheus text format)
+    """
+
+    def __init__(self, workers: int = SCRAPER_WORKERS, queue_limit: int = SCRAPER_QUEUE_LIMIT,
+                 endpoint: str = API_ENDPOINT):
+        self.workers = workers
+        self.endpoint = endpoint
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_limit)
+        self.jobs: "OrderedDict[str, ScrapeJob]" = OrderedDict()
+        # Each worker runs both platforms at once, so give every worker two browsers
+        self.pool = BrowserPool(size=workers * 2)
+        self._worker_tasks = []
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/scrape", self.handle_scrape)
+        app.router.add_get("/jobs", self.handle_list_jobs)
+        app.router.add_get("/jobs/{job_id}", self.handle_get_job)
+        app.router.add_get("/health", self.handle_health)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app: web.Application):
+        await self.pool.start()
+        self._worker_tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        safe_print(f"[Server] {self.workers} workers ready, {self.pool.size} warm browsers")
+
+    async def _on_cleanup(self, app: web.Application):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        await self.pool.close()
+        safe_print("[Server] Shut down")
+
+    def _remember(self, job: ScrapeJob):
+        self.jobs[job.id] = job
+        # Drop the oldest finished jobs once history is full
+        while len(self.jobs) > JOB_HISTORY_LIMIT:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if not oldest.done.is_set():
+                break
+            del self.jobs[oldest_id]
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self.queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                with span("scrape", query=job.product_name, job=job.id):
+                    job.products = await scrape_and_send(
+                        job.product_name, job.endpoint,
+                        concurrent=job.concurrent, pool=self.pool,
+                    ) or []
+                job.status = "done"
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "cancelled"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                traceback.print_exc()
+            finally:
+                job.finished_at = time.time()
+                job.done.set()
+                self.queue.task_done()
+            safe_print(f"[Server] Job {job.id} {job.status} in "
+                       f"{job.finished_at - job.started_at:.1f}s ({len(job.products)} products)")
+
+    async def handle_scrape(self, request: web.Request) -> web.Response:
+        # Browsers may send "simple" text/plain POSTs cross-origin without a preflight;
+        # requiring JSON keeps any web page from driving the daemon on 127.0.0.1
+        if request.content_type != "application/json":
+            return web.json_response({"success": False, "message": "Content-Type must be application/json"},
+                                     status=415)
+        try:
+            body = await request.json()
+        except Exception:
+            return web.json_response({"success": False, "message": "Invalid JSON body"}, status=400)
+        if not isinstance(body, dict):
+            return web.json_response({"success": False, "message": "Body must be a JSON object"}, status=400)
+
+        product_name = body.get("productName")
+        product_name = product_name.strip() if isinstance(product_name, str) else ""
+        if not product_name:
+            return web.json_response({"success": False, "message": "productName is required"}, status=400)
+        # Results only ever go to the configured backend, never to a URL named by the caller
+        endpoint = body.get("endpoint", self.endpoint)
+        if endpoint != self.endpoint:
+            return web.json_response({"success": False, "message": "endpoint must be the configured backend"},
+                                     status=400)
+        product_url = body.get("productUrl")
+
+        job = ScrapeJob(
+            product_name,
+            product_url=product_url if isinstance(product_url, str) else None,
+            endpoint=self.endpoint,
+            concurrent=bool(body.get("concurrent", True)),
+        )
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return web.json_response({"success": False, "message": "Scrape queue is full"}, status=503)
+        self._remember(job)
+
+        if body.get("wait"):
+            await job.done.wait()
+            return web.json_response({"success": job.status == "done", **job.to_dict()})
+
+        return web.json_response({
+            "success": True,
+            "message": "Scrape job queued",
+            "statusUrl": f"/jobs/{job.id}",
+            **job.to_dict(include_products=False),
+        }, status=202)
+
+    async def handle_get_job(self, request: web.Request) -> web.Response:
+        job = self.jobs.get(request.match_info["job_id"])
+        if job is None:
+            return web.json_response({"success": False, "message": "Job not found"}, status=404)
+        return web.json_response({"success": True, **job.to_dict()})
+
+    async def handle_list_jobs(self, request: web.Request) -> web.Response:
+        jobs = [job.to_dict(include_products=False) for job in reversed(self.jobs.values())]
+        return web.json_response({"success": True, "jobs": jobs})
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "success": True,
+            "queued": self.queue.qsize(),
+            "workers": self.workers,
+            "browsers": self.pool.size,
+            "browserLaunches": self.pool.launches,
+        })
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=get_metrics().render().encode("utf-8"),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper daemon with an HTTP job API")
+    parser.add_argument("--host", default=SCRAPER_SERVER_HOST, help="Interface to bind")
+    parser.add_argument("--port", type=int, default=SCRAPER_SERVER_PORT, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=SCRAPER_WORKERS, help="Jobs scraped at the same time")
+    parser.add_argument("--endpoint", default=API_ENDPOINT, help="Backend API endpoint for scraped records")
+    parser.add_argument("--trace-file", help="Append every timed stage of every job to this file as JSON lines")
+
+    args = parser.parse_args()
+    if args.trace_file:
+        configure_tracing(args.trace_file)
+
+    server = ScraperServer(workers=args.workers, endpoint=args.endpoint)
+    safe_print(f"[INFO] Scraper server listening on http://{args.host}:{args.port}")
+    web.run_app(server.build_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,39 @@
 """Utility helpers for scraping, normalization, and persistence."""
 from __future__ import annotations
 
+import gzip
+import io
 import json
 import re
-from dataclasses import asdict, dataclass
+import sys
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, Iterable, Mapping, Optional, TextIO, Union
+
+try:  # pragma: no cover - orjson is optional
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+    ORJSON_AVAILABLE = False
+
+try:  # pragma: no cover - msgpack is optional
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    msgpack = None  # type: ignore
+    MSGPACK_AVAILABLE = False
 
 _NAME_SANITIZER = re.compile(r"[^a-z0-9+]+")
-_PRICE_SANITIZER = re.compile(r"[\d,.]+")
+# First number: digits with grouping commas ("1,09,900"), then an optional decimal part,
+# or a bare decimal part (".99") unless the dot ends a word such as "Rs.".
+# bulk_normalize applies the same rules to whole arrays.
+_PRICE_SANITIZER = re.compile(r"\d[\d,]*(?:\.\d+)?|(?<![A-Za-z])\.\d+")
 _RATING_SANITIZER = re.compile(r"\d+(?:\.\d+)?")
 
 
@@ -20,7 +44,7 @@ def normalize_display_name(raw_name: str) -> str:
 
 
 def normalize_price(raw_price: str) -> Optional[float]:
-    match = _PRICE_SANITIZER.search(raw_price.replace("\xa0", " "))
+    match = _PRICE_SANITIZER.search(raw_price)
     if not match:
         return None
     normalized = match.group().replace(",", "")
@@ -40,14 +64,59 @@ def normalize_rating(raw_rating: str) -> Optional[float]:
         return None
 
 
-@dataclass(slots=True)
+@lru_cache(maxsize=4096)
+def iso_timestamp(epoch: int) -> str:
+    """UTC ISO-8601 for whole epoch seconds; records of one run share a handful of values."""
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+@dataclass(slots=True, init=False)
 class ProductRecord:
+    """One scraped product.
+
+    ``observed_at`` is whole epoch seconds (the ISO form is derived on
+    demand), and name and platform are interned, so a million records from
+    a few thousand products hold each distinct string once.
+
+    The constructor still takes the ISO ``timestamp`` string that older
+    callers pass, by keyword or in place of ``observed_at``. ``asdict`` and
+    ``fields`` report ``observed_at``; ``to_payload`` keeps the ``timestamp`` key.
+    """
+
     productName: str
     platform: str
     price: Optional[float]
     rating: Optional[float]
     url: str
-    timestamp: str
+    observed_at: int
+
+    def __init__(
+        self,
+        productName: str,
+        platform: str,
+        price: Optional[float],
+        rating: Optional[float],
+        url: str,
+        observed_at: int | str | None = None,
+        *,
+        timestamp: str | None = None,
+    ) -> None:
+        if timestamp is not None:
+            observed_at = timestamp
+        if observed_at is None:
+            raise TypeError("ProductRecord() missing 'observed_at' (or 'timestamp')")
+        if isinstance(observed_at, str):
+            observed_at = int(datetime.fromisoformat(observed_at.replace("Z", "+00:00")).timestamp())
+        self.productName = sys.intern(productName)
+        self.platform = sys.intern(platform)
+        self.price = price
+        self.rating = rating
+        self.url = url
+        self.observed_at = observed_at
+
+    @property
+    def timestamp(self) -> str:
+        return iso_timestamp(self.observed_at)
 
     @classmethod
     def from_raw(
@@ -62,25 +131,137 @@ class ProductRecord:
         normalized_name = normalize_display_name(name)
         price_value = normalize_price(price_text or "") if price_text else None
         rating_value = normalize_rating(rating_text or "") if rating_text else None
-        timestamp = datetime.now(timezone.utc).isoformat()
         return cls(
             productName=normalized_name,
             platform=platform,
             price=price_value,
             rating=rating_value,
             url=url,
-            timestamp=timestamp,
+            observed_at=int(time.time()),
         )
 
-    def to_payload(self) -> dict[str, str | float | None]:
-        payload = asdict(self)
-        if self.price is not None:
-            payload["price"] = f"{self.price:.2f}"
-        if self.rating is not None:
-            payload["rating"] = f"{self.rating:.1f}"
-        return payload
+    def to_payload(self) -> dict[str, str | None]:
+        return {
+            "productName": self.productName,
+            "platform": self.platform,
+            "price": None if self.price is None else f"{self.price:.2f}",
+            "rating": None if self.rating is None else f"{self.rating:.1f}",
+            "url": self.url,
+            "timestamp": iso_timestamp(self.observed_at),
+        }
+
+
+def dumps_json(obj: Any) -> str:
+    """Compact JSON, through orjson when installed; both give the same text for payloads."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def pack_msgpack(obj: Any) -> bytes:
+    """The same payload as MessagePack, for consumers that accept it."""
+    if msgpack is None:
+        raise RuntimeError("msgpack is not installed; pip install msgpack")
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def _payload(record: Union[ProductRecord, Mapping]) -> Mapping:
+    return record.to_payload() if isinstance(record, ProductRecord) else record
+
+
+class NDJSONWriter:
+    """One JSON object per line, flushed as soon as it is written.
+
+    ``destination`` is a path, ``"-"`` for stdout (always written as UTF-8),
+    or an open text stream (left open on close). Paths ending in ``.gz`` are gzip-compressed unless
+    ``compress`` says otherwise; each flush is a gzip sync point, so readers
+    such as ``zcat`` see every record that was written even if the run dies
+    before the file is closed.
+    """
+
+    def __init__(
+        self,
+        destination: Union[str, Path, TextIO] = "-",
+        *,
+        compress: Optional[bool] = None,
+        append: bool = False,
+    ) -> None:
+        self.count = 0
+        self._detach = False
+        self._owns = isinstance(destination, (str, Path))
+        if not self._owns:
+            self._stream: TextIO = destination  # type: ignore[assignment]
+        elif str(destination) == "-":
+            self._owns = False
+            self._stream = sys.stdout
+            if compress:
+                self._stream = io.TextIOWrapper(
+                    gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb"), encoding="utf-8"
+                )
+                self._owns = True
+            elif hasattr(sys.stdout, "buffer"):
+                # Always UTF-8: a piped stdout uses the locale encoding (cp1252 on Windows),
+                # which cannot encode every product name and which readers would misdecode
+                sys.stdout.flush()
+                self._stream = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="\n",
+                                                write_through=True)
+                self._detach = True
+        else:
+            path = Path(destination)
+            if compress is None:
+                compress = path.suffix == ".gz"
+            mode = "at" if append else "wt"
+            if compress:
+                self._stream = gzip.open(path, mode, encoding="utf-8")
+            else:
+                self._stream = open(path, mode, encoding="utf-8")
+
+    def write(self, record: Union[ProductRecord, Mapping]) -> None:
+        self._stream.write(dumps_json(_payload(record)) + "\n")
+        self._stream.flush()
+        self.count += 1
+
+    def write_all(self, records: Iterable[Union[ProductRecord, Mapping]]) -> int:
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self) -> None:
+        if self._owns:
+            self._stream.close()
+        elif self._detach:
+            # Let go of stdout's buffer without closing it
+            self._stream.flush()
+            self._stream.detach()
+            self._stream, self._detach = sys.stdout, False
+        else:
+            self._stream.flush()
+
+    def __enter__(self) -> "NDJSONWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
 
+def dump_records(records: Iterable[Union[ProductRecord, Mapping]], destination: str | Path) -> int:
+    """Write ``records`` to ``destination`` as they are produced.
 
-def dump_records(records: Iterable[ProductRecord], destination: str | Path) -> None:
-    payload = [record.to_payload() for record in records]
-    Path(destination).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    A ``.ndjson``/``.jsonl`` destination (optionally ``.gz``) gets one record
+    per line; anything else a JSON array, still written record by record so
+    the input is never held in memory. Returns the number written.
+    """
+    path = Path(destination)
+    suffixes = path.suffixes[-2:]
+    if {".ndjson", ".jsonl"} & set(suffixes):
+        with NDJSONWriter(path) as writer:
+            return writer.write_all(records)
+    count = 0
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("[")
+        for record in records:
+            out.write(",\n  " if count else "\n  ")
+            out.write(dumps_json(_payload(record)))
+            count += 1
+        out.write("\n]\n" if count else "]\n")
+    return count
@@ -0,0 +1,303 @@
+"""Single-flight deduplication: concurrent identical scrapes share one in-flight run."""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from scraper_config import SINGLE_FLIGHT_DIR, SINGLE_FLIGHT_ENABLED, SINGLE_FLIGHT_POLL
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None  # type: ignore
+
+T = TypeVar("T")
+
+_MISSING = object()
+# Result files older than this are swept; followers only ever read results newer than their own request
+_RESULT_MAX_AGE = 600.0
+_SWEEP_EVERY = 100
+
+
+class FlightError(RuntimeError):
+    """The run this caller joined failed in another process."""
+
+
+def _try_lock(handle) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt is not None:  # pragma: no cover
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(handle) -> None:
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:  # pragma: no cover
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _is_current(handle, path: Path) -> bool:
+    """Whether the locked ``handle`` is still the file at ``path`` (not one swept away and recreated)."""
+    try:
+        return os.fstat(handle.fileno()).st_ino == os.stat(path).st_ino
+    except OSError:
+        return False
+
+
+def _touch(path: Path) -> None:
+    # A lock file's mtime is when it was last taken, so the sweep can tell idle ones apart
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def flight_key(*parts: str) -> str:
+    return "\n".join(parts)
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    Within a process, the first caller for a key runs the work and every
+    caller that arrives while it is running (from any thread or event loop)
+    receives a copy of its result or its exception. Across processes, the
+    running caller holds an exclusive file lock for the key; callers in other
+    processes announce themselves (``<key>.waiting``), wait for the lock and
+    then pick up the JSON result it left behind, running the work themselves
+    only if there is none (the leader crashed, or the result was not
+    JSON-serializable). Nobody waiting means nothing is written.
+    """
+
+    def __init__(self, directory: str = SINGLE_FLIGHT_DIR, *, poll: float = SINGLE_FLIGHT_POLL,
+                 cross_process: bool = True, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.directory = Path(directory)
+        self.poll = poll
+        self.cross_process = cross_process and (fcntl is not None or msvcrt is not None)
+        self.led = self.shared = 0
+        self._calls: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._leads = 0
+
+    def _join_or_lead(self, key: str) -> Tuple[concurrent.futures.Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = self._calls[key] = concurrent.futures.Future()
+            self.led += 1
+            return future, True
+
+    def _finish(self, key: str, future: concurrent.futures.Future, value: Any = None,
+                error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            if isinstance(error, asyncio.CancelledError):
+                # The leader's own caller gave up; followers get an error rather than a cancellation
+                error = FlightError("shared scrape was cancelled")
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()`` unless an identical call is already running, then share its outcome."""
+        if not self.enabled:
+            return await fn()
+        future, leader = self._join_or_lead(key)
+        if not leader:
+            # shield: a follower timing out must not cancel the shared future for the others
+            return copy.deepcopy(await asyncio.shield(asyncio.wrap_future(future)))
+        try:
+            value = await self._lead_async(key, fn)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, value)
+        return value
+
+    def do_sync(self, key: str, fn: Callable[[], T]) -> T:
+        """Blocking counterpart of :meth:`do` for threaded callers."""
+        if not self.enabled:
+            return fn()
+        future, leader = self._join_or_lead(key)
+        if not leader:
+            return copy.deepcopy(future.result())
+        try:
+            value = self._lead_sync(key, fn)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, value)
+        return value
+
+    async def _lead_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        if not self.cross_process:
+            return await fn()
+        requested = time.time()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key, ".lock")
+        waited = False
+        while True:
+            handle = open(path, "a+b")
+            while not _try_lock(handle):
+                if not waited:
+                    self._announce(key)
+                waited = True
+                await asyncio.sleep(self.poll)
+            if _is_current(handle, path):
+                break
+            # Swept while we waited: this inode is no longer the lock everyone else takes
+            _unlock(handle)
+            handle.close()
+        with handle:
+            self._took(path)
+            try:
+                if waited:
+                    shared = self._read_result(key, since=requested)
+                    if shared is not _MISSING:
+                        return shared
+                return self._record(key, await fn())
+            except Exception as e:
+                self._record_error(key, e)
+                raise
+            finally:
+                _unlock(handle)
+
+    def _lead_sync(self, key: str, fn: Callable[[], T]) -> T:
+        if not self.cross_process:
+            return fn()
+        requested = time.time()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key, ".lock")
+        waited = False
+        while True:
+            handle = open(path, "a+b")
+            while not _try_lock(handle):
+                if not waited:
+                    self._announce(key)
+                waited = True
+                time.sleep(self.poll)
+            if _is_current(handle, path):
+                break
+            _unlock(handle)
+            handle.close()
+        with handle:
+            self._took(path)
+            try:
+                if waited:
+                    shared = self._read_result(key, since=requested)
+                    if shared is not _MISSING:
+                        return shared
+                return self._record(key, fn())
+            except Exception as e:
+                self._record_error(key, e)
+                raise
+            finally:
+                _unlock(handle)
+
+    def _took(self, path: Path) -> None:
+        _touch(path)
+        self._leads += 1
+        if self._leads % _SWEEP_EVERY == 0:
+            self._sweep()
+
+    def _announce(self, key: str) -> None:
+        # Tell the process holding the lock that someone wants its result
+        try:
+            self._path(key, ".waiting").touch()
+        except OSError:
+            pass
+
+    def _claim_waiters(self, key: str) -> bool:
+        """True if another process announced it is waiting for this key (consumes the announcement)."""
+        try:
+            self._path(key, ".waiting").unlink()
+            return True
+        except OSError:
+            return False
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / (hashlib.sha1(key.encode("utf-8")).hexdigest() + suffix)
+
+    def _record(self, key: str, value: T) -> T:
+        # Results (whole pages, for fetches) are only written when another process is waiting for them
+        if not self._claim_waiters(key):
+            return value
+        try:
+            self._write_result(key, {"value": value})
+        except (TypeError, ValueError):
+            pass  # not JSON-serializable; waiting processes will run the work themselves
+        return value
+
+    def _record_error(self, key: str, error: BaseException) -> None:
+        if self._claim_waiters(key):
+            self._write_result(key, {"error": str(error) or type(error).__name__})
+
+    def _write_result(self, key: str, entry: Dict[str, Any]) -> None:
+        entry["finished"] = time.time()
+        data = json.dumps(entry, ensure_ascii=False)
+        path = self._path(key, ".json")
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _read_result(self, key: str, *, since: float) -> Any:
+        try:
+            entry = json.loads(self._path(key, ".json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return _MISSING
+        if entry.get("finished", 0) < since:
+            return _MISSING  # left over from an earlier run, not the one we waited on
+        if "error" in entry:
+            raise FlightError(entry["error"])
+        return entry["value"]
+
+    def _sweep(self) -> None:
+        cutoff = time.time() - _RESULT_MAX_AGE
+        for path in [*self.directory.glob("*.json"), *self.directory.glob("*.waiting")]:
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+        # One lock file per distinct key ever seen; drop the idle ones nobody holds. A process that
+        # opened one just before it went re-checks after locking (_is_current) and opens the new file
+        for path in self.directory.glob("*.lock"):
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+                with open(path, "a+b") as handle:
+                    if not _try_lock(handle):
+                        continue
+                    try:
+                        path.unlink()
+                    finally:
+                        _unlock(handle)
+            except OSError:
+                pass
+
+
+# Shared by every scraper in the process so identical scrapes from any caller collapse
+flights = SingleFlight(enabled=SINGLE_FLIGHT_ENABLED)
@@ -8,6 +8,7 @@ class DatabaseManager {
     this.db = null;
     this.SQL = null;
     this.dbPath = null;
+    this.inTransaction = false;
   }
 
   async connect() {
@@ -105,7 +106,10 @@ class DatabaseManager {
         stmt.step();
         stmt.free();
         
-        this.saveToFile(); // Persist changes immediately
+        // Persist changes immediately; a transaction saves once when it commits
+        if (!this.inTransaction) {
+          this.saveToFile();
+        }
         
         // Return result with last inserted ID
         return this.db;
@@ -118,6 +122,24 @@ class DatabaseManager {
     }
   }
 
+  // Run fn() as one transaction: every write is kept, or none if it throws
+  transaction(fn) {
+    this.db.run('BEGIN');
+    this.inTransaction = true;
+    let result;
+    try {
+      result = fn();
+      this.db.run('COMMIT');
+    } catch (error) {
+      this.db.run('ROLLBACK');
+      throw error;
+    } finally {
+      this.inTransaction = false;
+    }
+    this.saveToFile();
+    return result;
+  }
+
   saveToFile() {
     try {
       if (this.db && this.dbPath) {
@@ -1,8 +1,35 @@
 const Product = require('../models/Product');
+const db = require('../config/database');
 const { validationResult } = require('express-validator');
 const scraperService = require('../services/scraperService');
 const ollamaService = require('../services/ollamaService');
 
+// The /scrape validation rules for one record of a batch; returns [record, errors]
+function checkScrapedRecord(record) {
+  const errors = [];
+  if (record === null || typeof record !== 'object' || Array.isArray(record)) {
+    return [null, ['Record must be an object']];
+  }
+  const productName = typeof record.productName === 'string' ? record.productName.trim() : '';
+  const platform = typeof record.platform === 'string' ? record.platform.trim() : '';
+  const currency = typeof record.currency === 'string' ? record.currency.trim() : record.currency;
+  const price = typeof record.price === 'number' ? record.price
+    : (typeof record.price === 'string' && record.price.trim() !== '' ? Number(record.price) : NaN);
+  if (!productName) {
+    errors.push('Product name is required');
+  }
+  if (!platform) {
+    errors.push('Platform is required');
+  }
+  if (!Number.isFinite(price) || price < 0) {
+    errors.push('Price must be a positive number');
+  }
+  if (currency !== undefined && (typeof currency !== 'string' || currency.length !== 3)) {
+    errors.push('Currency must be a 3-letter code');
+  }
+  return [{ ...record, productName, platform, price, currency }, errors];
+}
+
 class ProductController {
   // Add a new product and trigger scraper
   async addProduct(req, res) {
@@ -241,6 +268,78 @@ class ProductController {
     }
   }
 
+  // Receive an array of scraped records in one request
+  async receiveScrapedBatch(req, res) {
+    try {
+      console.log('\n[ProductController] ======== RECEIVE SCRAPED BATCH ========');
+      console.log('[ProductController] Records received:', Array.isArray(req.body) ? req.body.length : 0);
+
+      const errors = validationResult(req);
+      if (!errors.isEmpty()) {
+        console.log('[ProductController] Validation errors:', errors.array());
+        return res.status(400).json({
+          success: false,
+          errors: errors.array()
+        });
+      }
+
+      const valid = [];
+      const rejected = [];
+      req.body.forEach((record, index) => {
+        const [checked, recordErrors] = checkScrapedRecord(record);
+        if (recordErrors.length) {
+          rejected.push({ index, errors: recordErrors });
+        } else {
+          valid.push(checked);
+        }
+      });
+      if (rejected.length) {
+        console.log(`[ProductController] Rejected ${rejected.length} invalid records:`, rejected);
+      }
+      if (!valid.length) {
+        return res.status(400).json({
+          success: false,
+          message: 'No valid records in batch',
+          rejected
+        });
+      }
+
+      // All or nothing: a failure part way must not leave rows behind for the sender's retry to duplicate
+      const stored = db.transaction(() => {
+        const productIds = new Map();
+        const rows = [];
+        for (const { productName, productUrl, platform, price, currency } of valid) {
+          let productId = productIds.get(productName);
+          if (productId === undefined) {
+            const product = Product.findByName(productName);
+            productId = product ? product.id : Product.create(productName, productUrl);
+            productIds.set(productName, productId);
+          }
+
+          Product.addPriceHistory(productId, platform, price, currency);
+          rows.push({ productId, productName, platform, price, currency });
+        }
+        return rows;
+      });
+      console.log(`[ProductController] ✓ Stored ${stored.length} prices`);
+
+      res.json({
+        success: true,
+        message: 'Price data received and stored successfully',
+        count: stored.length,
+        data: stored,
+        rejected
+      });
+    } catch (error) {
+      console.error('Scrape batch endpoint error:', error);
+      res.status(500).json({
+        success: false,
+        message: 'Failed to process scraped data',
+        error: error.message
+      });
+    }
+  }
+
   // AI Summary endpoint (placeholder for future AI integration)
   async getAISummary(req, res) {
     try {
@@ -37,11 +37,20 @@ const scrapeDataValidation = [
     .withMessage('Currency must be a 3-letter code')
 ];
 
+// Bulk submissions: an array of the same records /scrape accepts. Records are
+// checked one by one in the controller, so one bad record does not reject the rest
+const scrapeBatchValidation = [
+  body()
+    .isArray({ min: 1 })
+    .withMessage('Body must be a non-empty array of scraped records')
+];
+
 // Routes
 router.post('/add-product', addProductValidation, productController.addProduct);
 router.get('/get-prices', productController.getLatestPrices);
 router.get('/get-history', productController.getPriceHistory);
 router.post('/scrape', scrapeDataValidation, productController.receiveScrapedData);
+router.post('/scrape/batch', scrapeBatchValidation, productController.receiveScrapedBatch);
 router.get('/ai-summary', productController.getAISummary);
 router.get('/products', productController.getAllProducts);
 
@@ -1,8 +1,16 @@
 const { spawn } = require('child_process');
+const { EventEmitter } = require('events');
 const path = require('path');
 
-class ScraperService {
+/**
+ * Emits 'event' with every progress event of a spawned scraper
+ * ({ productId, event: 'started' | 'record' | 'platform_done' | 'submitted' | 'error' | 'finished', t, ... })
+ */
+class ScraperService extends EventEmitter {
   constructor() {
+    super();
+    // productId -> promise of the running scrape, for waitForScraperData
+    this.inflight = new Map();
     this.scraperPath = path.join(__dirname, '../../../run_scraper.py');
     // Use the virtual environment Python executable
     const venvPython = path.join(__dirname, '../../../.venv/Scripts/python.exe');
@@ -16,6 +24,27 @@ class ScraperService {
    * @returns {Promise<Object>} Scraping result
    */
   async scrapeProduct(product) {
+    // A running scraper daemon (scraper_server.py) avoids a process spawn per product
+    if (process.env.SCRAPER_URL) {
+      return this.scrapeProductViaHttp(product);
+    }
+
+    const scrape = this.spawnScraper(product);
+    if (product.id !== undefined) {
+      this.inflight.set(product.id, scrape);
+      const forget = () => {
+        if (this.inflight.get(product.id) === scrape) this.inflight.delete(product.id);
+      };
+      scrape.then(forget, forget);
+    }
+    return scrape;
+  }
+
+  /**
+   * Run run_scraper.py in event mode: stdout carries one JSON event per line
+   * (see scrape_events.py), log lines arrive on stderr
+   */
+  spawnScraper(product) {
     return new Promise((resolve, reject) => {
       try {
         console.log('\n[ScraperService] ======== TRIGGERING PYTHON SCRAPER ========');
@@ -26,7 +55,8 @@ class ScraperService {
         const args = [
           this.scraperPath,
           '--product-name', product.name,
-          '--endpoint', 'http://localhost:3001/api/scrape'
+          '--endpoint', 'http://localhost:3001/api/scrape',
+          '--events'
         ];
 
         // Don't pass product URL since scraper searches by name
@@ -34,16 +64,48 @@ class ScraperService {
 
         console.log('[ScraperService] Spawning process with args:', args);
         const scraperProcess = spawn(this.pythonCommand, args, {
-          cwd: path.dirname(this.scraperPath)
+          cwd: path.dirname(this.scraperPath),
+          // Piped stdio defaults to the locale code page on Windows; events and logs are read as UTF-8
+          env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
         });
         console.log('[ScraperService] Scraper process spawned, PID:', scraperProcess.pid);
 
-        let outputData = '';
+        const records = [];
+        const platforms = {};
+        let finished = null;
+        let pending = '';
         let errorData = '';
 
+        const handleEvent = (line) => {
+          let event;
+          try {
+            event = JSON.parse(line);
+          } catch (e) {
+            console.log('[ScraperService] [STDOUT]', line);
+            return;
+          }
+          if (event.event === 'record') {
+            records.push(event.product);
+          } else if (event.event === 'platform_done') {
+            platforms[event.platform] = { count: event.count, elapsed: event.elapsed, cached: event.cached, error: event.error };
+            console.log(`[ScraperService] ${event.platform}: ${event.count} products in ${event.elapsed.toFixed(2)}s`);
+          } else if (event.event === 'error') {
+            console.error(`[ScraperService] ${event.stage} error:`, event.message);
+          } else if (event.event === 'finished') {
+            finished = event;
+          }
+          this.emit('event', { productId: product.id, ...event });
+        };
+
+        scraperProcess.stdout.setEncoding('utf8');
         scraperProcess.stdout.on('data', (data) => {
-          outputData += data.toString();
-          console.log('[ScraperService] [STDOUT]', data.toString().trim());
+          pending += data;
+          let newline;
+          while ((newline = pending.indexOf('\n')) !== -1) {
+            const line = pending.slice(0, newline).trim();
+            pending = pending.slice(newline + 1);
+            if (line) handleEvent(line);
+          }
         });
 
         scraperProcess.stderr.on('data', (data) => {
@@ -53,13 +115,18 @@ class ScraperService {
 
         scraperProcess.on('close', (code) => {
           console.log('[ScraperService] Scraper process exited with code:', code);
+          if (pending.trim()) handleEvent(pending.trim());
           if (code === 0) {
             console.log('[ScraperService] ✓ Scraper completed successfully');
             resolve({
               success: true,
               message: 'Scraper triggered successfully',
-              output: outputData,
-              productName: product.name
+              productName: product.name,
+              records,
+              platforms,
+              submitted: finished ? finished.submitted : 0,
+              failed: finished ? finished.failed : 0,
+              elapsed: finished ? finished.elapsed : null
             });
           } else {
             console.error(`Scraper exited with code ${code}`);
@@ -67,7 +134,9 @@ class ScraperService {
               success: false,
               message: `Scraper exited with code ${code}`,
               error: errorData,
-              productName: product.name
+              productName: product.name,
+              records,
+              platforms
             });
           }
         });
@@ -108,7 +177,7 @@ class ScraperService {
 
   /**
    * Alternative: Trigger scraper via HTTP if it's running as a service
-   * This is useful if the Python scraper is set up as a Flask/FastAPI service
+   * Start it with `python scraper_server.py`; used automatically when SCRAPER_URL is set
    */
   async scrapeProductViaHttp(product) {
     try {
@@ -173,31 +242,29 @@ class ScraperService {
   }
 
   /**
-   * Wait for scraper to send data back to /scrape endpoint
-   * This is a helper method to track scraping progress
+   * Wait for the running scrape of a product to finish
+   * Resolves with its result (records, per-platform timings) or a timeout/not-running status
    */
   async waitForScraperData(productId, timeout = 60000) {
-    const startTime = Date.now();
-    const checkInterval = 2000; // Check every 2 seconds
-
-    return new Promise((resolve) => {
-      const checkData = setInterval(async () => {
-        const elapsed = Date.now() - startTime;
-
-        if (elapsed >= timeout) {
-          clearInterval(checkData);
-          resolve({
-            success: false,
-            message: 'Timeout waiting for scraper data',
-            elapsed
-          });
-        }
+    const scrape = this.inflight.get(productId);
+    if (!scrape) {
+      return { success: false, message: 'No scrape running for this product' };
+    }
 
-        // In a real implementation, you would check the database
-        // to see if new price data has been added for this product
-        // For now, we'll just resolve after a reasonable time
-      }, checkInterval);
+    const startTime = Date.now();
+    let timer;
+    const timedOut = new Promise((resolve) => {
+      timer = setTimeout(() => resolve({
+        success: false,
+        message: 'Timeout waiting for scraper data',
+        elapsed: Date.now() - startTime
+      }), timeout);
     });
+    try {
+      return await Promise.race([scrape.catch((error) => error), timedOut]);
+    } finally {
+      clearTimeout(timer);
+    }
   }
 }
 
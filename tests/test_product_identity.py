@@ -0,0 +1,48 @@
+"""Query and title keys must keep unrelated searches apart, whatever their script."""
+from product_identity import canonical_query, merge_records, query_key, title_key
+
+
+def test_equivalent_queries_share_a_key():
+    assert query_key("Apple iPhone 15 ") == query_key("iphone-15") == query_key("15 iPhone") == "15 iphone"
+
+
+def test_non_ascii_queries_keep_distinct_keys():
+    keys = {query_key("नया फ़ोन"), query_key("सैमसंग टीवी"), query_key("किताब"), query_key("कातिब")}
+    assert "" not in keys
+    assert len(keys) == 4
+
+
+def test_stopword_only_query_falls_back_to_its_text():
+    assert canonical_query("The  Best") == "the best"
+    assert query_key("the best") != query_key("the new")
+    assert query_key("the best") != ""
+
+
+def test_non_ascii_titles_are_not_merged():
+    records = [
+        {"platform": "Flipkart", "productName": "सैमसंग टीवी", "url": ""},
+        {"platform": "Flipkart", "productName": "नया फ़ोन", "url": ""},
+    ]
+    assert title_key("सैमसंग टीवी") != title_key("नया फ़ोन")
+    assert len(merge_records(records)) == 2
+
+
+def test_model_variants_keep_distinct_keys():
+    pairs = [
+        ("Samsung Galaxy S24+", "Samsung Galaxy S24"),
+        ("iPhone 15+", "iPhone 15"),
+        ("Redmi Note 13 Pro+", "Redmi Note 13 Pro"),
+        ("Galaxy A15", "Galaxy 15"),
+        ("Galaxy A15", "Galaxy 15 a"),
+    ]
+    for first, second in pairs:
+        assert query_key(first) != query_key(second), (first, second)
+        assert title_key(first) != title_key(second), (first, second)
+
+
+def test_model_variant_titles_are_not_merged():
+    records = [
+        {"platform": "Flipkart", "productName": "Samsung Galaxy S24+ (Onyx Black, 256 GB)", "url": ""},
+        {"platform": "Flipkart", "productName": "Samsung Galaxy S24 (Onyx Black, 256 GB)", "url": ""},
+    ]
+    assert len(merge_records(records)) == 2